@@ -0,0 +1,122 @@
+"""
+==================================================
+Async Firestore Bulk Writer
+==================================================
+asyncio counterpart of bulk_writer.bulk_write for firestore.AsyncClient:
+- Documents are consumed lazily from an iterator, so the next batch
+  is built while earlier commits are still in flight
+- A semaphore caps the number of concurrent commits (and how far
+  document building can run ahead of the network)
+- Same retry policy as bulk_writer: transient failures are retried
+  with exponential backoff + jitter, non-transient batch failures are
+  split in half to isolate the offending documents
+
+Works with firestore.AsyncClient or any fake whose batch().commit()
+is a coroutine (fake_firestore.FakeAsyncFirestoreClient).
+==================================================
+"""
+
+import time
+import asyncio
+import logging
+from itertools import islice
+from bulk_writer import BATCH_LIMIT, is_transient_error, backoff_delay, resolve_placeholders
+
+# Get logger
+logger = logging.getLogger(__name__)
+
+def iter_batches(documents, batch_size=BATCH_LIMIT):
+    """
+    (doc_id, doc_data) 이터레이터를 batch_size 단위 리스트로 나눕니다. (필요한 만큼만 소비)
+    """
+    iterator = iter(documents)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+async def _commit_batch(db, collection_ref, documents, merge):
+    batch = db.batch()
+    for doc_id, doc_data in documents:
+        batch.set(collection_ref.document(doc_id), resolve_placeholders(doc_data), merge=merge)
+    await batch.commit()
+
+async def _write_batch(db, collection_ref, documents, report, merge, max_attempts, base_delay, max_delay):
+    """
+    배치 하나를 커밋합니다. 일시적 에러는 재시도하고, 영구 에러는 반으로 나누어 다시 시도합니다.
+    """
+    attempt = 1
+    while True:
+        try:
+            await _commit_batch(db, collection_ref, documents, merge)
+            report['written'] += len(documents)
+            return
+        except Exception as error:
+            if is_transient_error(error) and attempt < max_attempts:
+                # 일시적 장애: 백오프 후 같은 배치를 재시도 (다른 커밋은 계속 진행)
+                report['retries'] += 1
+                delay = backoff_delay(attempt, base_delay, max_delay)
+                logger.warning(f"⚠ Batch of {len(documents)} failed (attempt {attempt}), "
+                               f"retrying in {delay:.2f}s: {str(error)}")
+                attempt += 1
+                await asyncio.sleep(delay)
+            elif not is_transient_error(error) and len(documents) > 1:
+                # 영구 에러: 배치를 반으로 나누어 문제 문서를 격리
+                half = len(documents) // 2
+                for part in (documents[:half], documents[half:]):
+                    await _write_batch(db, collection_ref, part, report, merge, max_attempts, base_delay, max_delay)
+                return
+            else:
+                failed_ids = [doc_id for doc_id, _ in documents]
+                report['failed_ids'].extend(failed_ids)
+                logger.error(f"✗ Permanently failed to write {len(failed_ids)} documents: {str(error)}")
+                return
+
+async def async_bulk_write(db, collection_name, documents, batch_size=BATCH_LIMIT, max_in_flight=4,
+                           max_attempts=5, base_delay=0.5, max_delay=30.0, merge=True):
+    """
+    문서들을 배치로 나누어 비동기로 커밋합니다. 최대 max_in_flight개의 커밋이 동시에 진행됩니다.
+
+    Args:
+        db: firestore.AsyncClient (또는 동일 인터페이스의 fake)
+        collection_name (str): 컬렉션 이름
+        documents (iterable): (doc_id, doc_data) 튜플 이터레이터 (제너레이터 가능)
+        batch_size (int): 배치당 문서 수 (최대 500)
+        max_in_flight (int): 동시에 진행할 커밋 수
+        max_attempts (int): 배치당 최대 시도 횟수 (일시적 에러)
+        merge (bool): batch.set의 merge 옵션
+
+    Returns:
+        dict: written, failed_ids, retries, seconds, docs_per_sec (bulk_write와 동일)
+    """
+    report = {'written': 0, 'failed_ids': [], 'retries': 0, 'seconds': 0.0, 'docs_per_sec': 0.0}
+    started = time.perf_counter()
+    collection_ref = db.collection(collection_name)
+    slots = asyncio.Semaphore(max_in_flight)
+    tasks = []
+
+    async def run(batch):
+        try:
+            await _write_batch(db, collection_ref, batch, report, merge, max_attempts, base_delay, max_delay)
+        finally:
+            slots.release()
+
+    for batch in iter_batches(documents, batch_size):
+        # 빈 슬롯이 생길 때까지 대기 (그동안 이전 커밋들이 진행됨)
+        await slots.acquire()
+        tasks.append(asyncio.create_task(run(batch)))
+        # 커밋 요청을 먼저 보내고 다음 배치를 만듦
+        await asyncio.sleep(0)
+
+    if tasks:
+        await asyncio.gather(*tasks)
+
+    total = report['written'] + len(report['failed_ids'])
+    report['seconds'] = time.perf_counter() - started
+    if total and report['seconds'] > 0:
+        report['docs_per_sec'] = report['written'] / report['seconds']
+    if total:
+        logger.info(f"✓ Async bulk write completed: {report['written']}/{total} documents to "
+                    f"'{collection_name}', {report['docs_per_sec']:.1f} docs/sec, {report['retries']} retries")
+    return report
@@ -0,0 +1,285 @@
+"""
+==================================================
+ETL Benchmark Harness
+==================================================
+Measures how each pipeline stage scales with input size:
+1. Generate synthetic GA/Ad CSVs (realistic source/medium/platform
+   mix, mixed date formats, configurable share of invalid rows)
+2. Time read_csv, transform, aggregate_data and upload
+   (against the in-process fake Firestore client)
+3. Write results to a JSON file for regression tracking
+
+Usage:
+    python src/benchmark.py --sizes 10000 1000000 10000000
+==================================================
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import tempfile
+from pathlib import Path
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent))
+from main import TRANSFORM_ENGINES, load_dependencies
+from profiling import get_peak_rss_mb
+from loaders import aggregate_data, merge_aggregates, upload_metrics, async_upload_metrics
+from fake_firestore import FakeFirestoreClient, FakeAsyncFirestoreClient
+
+# main의 변환 함수가 쓰는 pandas/변환 모듈 import
+load_dependencies()
+
+DEFAULT_SIZES = [10_000, 1_000_000, 10_000_000]
+DEFAULT_OUTPUT_DIR = Path(__file__).parent.parent / 'data' / 'benchmarks'
+
+# 생성기 청크 크기 (대용량 파일도 메모리 일정하게 생성)
+GENERATOR_CHUNK = 500_000
+
+# ==================================================
+# SECTION 1: SYNTHETIC DATA GENERATOR
+# ==================================================
+
+# (source, medium, 비중)
+GA_SOURCE_MEDIUMS = [
+    ('naver', 'cpc', 0.28),
+    ('google', 'cpc', 0.22),
+    ('instagram', 'sns', 0.10),
+    ('naver_blog', 'blog', 0.08),
+    ('meta', 'sns_ad', 0.08),
+    ('google', 'display', 0.06),
+    ('youtube', 'social', 0.05),
+    ('youtube', 'video_ad', 0.05),
+    ('offline', 'qr', 0.03),
+    ('kakao', 'referral', 0.03),
+    ('Naver ', 'CPC', 0.02),
+]
+
+# (platform, 비중)
+AD_PLATFORMS = [
+    ('naver', 0.35),
+    ('google', 0.30),
+    ('Google Ads', 0.05),
+    ('meta', 0.15),
+    ('facebook', 0.05),
+    ('instagram', 0.05),
+    ('tiktok', 0.05),
+]
+
+# (strftime 포맷, 비중)
+DATE_FORMATS = [
+    ('%Y-%m-%d', 0.60),
+    ('%Y%m%d', 0.20),
+    ('%m/%d/%Y', 0.10),
+    ('%d/%m/%Y', 0.05),
+    ('%Y.%m.%d', 0.05),
+]
+
+INVALID_DATES = ['', 'N/A', '2025-13-45', '31/31/2025', 'yesterday', '1899-12-31']
+
+CAMPAIGNS = ['self_esteem_202511', 'anxiety_202511', 'brand_always_on', 'retargeting_q4']
+
+def _weighted_choice(rng, options, size):
+    """(value..., weight) 목록에서 비중대로 인덱스를 뽑습니다."""
+    weights = np.array([option[-1] for option in options], dtype=float)
+    return rng.choice(len(options), size=size, p=weights / weights.sum())
+
+def _random_dates(rng, size, start_date, days, invalid_rate):
+    """혼합 포맷의 날짜 문자열과 일부 잘못된 값을 생성합니다."""
+    base = pd.Timestamp(start_date) + pd.to_timedelta(rng.integers(0, days, size), unit='D')
+    dates = np.empty(size, dtype=object)
+
+    format_idx = _weighted_choice(rng, DATE_FORMATS, size)
+    for i, (fmt, _) in enumerate(DATE_FORMATS):
+        mask = format_idx == i
+        dates[mask] = base[mask].strftime(fmt)
+
+    invalid = rng.random(size) < invalid_rate
+    dates[invalid] = rng.choice(INVALID_DATES, size=int(invalid.sum()))
+    return dates
+
+def generate_ga_frame(rng, size, start_date='2025-01-01', days=90, invalid_rate=0.01):
+    """
+    GA 세션 데이터(ga_*.csv 형식)를 생성합니다.
+
+    Returns:
+        pd.DataFrame: date,source,medium,campaign,sessions,users,conversions,revenue
+    """
+    pair_idx = _weighted_choice(rng, GA_SOURCE_MEDIUMS, size)
+    sources = np.array([p[0] for p in GA_SOURCE_MEDIUMS], dtype=object)[pair_idx]
+    mediums = np.array([p[1] for p in GA_SOURCE_MEDIUMS], dtype=object)[pair_idx]
+
+    # 잘못된 행 일부는 source 누락
+    missing_source = rng.random(size) < invalid_rate / 2
+    sources[missing_source] = None
+
+    sessions = rng.poisson(80, size)
+    conversions = rng.binomial(sessions, 0.04)
+    return pd.DataFrame({
+        'date': _random_dates(rng, size, start_date, days, invalid_rate / 2),
+        'source': sources,
+        'medium': mediums,
+        'campaign': rng.choice(CAMPAIGNS, size),
+        'sessions': sessions,
+        'users': (sessions * rng.uniform(0.7, 0.95, size)).astype(int),
+        'conversions': conversions,
+        'revenue': conversions * rng.choice([30000, 50000, 100000], size),
+    })
+
+def generate_ad_frame(rng, size, start_date='2025-01-01', days=90, invalid_rate=0.01):
+    """
+    광고 성과 데이터(ad_*.csv 형식)를 생성합니다.
+
+    Returns:
+        pd.DataFrame: date,platform,campaign,impressions,clicks,cost
+    """
+    platform_idx = _weighted_choice(rng, AD_PLATFORMS, size)
+    impressions = rng.poisson(4000, size)
+    clicks = rng.binomial(impressions, 0.025)
+    return pd.DataFrame({
+        'date': _random_dates(rng, size, start_date, days, invalid_rate),
+        'platform': np.array([p[0] for p in AD_PLATFORMS], dtype=object)[platform_idx],
+        'campaign': rng.choice(CAMPAIGNS, size),
+        'impressions': impressions,
+        'clicks': clicks,
+        'cost': clicks * rng.integers(300, 700, size),
+    })
+
+GENERATORS = {'ga': generate_ga_frame, 'ad': generate_ad_frame}
+
+def write_synthetic_csv(kind, path, rows, seed=0, invalid_rate=0.01):
+    """
+    합성 CSV를 청크 단위로 생성하여 파일에 씁니다.
+
+    Args:
+        kind: 'ga' 또는 'ad'
+        rows: 생성할 행 수
+    """
+    rng = np.random.default_rng(seed)
+    written = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        while written < rows:
+            size = min(GENERATOR_CHUNK, rows - written)
+            frame = GENERATORS[kind](rng, size, invalid_rate=invalid_rate)
+            frame.to_csv(f, index=False, header=(written == 0))
+            written += size
+    return Path(path)
+
+# ==================================================
+# SECTION 2: STAGE TIMING
+# ==================================================
+
+def _timed(results, rows, stage, func, *args, **kwargs):
+    """함수를 실행하고 소요 시간을 결과 목록에 추가합니다."""
+    started = time.perf_counter()
+    value = func(*args, **kwargs)
+    seconds = time.perf_counter() - started
+
+    results.append({
+        'rows': rows,
+        'stage': stage,
+        'seconds': round(seconds, 4),
+        'rows_per_sec': round(rows / seconds, 1) if seconds > 0 else None,
+    })
+    print(f"  {stage:<12} {seconds:>9.3f}s  ({rows / max(seconds, 1e-9):,.0f} rows/sec)")
+    return value
+
+def benchmark_size(rows, work_dir, engine='vectorized', invalid_rate=0.01,
+                   upload_latency=0.05, upload_concurrency=4, seed=0, async_upload=False):
+    """
+    한 입력 크기에 대해 각 단계를 측정합니다. (GA/Ad 각각 rows행)
+
+    Returns:
+        list: 단계별 측정 결과
+    """
+    results = []
+    print(f"\n▶ {rows:,} rows per file")
+
+    paths = {
+        kind: write_synthetic_csv(kind, Path(work_dir) / f"{kind}_bench_{rows}.csv", rows, seed, invalid_rate)
+        for kind in ('ga', 'ad')
+    }
+
+    aggregated = pd.DataFrame()
+    for kind, path in paths.items():
+        df = _timed(results, rows, f'{kind}.read_csv', pd.read_csv, path)
+        transformed, _ = _timed(results, rows, f'{kind}.transform',
+                                TRANSFORM_ENGINES[engine][kind], df, 'p_bench', 'landing_bench')
+        if 'conversions' in transformed.columns:
+            transformed = transformed.rename(columns={'conversions': 'purchase_conversions'})
+        partial = _timed(results, rows, f'{kind}.aggregate', aggregate_data, transformed)
+        aggregated = merge_aggregates(aggregated, partial)
+        del df, transformed
+
+    if async_upload:
+        client = FakeAsyncFirestoreClient(latency=upload_latency)
+        report = _timed(results, len(aggregated), 'upload', lambda: asyncio.run(async_upload_metrics(
+            client, 'metrics_daily', aggregated, max_in_flight=upload_concurrency
+        )))
+    else:
+        client = FakeFirestoreClient(latency=upload_latency)
+        report = _timed(results, len(aggregated), 'upload', upload_metrics,
+                        client, 'metrics_daily', aggregated, max_in_flight=upload_concurrency)
+    results[-1]['docs_per_sec'] = round(report['docs_per_sec'], 1)
+
+    for path in paths.values():
+        path.unlink()
+    return results
+
+# ==================================================
+# SECTION 3: MAIN EXECUTION
+# ==================================================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='ETL benchmark with synthetic GA/Ad data')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='파일당 행 수 목록 (기본: 10k 1M 10M)')
+    parser.add_argument('--engine', choices=sorted(TRANSFORM_ENGINES), default='vectorized')
+    parser.add_argument('--invalid-rate', type=float, default=0.01, help='잘못된 행 비율 (기본: 0.01)')
+    parser.add_argument('--upload-latency', type=float, default=0.05,
+                        help='Fake Firestore 커밋당 지연(초, 기본: 0.05)')
+    parser.add_argument('--upload-concurrency', type=int, default=4)
+    parser.add_argument('--async-upload', action='store_true', help='비동기 로더(async_upload_metrics)로 업로드 측정')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=Path, default=None, help='결과 JSON 경로')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    output = args.output or DEFAULT_OUTPUT_DIR / f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+
+    print("=" * 50)
+    print("ETL Benchmark")
+    print("=" * 50)
+
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for rows in args.sizes:
+            results.extend(benchmark_size(
+                rows, work_dir, engine=args.engine, invalid_rate=args.invalid_rate,
+                upload_latency=args.upload_latency, upload_concurrency=args.upload_concurrency,
+                seed=args.seed, async_upload=args.async_upload
+            ))
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'config': {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+        'peak_rss_mb': get_peak_rss_mb(),
+        'results': results,
+    }
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f"\n✓ Results written to {output}")
+
+if __name__ == '__main__':
+    main()
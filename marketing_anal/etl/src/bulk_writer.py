@@ -0,0 +1,197 @@
+"""
+==================================================
+Firestore Bulk Writer
+==================================================
+Concurrent, retrying batch writer used by the loaders:
+- Keeps several batch commits in flight at once (thread pool)
+- Retries transient failures with exponential backoff + jitter
+- Re-queues failed documents; non-transient batch failures are
+  split in half to isolate the offending documents
+- Reports throughput (docs/sec) and permanently failed doc IDs
+- A document whose data is None is deleted instead of written
+- SERVER_TIMESTAMP placeholders in the documents are replaced with
+  firestore.SERVER_TIMESTAMP at commit time, so documents can be
+  built (and dry-run) without loading the Firestore SDK
+- Retryable errors are listed by google.api_core exception name and
+  resolved on the first write, so importing the loaders does not
+  load grpc / google.api_core
+
+Works with firestore.Client, the Firestore emulator
+(FIRESTORE_EMULATOR_HOST) or any in-process fake that exposes
+collection(name).document(id) and batch().set()/delete()/commit().
+==================================================
+"""
+
+import time
+import random
+import logging
+from functools import lru_cache
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Get logger
+logger = logging.getLogger(__name__)
+
+BATCH_LIMIT = 400  # Firestore limit is 500, keeping safety margin
+
+# 재시도 대상 (일시적 장애) - 문자열은 google.api_core.exceptions의 클래스 이름 (retryable_errors에서 변환)
+TRANSIENT_ERRORS = (
+    'Aborted',
+    'DeadlineExceeded',
+    'InternalServerError',
+    'ResourceExhausted',
+    'ServiceUnavailable',
+    'TooManyRequests',
+    ConnectionError,
+    TimeoutError,
+)
+
+class ServerTimestamp:
+    """firestore.SERVER_TIMESTAMP 자리 표시자 (커밋 직전에 실제 sentinel로 교체)"""
+
+    def __repr__(self):
+        return 'SERVER_TIMESTAMP'
+
+SERVER_TIMESTAMP = ServerTimestamp()
+
+# 커밋이 반영되지 않았음이 확실한 일시적 에러 (멱등이 아닌 쓰기, 예: Increment 재시도용)
+# DeadlineExceeded/InternalServerError/연결 끊김은 서버에서 이미 반영되었을 수 있어 제외
+UNAPPLIED_ERRORS = (
+    'Aborted',
+    'ResourceExhausted',
+    'ServiceUnavailable',
+    'TooManyRequests',
+)
+
+@lru_cache(maxsize=8)
+def retryable_errors(retry_errors=TRANSIENT_ERRORS):
+    """
+    재시도 대상 목록의 예외 이름을 google.api_core.exceptions 클래스로 바꿉니다.
+    (grpc/google.api_core는 실제로 쓰기를 시작할 때만 import)
+
+    Returns:
+        tuple: isinstance에 쓸 예외 클래스 튜플
+    """
+    from google.api_core import exceptions as gcp_exceptions
+    return tuple(getattr(gcp_exceptions, error) if isinstance(error, str) else error for error in retry_errors)
+
+def is_transient_error(error, retry_errors=TRANSIENT_ERRORS):
+    """
+    재시도하면 성공할 수 있는 일시적 에러인지 판단합니다.
+    """
+    return isinstance(error, retryable_errors(retry_errors))
+
+def backoff_delay(attempt, base_delay=0.5, max_delay=30.0):
+    """
+    지수 백오프 대기 시간(초)을 계산합니다. (full jitter)
+
+    Args:
+        attempt (int): 재시도 횟수 (1부터 시작)
+    """
+    return random.uniform(0, min(max_delay, base_delay * (2 ** (attempt - 1))))
+
+def resolve_placeholders(doc_data):
+    """
+    문서의 SERVER_TIMESTAMP 자리 표시자(최상위 필드)를 firestore.SERVER_TIMESTAMP로 바꿉니다.
+    """
+    if not any(isinstance(value, ServerTimestamp) for value in doc_data.values()):
+        return doc_data
+
+    from google.cloud import firestore
+    return {
+        field: firestore.SERVER_TIMESTAMP if isinstance(value, ServerTimestamp) else value
+        for field, value in doc_data.items()
+    }
+
+def _commit_batch(db, collection_ref, documents, merge, delay):
+    """
+    문서 목록을 하나의 배치로 커밋합니다. (워커 스레드에서 실행)
+    """
+    if delay > 0:
+        time.sleep(delay)
+
+    batch = db.batch()
+    for doc_id, doc_data in documents:
+        if doc_data is None:
+            batch.delete(collection_ref.document(doc_id))
+        else:
+            batch.set(collection_ref.document(doc_id), resolve_placeholders(doc_data), merge=merge)
+    batch.commit()
+
+def bulk_write(db, collection_name, documents, batch_size=BATCH_LIMIT, max_in_flight=4,
+               max_attempts=5, base_delay=0.5, max_delay=30.0, merge=True, retry_errors=TRANSIENT_ERRORS):
+    """
+    문서들을 여러 배치로 나누어 동시에 커밋합니다.
+
+    Args:
+        db: Firestore 클라이언트 (또는 동일 인터페이스의 fake)
+        collection_name (str): 컬렉션 이름
+        documents (list): (doc_id, doc_data) 튜플 목록 (doc_data가 None이면 삭제)
+        batch_size (int): 배치당 문서 수 (최대 500)
+        max_in_flight (int): 동시에 진행할 커밋 수
+        max_attempts (int): 배치당 최대 시도 횟수 (일시적 에러)
+        merge (bool): batch.set의 merge 옵션
+        retry_errors (tuple): 재시도할 에러 타입 또는 google.api_core 예외 이름
+            (Increment 등 멱등이 아닌 쓰기는 UNAPPLIED_ERRORS)
+
+    Returns:
+        dict: written, failed_ids, retries, seconds, docs_per_sec
+    """
+    report = {'written': 0, 'failed_ids': [], 'retries': 0, 'seconds': 0.0, 'docs_per_sec': 0.0}
+    if not documents:
+        return report
+
+    started = time.perf_counter()
+    collection_ref = db.collection(collection_name)
+    retry_errors = retryable_errors(retry_errors)
+
+    # 대기 중인 배치: {'docs', 'attempt', 'delay'}
+    pending = deque(
+        {'docs': documents[i:i + batch_size], 'attempt': 1, 'delay': 0.0}
+        for i in range(0, len(documents), batch_size)
+    )
+    in_flight = {}
+
+    logger.info(f"Starting bulk write of {len(documents)} documents to '{collection_name}' "
+                f"({len(pending)} batches, {max_in_flight} in flight)")
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        while pending or in_flight:
+            while pending and len(in_flight) < max_in_flight:
+                job = pending.popleft()
+                future = pool.submit(_commit_batch, db, collection_ref, job['docs'], merge, job['delay'])
+                in_flight[future] = job
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = in_flight.pop(future)
+                error = future.exception()
+
+                if error is None:
+                    report['written'] += len(job['docs'])
+                    continue
+
+                if is_transient_error(error, retry_errors) and job['attempt'] < max_attempts:
+                    # 일시적 장애: 백오프 후 같은 배치를 재시도
+                    report['retries'] += 1
+                    delay = backoff_delay(job['attempt'], base_delay, max_delay)
+                    logger.warning(f"⚠ Batch of {len(job['docs'])} failed (attempt {job['attempt']}), "
+                                   f"retrying in {delay:.2f}s: {str(error)}")
+                    pending.append({'docs': job['docs'], 'attempt': job['attempt'] + 1, 'delay': delay})
+                elif not is_transient_error(error, retry_errors) and len(job['docs']) > 1:
+                    # 영구 에러: 배치를 반으로 나누어 문제 문서를 격리
+                    half = len(job['docs']) // 2
+                    pending.append({'docs': job['docs'][:half], 'attempt': job['attempt'], 'delay': 0.0})
+                    pending.append({'docs': job['docs'][half:], 'attempt': job['attempt'], 'delay': 0.0})
+                else:
+                    failed_ids = [doc_id for doc_id, _ in job['docs']]
+                    report['failed_ids'].extend(failed_ids)
+                    logger.error(f"✗ Permanently failed to write {len(failed_ids)} documents: {str(error)}")
+
+    report['seconds'] = time.perf_counter() - started
+    if report['seconds'] > 0:
+        report['docs_per_sec'] = report['written'] / report['seconds']
+
+    logger.info(f"✓ Bulk write completed: {report['written']}/{len(documents)} documents, "
+                f"{report['docs_per_sec']:.1f} docs/sec, {report['retries']} retries")
+    return report
@@ -0,0 +1,256 @@
+"""
+==================================================
+ETL Command Line Entry Point
+==================================================
+Fast-start front end for the pipeline in main.py. Only the standard
+library is imported up front; pandas and the pipeline modules are
+imported when a subcommand actually runs, and only `upload` (without
+--dry-run) creates a Firestore client. `--help` and argument errors
+return immediately.
+
+Subcommands:
+- validate:  transform + validate input files, write reject reports
+             (data/rejects/); exit code 1 if a file fails
+             (--strict: also if any row is rejected)
+- transform: validate, then write the transformed rows (--output)
+- aggregate: transform, aggregate and join GA x Ad metrics (--output)
+- upload:    the full pipeline; every main.py option is accepted
+             (upload --dry-run: no credentials, no Firestore)
+
+validate / transform / aggregate never contact Firestore and do not
+touch the manifest, fingerprints, staging or local query store; they
+read all input files (data/input or the given ga_*/ad_* files).
+Startup time (from launch to the first input file, imports
+included) is logged for every subcommand.
+
+Usage:
+    python src/cli.py validate --strict
+    python src/cli.py transform data/input/ga_2025_11.csv --output ga.parquet
+    python src/cli.py aggregate --partitions partitions.json --output daily.csv
+    python src/cli.py upload --workers 4
+    python src/cli.py upload --dry-run
+==================================================
+"""
+
+import time
+
+# 시작 시간 (main.py 등 무거운 모듈 import 전)
+_started = time.perf_counter()
+
+import sys
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+sys.path.append(str(Path(__file__).parent))
+
+# ==================================================
+# SECTION 1: LAZY PIPELINE IMPORT
+# ==================================================
+
+def load_pipeline():
+    """
+    main 모듈을 import합니다. (pandas, 변환/적재 모듈 포함, Firestore SDK 제외)
+
+    Returns:
+        tuple: (main 모듈, import 소요 시간(초))
+    """
+    started = time.perf_counter()
+    import main as pipeline
+    pipeline.load_dependencies()
+    return pipeline, time.perf_counter() - started
+
+def pipeline_argv(args):
+    """
+    서브커맨드 옵션을 main.parse_args 인자로 옮깁니다. (같은 검증 규칙 적용, 항상 --dry-run)
+    """
+    argv = ['--dry-run', '--engine', args.engine, '--skip-log', args.skip_log]
+    if args.verify_transform:
+        argv.append('--verify-transform')
+    if args.channel_rules:
+        argv += ['--channel-rules', args.channel_rules]
+    if args.partitions:
+        argv += ['--partitions', args.partitions]
+    if getattr(args, 'chunksize', None):
+        argv += ['--chunksize', str(args.chunksize)]
+    if getattr(args, 'workers', 1) > 1:
+        argv += ['--workers', str(args.workers)]
+    return argv
+
+# ==================================================
+# SECTION 2: SUBCOMMANDS
+# ==================================================
+
+def write_output(df, output):
+    """
+    결과를 CSV 또는 Parquet(.parquet, pyarrow 필요)로 저장합니다.
+    """
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    if output.suffix.lower() == '.parquet':
+        df.to_parquet(output, index=False)
+    else:
+        df.to_csv(output, index=False)
+
+def report_versions(pipeline, files):
+    """
+    실행 전 입력 파일별 거부 리포트(data/rejects)의 수정 시각
+
+    Returns:
+        dict: 리포트 경로 -> st_mtime_ns (리포트가 없으면 제외)
+    """
+    paths = [pipeline.RejectReport(file_path).path for file_path in files]
+    return {path: path.stat().st_mtime_ns for path in paths if path.exists()}
+
+def count_rejected_rows(pipeline, file_timings, previous_versions):
+    """
+    파일별 거부 행 수를 이번 실행에서 작성된 리포트(data/rejects)로 셉니다.
+    리포트를 쓰기 전에 실패한 파일(CSV 로드 에러 등)에 남아 있는 이전 실행의 리포트는 세지 않습니다.
+
+    Args:
+        previous_versions (dict): 실행 전 report_versions 결과 (수정 시각이 그대로인 리포트는 이전 실행의 것)
+
+    Returns:
+        dict: 파일 이름 -> 거부 행 수
+    """
+    counts = {}
+    for result in file_timings:
+        path = pipeline.RejectReport(result['path']).path
+        written = path.exists() and previous_versions.get(path) != path.stat().st_mtime_ns
+        counts[result['file']] = len(pipeline.pd.read_csv(path)) if written else 0
+    return counts
+
+def run_command(args):
+    """
+    validate / transform / aggregate 공통 실행: 변환(+집계)까지 수행하고 실행 요약을 남깁니다.
+
+    Returns:
+        int: 종료 코드
+    """
+    pipeline, import_seconds = load_pipeline()
+    pipeline_args = pipeline.parse_args(pipeline_argv(args))
+    pipeline.setup_logging()
+    logger = pipeline.logger
+
+    logger.info("="*50)
+    logger.info(f"ETL {args.command.capitalize()} Started")
+    logger.info("="*50)
+
+    ignored = [f.name for f in args.files if not f.name.startswith(('ga_', 'ad_'))]
+    if ignored:
+        logger.warning(f"⚠ Ignoring files not named ga_*.csv / ad_*.csv: {', '.join(ignored)}")
+
+    start_time = datetime.now()
+    previous_reports = report_versions(pipeline, args.files)
+    profiler = pipeline.RunProfiler()
+    profiler.start()
+    stats = pipeline.new_run_stats()
+    pipeline_args.command = args.command
+
+    try:
+        with pipeline.stage('initialize'):
+            config = pipeline.initialize_dry_run(pipeline_args)
+        stats['import_seconds'] = import_seconds
+        stats['startup_seconds'] = time.perf_counter() - _started
+
+        all_data, aggregated_df, file_timings = pipeline.process_input_files(
+            pipeline_args, config, profiler, stats, input_files=args.files or None
+        )
+        output_df = None
+        if args.command == 'transform' and all_data:
+            output_df = pipeline.concat_compact(all_data)
+        elif args.command == 'aggregate':
+            aggregated_df = pipeline.combine_file_results(all_data, aggregated_df, stats)
+            if not aggregated_df.empty:
+                logger.info(f"✓ Aggregated to {len(aggregated_df)} unique records")
+                output_df = pipeline.join_aggregates(aggregated_df, stats)
+                pipeline.count_partition_records(output_df, stats)
+
+        if args.command != 'validate' and args.output:
+            if output_df is None:
+                logger.warning("⚠ No valid data to write")
+            else:
+                write_output(output_df, args.output)
+                logger.info(f"✓ Wrote {len(output_df)} rows to {args.output}")
+
+        rejected = count_rejected_rows(pipeline, file_timings, previous_reports)
+        stats['rows_rejected'] = sum(rejected.values())
+        if stats['rows_rejected']:
+            logger.warning(f"⚠ {stats['rows_rejected']} rows rejected in "
+                           f"{sum(1 for count in rejected.values() if count)} files (see data/rejects)")
+        pipeline.log_run_summary(pipeline_args, stats, file_timings, profiler, start_time)
+    except Exception as e:
+        logger.error(f"✗ ETL {args.command} failed: {str(e)}")
+        stats['error'] = str(e)
+        raise
+    finally:
+        pipeline.write_run_report(profiler, pipeline_args, stats, start_time)
+
+    if stats['files_failed']:
+        return 1
+    if getattr(args, 'strict', False) and stats['rows_rejected']:
+        return 1
+    return 0
+
+def run_upload(pipeline_options):
+    """
+    전체 파이프라인(main.main)을 실행합니다. 옵션은 main.py와 같습니다.
+    """
+    pipeline, _ = load_pipeline()
+    pipeline.main(pipeline_options)
+    return 0
+
+# ==================================================
+# SECTION 3: ARGUMENTS
+# ==================================================
+
+def parse_args(argv=None):
+    """
+    커맨드라인 인자를 파싱합니다. (표준 라이브러리만 사용)
+
+    Returns:
+        tuple: (args, upload 서브커맨드에 넘길 main.py 옵션)
+    """
+    # validate / transform / aggregate 공통 옵션 (main.py와 같은 이름)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('files', nargs='*', type=Path,
+                        help='처리할 ga_*.csv / ad_*.csv 파일 (기본: data/input 전체)')
+    common.add_argument('--engine', default='vectorized', help='변환 엔진: vectorized (기본) 또는 row')
+    common.add_argument('--verify-transform', action='store_true', help='벡터화 결과를 행 단위 결과와 비교 검증')
+    common.add_argument('--channel-rules', default=None, help='채널 매핑 규칙 설정 파일 (JSON/CSV)')
+    common.add_argument('--partitions', default=None, help='파일 -> project_id/landing_id 라우팅 규칙 파일 (JSON/CSV)')
+    common.add_argument('--skip-log', default='summary', help='스킵된 행 로그: summary (기본) 또는 rows')
+
+    parser = argparse.ArgumentParser(description='Marketing Analytics ETL command line')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    command = commands.add_parser('validate', parents=[common],
+                                  help='변환/검증만 수행하고 거부 행 리포트 작성 (Firestore 없음)')
+    command.add_argument('--strict', action='store_true', help='거부된 행이 하나라도 있으면 종료 코드 1')
+
+    command = commands.add_parser('transform', parents=[common],
+                                  help='검증된 변환 결과를 파일로 저장 (Firestore 없음)')
+    command.add_argument('--output', type=Path, help='결과 파일 (.csv 또는 .parquet)')
+
+    command = commands.add_parser('aggregate', parents=[common],
+                                  help='집계 + GA x 광고 매칭 결과를 파일로 저장 (Firestore 없음)')
+    command.add_argument('--output', type=Path, help='결과 파일 (.csv 또는 .parquet)')
+    command.add_argument('--chunksize', type=int, default=None, help='스트리밍 모드: CSV를 N행 단위로 읽어 부분 집계')
+    command.add_argument('--workers', type=int, default=1, help='병렬 모드: N개 프로세스로 파일 단위 처리')
+
+    commands.add_parser('upload', help='전체 파이프라인 실행 (main.py 옵션 사용, --dry-run 지원)',
+                        description='Runs main.py with the remaining options; see python src/main.py --help')
+
+    args, extra = parser.parse_known_args(argv)
+    if extra and args.command != 'upload':
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    return args, extra
+
+def main(argv=None):
+    args, pipeline_options = parse_args(argv)
+    if args.command == 'upload':
+        return run_upload(pipeline_options)
+    return run_command(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
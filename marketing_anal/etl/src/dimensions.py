@@ -0,0 +1,333 @@
+"""
+==================================================
+Bulk Dimension Loader (landings / annotations)
+==================================================
+Streams dimension records from CSV or JSONL files into Firestore
+with the same concurrent, retrying writer as the metrics upload
+(loaders.write_documents -> bulk_writer.bulk_write):
+- Files are read in chunks (--chunksize rows), so catalogs of
+  thousands of landing pages / annotation logs never sit in one
+  batch; commits are split into BATCH_LIMIT-sized batches
+- Each document is compared with the local fingerprint snapshot
+  (data/state/upload_fingerprints.{target}.sqlite) and only new or changed
+  documents are written (--full-upload writes everything)
+- Invalid rows are skipped and reported to
+  data/rejects/{file}.{path hash}.rejects.csv (same format as the ETL)
+- Every write sets updated_at; created_at is set only for documents
+  that are not in the fingerprint snapshot yet, so merge writes keep
+  the original creation time
+
+Record fields:
+- landings: landing_id (required), name (required), url,
+  is_active (true/false), file_pattern / regex (partition rules)
+- annotations: date (required), note (required), type,
+  annotation_id (optional, derived from the content if missing)
+- project_id: per-row value, or --project / PROJECT_ID
+
+Usage:
+    python src/dimensions.py landings data/seed/landings.csv
+    python src/dimensions.py annotations logs/annotations_*.jsonl --project p_main
+    python src/dimensions.py landings catalog.csv --dry-run    # 검증만 (쓰기 없음)
+==================================================
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+from pathlib import Path
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent))
+from transformers import normalize_date
+from loaders import write_documents, SERVER_TIMESTAMP
+from fingerprints import fingerprint_target, open_fingerprint_store, load_fingerprints
+from validation import RejectReport
+from firestore_client import load_environment, create_client
+
+DEFAULT_SEED_DIR = Path(__file__).parent.parent / 'data' / 'seed'
+
+# 한 번에 읽어 비교/업로드할 레코드 수
+DEFAULT_CHUNKSIZE = 5000
+
+BOOLEAN_VALUES = {
+    'true': True, '1': True, 'yes': True, 'y': True,
+    'false': False, '0': False, 'no': False, 'n': False,
+}
+
+# ==================================================
+# SECTION 1: DIMENSION SCHEMAS
+# ==================================================
+
+LANDING_SCHEMA = {
+    'collection': 'landings',
+    'id_field': 'landing_id',
+    'required': ['landing_id', 'name'],
+    'boolean': ['is_active'],
+    'dates': [],
+    'defaults': {'is_active': True},
+}
+
+ANNOTATION_SCHEMA = {
+    'collection': 'annotations',
+    'id_field': 'annotation_id',
+    'required': ['date', 'note'],
+    'boolean': [],
+    'dates': ['date'],
+    'defaults': {},
+}
+
+DIMENSIONS = {'landings': LANDING_SCHEMA, 'annotations': ANNOTATION_SCHEMA}
+
+# ==================================================
+# SECTION 2: READING
+# ==================================================
+
+def iter_record_chunks(file_path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    CSV 또는 JSONL 파일을 청크 단위로 읽습니다.
+    JSONL의 빈 줄은 건너뛰고, 파싱할 수 없는 줄은 에러 사유로 전달합니다.
+
+    Args:
+        file_path: .csv / .jsonl (.ndjson) 경로
+        chunksize (int): 청크당 레코드 수
+
+    Yields:
+        list: (row, record) 튜플 목록 - row는 데이터 행 번호(0부터), record는 dict 또는 에러 사유(str)
+    """
+    file_path = Path(file_path)
+    if file_path.suffix.lower() in ('.jsonl', '.ndjson'):
+        chunk = []
+        with open(file_path, encoding='utf-8') as f:
+            for row, line in enumerate(f):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    if not isinstance(record, dict):
+                        record = "Invalid JSON: expected an object"
+                except json.JSONDecodeError as e:
+                    record = f"Invalid JSON: {e.msg}"
+                chunk.append((row, record))
+                if len(chunk) >= chunksize:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+        return
+
+    reader = pd.read_csv(file_path, dtype=str, keep_default_na=False, chunksize=chunksize)
+    for frame in reader:
+        yield list(zip(frame.index.tolist(), frame.to_dict('records')))
+
+# ==================================================
+# SECTION 3: DOCUMENTS
+# ==================================================
+
+def _clean_value(value):
+    """문자열은 앞뒤 공백 제거, 빈 값은 None"""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+def annotation_id_for(doc):
+    """annotation_id가 없는 로그의 문서 ID (같은 내용이면 같은 ID)"""
+    key = '|'.join(str(doc.get(field, '')) for field in ('project_id', 'date', 'type', 'note'))
+    return 'note_' + hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+
+def build_dimension_document(record, schema, project_id):
+    """
+    레코드 하나를 Firestore 문서로 변환합니다.
+    빈 값은 문서에서 빠지므로 merge 쓰기 시 기존 필드를 지우지 않습니다.
+
+    Args:
+        record (dict): CSV 행 또는 JSONL 객체
+        schema (dict): LANDING_SCHEMA / ANNOTATION_SCHEMA
+        project_id (str): 레코드에 project_id가 없을 때 사용할 값
+
+    Returns:
+        tuple: (doc_id, doc_data)
+
+    Raises:
+        ValueError: 필수 필드 누락, 잘못된 날짜/불리언 값
+    """
+    doc = {}
+    for field, value in record.items():
+        value = _clean_value(value)
+        if value is not None:
+            doc[str(field).strip()] = value
+
+    doc.setdefault('project_id', project_id)
+    for field in schema['required']:
+        if field not in doc:
+            raise ValueError(f"Missing required field: {field}")
+
+    for field in schema['dates']:
+        if field in doc:
+            doc[field] = normalize_date(doc[field])
+
+    for field in schema['boolean']:
+        if field in doc and not isinstance(doc[field], bool):
+            flag = BOOLEAN_VALUES.get(str(doc[field]).lower())
+            if flag is None:
+                raise ValueError(f"Invalid boolean value: {field}={doc[field]}")
+            doc[field] = flag
+
+    for field, value in schema['defaults'].items():
+        doc.setdefault(field, value)
+
+    id_field = schema['id_field']
+    if id_field not in doc:
+        doc[id_field] = annotation_id_for(doc)
+    doc[id_field] = str(doc[id_field])
+    doc['updated_at'] = SERVER_TIMESTAMP
+
+    return doc[id_field], doc
+
+def build_dimension_documents(chunk, schema, project_id):
+    """
+    청크의 레코드들을 문서로 변환합니다. 같은 문서 ID가 여러 번 나오면 마지막 행을 사용합니다.
+
+    Returns:
+        tuple: (documents, reasons)
+            - documents: (doc_id, doc_data) 튜플 목록
+            - reasons: 행 번호 -> 에러 사유 (RejectReport용)
+    """
+    documents = {}
+    reasons = {}
+    for row, record in chunk:
+        if isinstance(record, str):
+            reasons[row] = record
+            continue
+        try:
+            doc_id, doc = build_dimension_document(record, schema, project_id)
+        except ValueError as e:
+            reasons[row] = str(e)
+            continue
+        documents[doc_id] = doc
+    return list(documents.items()), reasons
+
+def mark_new_documents(documents, collection_name, fingerprint_store=None):
+    """
+    처음 쓰는 문서(fingerprint 저장소에 없는 문서)에만 created_at을 추가합니다.
+    이미 업로드된 문서는 merge 쓰기에서 기존 created_at이 유지됩니다. (저장소가 없으면 모두 새 문서로 간주)
+
+    Args:
+        documents (list): (doc_id, doc_data) 튜플 목록 (doc_data를 직접 수정)
+    """
+    known = {}
+    if fingerprint_store is not None and documents:
+        known = load_fingerprints(fingerprint_store, collection_name, [doc_id for doc_id, _ in documents])
+    for doc_id, doc in documents:
+        if doc_id not in known:
+            doc['created_at'] = SERVER_TIMESTAMP
+
+# ==================================================
+# SECTION 4: LOADING
+# ==================================================
+
+def load_dimension_file(db, dimension, file_path, project_id, fingerprint_store=None, force=False,
+                        chunksize=DEFAULT_CHUNKSIZE, dry_run=False, **writer_options):
+    """
+    파일 하나를 청크 단위로 읽어 변경된 문서만 업로드합니다.
+
+    Args:
+        db: Firestore 클라이언트 (dry_run이면 None 가능)
+        dimension (str): 'landings' / 'annotations'
+        file_path: CSV / JSONL 경로
+        project_id (str): 기본 project_id
+        fingerprint_store (sqlite3.Connection): 지정 시 내용이 바뀐 문서만 업로드
+        force (bool): True이면 fingerprint와 무관하게 전체 업로드
+        dry_run (bool): 검증과 거부 리포트만 수행 (쓰기 없음)
+        **writer_options: bulk_write 옵션 (max_in_flight, max_attempts 등)
+
+    Returns:
+        dict: records, rejected, written, failed_ids, retries, seconds, inserted, updated, skipped
+    """
+    schema = DIMENSIONS[dimension]
+    report = RejectReport(file_path)
+    totals = {'records': 0, 'rejected': 0, 'written': 0, 'failed_ids': [], 'retries': 0,
+              'seconds': 0.0, 'inserted': 0, 'updated': 0, 'skipped': 0}
+
+    for chunk in iter_record_chunks(file_path, chunksize):
+        documents, reasons = build_dimension_documents(chunk, schema, project_id)
+        totals['records'] += len(chunk)
+        report.add('transform', pd.Series(reasons, dtype=object))
+        if dry_run or not documents:
+            continue
+
+        mark_new_documents(documents, schema['collection'], fingerprint_store)
+        result = write_documents(
+            db, schema['collection'], documents,
+            fingerprint_store=fingerprint_store, force=force, merge=True, **writer_options
+        )
+        totals['failed_ids'] = totals['failed_ids'] + result['failed_ids']
+        for key in ('written', 'retries', 'seconds', 'inserted', 'updated', 'skipped'):
+            totals[key] += result[key]
+
+    totals['rejected'] = report.count
+    totals['rejects_path'] = report.write()
+    return totals
+
+# ==================================================
+# SECTION 5: CLI
+# ==================================================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Bulk load landings / annotations from CSV or JSONL')
+    parser.add_argument('dimension', choices=sorted(DIMENSIONS), help='대상 컬렉션')
+    parser.add_argument('files', nargs='+', type=Path, help='CSV / JSONL 파일')
+    parser.add_argument('--project', default=None, help='project_id 컬럼이 없을 때 사용할 값 (기본: PROJECT_ID)')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help='청크당 레코드 수')
+    parser.add_argument('--upload-concurrency', type=int, default=4, help='동시에 진행할 배치 커밋 수')
+    parser.add_argument('--upload-attempts', type=int, default=5, help='배치당 최대 시도 횟수')
+    parser.add_argument('--full-upload', action='store_true', help='fingerprint 비교 없이 전체 업로드')
+    parser.add_argument('--dry-run', action='store_true', help='검증만 수행 (Firestore 연결/쓰기 없음)')
+
+    args = parser.parse_args(argv)
+    if args.chunksize < 1:
+        parser.error('--chunksize must be >= 1')
+    if args.upload_concurrency < 1:
+        parser.error('--upload-concurrency must be >= 1')
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    load_environment()
+    project_id = args.project or os.getenv('PROJECT_ID', 'p_main')
+
+    db = None if args.dry_run else create_client()
+    fingerprint_store = None if args.dry_run else open_fingerprint_store(fingerprint_target(db))
+    failed = False
+    try:
+        for file_path in args.files:
+            print(f"📄 {args.dimension}: {file_path.name}")
+            result = load_dimension_file(
+                db, args.dimension, file_path, project_id,
+                fingerprint_store=fingerprint_store, force=args.full_upload,
+                chunksize=args.chunksize, dry_run=args.dry_run,
+                max_in_flight=args.upload_concurrency, max_attempts=args.upload_attempts
+            )
+            print(f"  - Records: {result['records']}, rejected: {result['rejected']}")
+            if result['rejects_path']:
+                print(f"  ⚠ Rejected rows: {result['rejects_path']}")
+            if not args.dry_run:
+                print(f"  - Written: {result['written']} ({result['inserted']} new, "
+                      f"{result['updated']} changed, {result['skipped']} unchanged) "
+                      f"in {result['seconds']:.2f}s")
+            if result['failed_ids']:
+                failed = True
+                print(f"  ✗ Failed documents ({len(result['failed_ids'])}): {result['failed_ids'][:10]}")
+    finally:
+        if fingerprint_store is not None:
+            fingerprint_store.close()
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+"""
+==================================================
+In-Process Fake Firestore Client
+==================================================
+Minimal stand-in for google.cloud.firestore.Client used by the
+benchmark harness and for local runs without credentials.
+
+Supports the subset of the API the loaders use:
+- collection(name).document(id)
+- batch().set(ref, data, merge=...) / batch().delete(ref) / batch().commit()
+- collection(name).where(filter=FieldFilter(...)).stream()
+- document(id).get() / document(id).update(...)
+
+set(..., merge=True) merges nested maps field by field and applies
+firestore.Increment transforms (also inside maps), like the server.
+
+Optional per-commit latency emulates the network round trip,
+and failure_rate injects transient ServiceUnavailable errors.
+
+FakeAsyncFirestoreClient is the firestore.AsyncClient counterpart
+(awaitable batch().commit()) for the async loader.
+==================================================
+"""
+
+import time
+import random
+import asyncio
+import operator
+import threading
+from google.api_core import exceptions as gcp_exceptions
+from google.cloud.firestore_v1.transforms import Increment
+
+_OPERATORS = {
+    '==': operator.eq,
+    '>=': operator.ge,
+    '<=': operator.le,
+    '>': operator.gt,
+    '<': operator.lt,
+}
+
+def _merge_fields(current, data):
+    """
+    merge=True 쓰기를 적용합니다. (map은 필드 단위로 병합, Increment는 기존 값에 더함)
+    """
+    merged = dict(current)
+    for field, value in data.items():
+        existing = merged.get(field)
+        if isinstance(value, Increment):
+            base = existing if isinstance(existing, (int, float)) else 0
+            merged[field] = base + value.value
+        elif isinstance(value, dict):
+            merged[field] = _merge_fields(existing if isinstance(existing, dict) else {}, value)
+        else:
+            merged[field] = value
+    return merged
+
+class FakeSnapshot:
+    """document.get() / query.stream() 결과"""
+
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+class FakeDocument:
+    def __init__(self, client, collection_name, doc_id):
+        self._client = client
+        self._collection_name = collection_name
+        self.id = doc_id
+
+    def get(self):
+        return FakeSnapshot(self.id, self._client._read(self._collection_name, self.id))
+
+    def set(self, data, merge=False):
+        self._client._write(self._collection_name, self.id, data, merge)
+
+    def update(self, data):
+        self._client._write(self._collection_name, self.id, data, merge=True)
+
+    def delete(self):
+        self._client._delete(self._collection_name, self.id)
+
+class FakeQuery:
+    def __init__(self, client, collection_name, filters=()):
+        self._client = client
+        self._collection_name = collection_name
+        self._filters = list(filters)
+
+    def where(self, filter):
+        condition = (filter.field_path, filter.op_string, filter.value)
+        return FakeQuery(self._client, self._collection_name, self._filters + [condition])
+
+    def stream(self):
+        for doc_id, data in self._client._scan(self._collection_name):
+            if all(field in data and _OPERATORS[op](data[field], value) for field, op, value in self._filters):
+                yield FakeSnapshot(doc_id, data)
+
+class FakeCollection(FakeQuery):
+    def document(self, doc_id):
+        return FakeDocument(self._client, self._collection_name, doc_id)
+
+class FakeBatch:
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def set(self, doc_ref, data, merge=False):
+        self._writes.append((doc_ref, data, merge))
+
+    def update(self, doc_ref, data):
+        self._writes.append((doc_ref, data, True))
+
+    def delete(self, doc_ref):
+        self._writes.append((doc_ref, None, False))
+
+    def commit(self):
+        self._client._commit(self._writes)
+
+class FakeFirestoreClient:
+    """
+    스레드 안전한 인메모리 Firestore 클라이언트.
+
+    Args:
+        latency (float): 배치 커밋당 지연 시간(초)
+        failure_rate (float): 커밋이 일시적 에러로 실패할 확률 (0~1)
+    """
+
+    def __init__(self, latency=0.0, failure_rate=0.0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.commits = 0
+        self._store = {}
+        self._lock = threading.Lock()
+
+    def collection(self, name):
+        return FakeCollection(self, name)
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def documents(self, collection_name):
+        """저장된 문서를 dict(doc_id -> data)로 반환합니다. (검증용)"""
+        with self._lock:
+            return {doc_id: dict(data) for doc_id, data in self._store.get(collection_name, {}).items()}
+
+    def _read(self, collection_name, doc_id):
+        with self._lock:
+            data = self._store.get(collection_name, {}).get(doc_id)
+            return dict(data) if data is not None else None
+
+    def _scan(self, collection_name):
+        with self._lock:
+            return [(doc_id, dict(data)) for doc_id, data in self._store.get(collection_name, {}).items()]
+
+    def _write(self, collection_name, doc_id, data, merge):
+        with self._lock:
+            collection = self._store.setdefault(collection_name, {})
+            current = collection.get(doc_id, {}) if merge else {}
+            collection[doc_id] = _merge_fields(current, data)
+
+    def _delete(self, collection_name, doc_id):
+        with self._lock:
+            self._store.get(collection_name, {}).pop(doc_id, None)
+
+    def _apply(self, writes):
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise gcp_exceptions.ServiceUnavailable('fake transient failure')
+
+        with self._lock:
+            self.commits += 1
+        for doc_ref, data, merge in writes:
+            if data is None:
+                self._delete(doc_ref._collection_name, doc_ref.id)
+            else:
+                self._write(doc_ref._collection_name, doc_ref.id, data, merge)
+
+    def _commit(self, writes):
+        if self.latency:
+            time.sleep(self.latency)
+        self._apply(writes)
+
+class FakeAsyncBatch(FakeBatch):
+    async def commit(self):
+        await self._client._commit_async(self._writes)
+
+class FakeAsyncFirestoreClient(FakeFirestoreClient):
+    """
+    firestore.AsyncClient 대역. 배치 커밋만 비동기로 동작합니다. (async_writer용)
+    """
+
+    def batch(self):
+        return FakeAsyncBatch(self)
+
+    async def _commit_async(self, writes):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self._apply(writes)
@@ -0,0 +1,164 @@
+"""
+==================================================
+Upload Fingerprint Store
+==================================================
+Local SQLite manifest mapping each uploaded document ID
+(e.g. date_project_landing_channel) to a hash of its payload.
+
+The uploader writes only new or changed documents:
+- inserted: doc ID not seen before
+- updated: payload hash differs from the stored one
+- skipped: payload hash unchanged
+
+One store per upload target (Firestore project or emulator host):
+data/state/upload_fingerprints.{target}.sqlite. Pointing the ETL at
+another project or at the emulator starts from an empty store, so
+documents are never skipped because they exist somewhere else.
+==================================================
+"""
+
+import os
+import re
+import json
+import sqlite3
+import hashlib
+from pathlib import Path
+from firestore_client import target_project
+
+DEFAULT_STATE_DIR = Path(__file__).parent.parent / 'data' / 'state'
+
+# 해시에서 제외할 필드 (매 실행마다 달라지는 값)
+VOLATILE_FIELDS = {'updated_at', 'created_at'}
+
+# SQLite IN 절 파라미터 개수 제한 대응
+LOOKUP_CHUNK = 500
+
+def fingerprint_target(db=None):
+    """
+    업로드 대상 이름을 반환합니다. ('{에뮬레이터 호스트 또는 firestore}/{프로젝트}')
+
+    Args:
+        db: Firestore 클라이언트 (project 속성이 없거나 None이면 환경 변수/서비스 계정 키로 확인)
+    """
+    host = os.getenv('FIRESTORE_EMULATOR_HOST') or 'firestore'
+    project = getattr(db, 'project', None) or target_project() or 'default'
+    return f"{host}/{project}"
+
+def fingerprint_store_path(target):
+    """대상별 저장소 경로 (data/state/upload_fingerprints.{target}.sqlite)"""
+    slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', target).strip('_')
+    return DEFAULT_STATE_DIR / f"upload_fingerprints.{slug}.sqlite"
+
+def open_fingerprint_store(target, path=None):
+    """
+    업로드 대상의 Fingerprint 저장소(SQLite)를 열고 테이블을 준비합니다.
+
+    Args:
+        target (str): fingerprint_target 결과
+        path: 저장소 경로 (기본: fingerprint_store_path(target))
+
+    Returns:
+        sqlite3.Connection
+    """
+    path = Path(path) if path is not None else fingerprint_store_path(target)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(str(path))
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS fingerprints (
+            collection TEXT NOT NULL,
+            doc_id TEXT NOT NULL,
+            hash TEXT NOT NULL,
+            PRIMARY KEY (collection, doc_id)
+        )
+        """
+    )
+    return conn
+
+def payload_hash(doc_data):
+    """
+    문서 데이터의 내용 해시를 계산합니다. (VOLATILE_FIELDS 제외)
+    """
+    payload = {k: v for k, v in doc_data.items() if k not in VOLATILE_FIELDS}
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()
+
+def load_fingerprints(conn, collection_name, doc_ids):
+    """
+    주어진 문서 ID들의 저장된 해시를 조회합니다.
+
+    Returns:
+        dict: doc_id -> hash
+    """
+    stored = {}
+    for i in range(0, len(doc_ids), LOOKUP_CHUNK):
+        chunk = doc_ids[i:i + LOOKUP_CHUNK]
+        placeholders = ','.join('?' * len(chunk))
+        rows = conn.execute(
+            f"SELECT doc_id, hash FROM fingerprints WHERE collection = ? AND doc_id IN ({placeholders})",
+            [collection_name, *chunk]
+        )
+        stored.update(rows.fetchall())
+    return stored
+
+def diff_documents(conn, collection_name, documents):
+    """
+    업로드할 문서를 저장된 해시와 비교하여 변경된 문서만 골라냅니다.
+
+    Args:
+        documents (list): (doc_id, doc_data) 튜플 목록
+
+    Returns:
+        tuple: (changed_documents, hashes, counts)
+            - changed_documents: 새로 쓰거나 갱신할 문서 목록
+            - hashes: doc_id -> 새 해시 (changed_documents에 대해서만)
+            - counts: {'inserted', 'updated', 'skipped'}
+    """
+    stored = load_fingerprints(conn, collection_name, [doc_id for doc_id, _ in documents])
+
+    changed_documents = []
+    hashes = {}
+    counts = {'inserted': 0, 'updated': 0, 'skipped': 0}
+
+    for doc_id, doc_data in documents:
+        new_hash = payload_hash(doc_data)
+        old_hash = stored.get(doc_id)
+
+        if old_hash == new_hash:
+            counts['skipped'] += 1
+            continue
+
+        counts['inserted' if old_hash is None else 'updated'] += 1
+        changed_documents.append((doc_id, doc_data))
+        hashes[doc_id] = new_hash
+
+    return changed_documents, hashes, counts
+
+def save_fingerprints(conn, collection_name, hashes):
+    """
+    업로드에 성공한 문서들의 해시를 저장합니다.
+
+    Args:
+        hashes (dict): doc_id -> hash
+    """
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO fingerprints (collection, doc_id, hash) VALUES (?, ?, ?)",
+            [(collection_name, doc_id, h) for doc_id, h in hashes.items()]
+        )
+
+def forget_fingerprints(conn, collection_name, doc_ids):
+    """
+    문서들의 저장된 해시를 삭제합니다.
+    서버에서 Increment로 값이 바뀐 문서는 해시가 실제 내용과 달라지므로 다음 업로드 때 다시 쓰도록 합니다.
+    """
+    doc_ids = list(doc_ids)
+    with conn:
+        for i in range(0, len(doc_ids), LOOKUP_CHUNK):
+            chunk = doc_ids[i:i + LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            conn.execute(
+                f"DELETE FROM fingerprints WHERE collection = ? AND doc_id IN ({placeholders})",
+                [collection_name, *chunk]
+            )
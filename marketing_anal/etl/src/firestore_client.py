@@ -0,0 +1,107 @@
+"""
+==================================================
+Firestore Client Factory
+==================================================
+Single place that creates Firestore clients for the ETL (main.py)
+and the seed script (seed_data.py):
+- loads .env and resolves the service account key
+  (GOOGLE_APPLICATION_CREDENTIALS, falling back to
+  ./service-account-key.json)
+- honours FIRESTORE_EMULATOR_HOST (no credentials needed)
+- returns either the synchronous firestore.Client or the
+  asyncio firestore.AsyncClient (close_async_client releases its
+  gRPC channel inside the event loop that created it)
+==================================================
+"""
+
+import os
+import json
+from pathlib import Path
+from dotenv import load_dotenv
+
+ETL_ROOT = Path(__file__).parent.parent
+DEFAULT_KEY_PATH = ETL_ROOT / 'service-account-key.json'
+
+def load_environment():
+    """etl/.env 파일을 로드합니다. (이미 설정된 환경 변수는 유지)"""
+    load_dotenv(dotenv_path=ETL_ROOT / '.env')
+
+def resolve_credentials_path():
+    """
+    서비스 계정 키 경로를 찾습니다.
+    환경 변수가 없거나 상대 경로이면 etl/service-account-key.json을 사용합니다.
+
+    Returns:
+        str: 키 파일 경로 (없으면 None)
+    """
+    cred_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
+    if cred_path and not os.path.isabs(cred_path):
+        # .env의 상대 경로는 etl/ 기준
+        candidate = ETL_ROOT / cred_path
+        if candidate.exists():
+            cred_path = str(candidate)
+
+    if not cred_path or not Path(cred_path).exists():
+        if DEFAULT_KEY_PATH.exists():
+            cred_path = str(DEFAULT_KEY_PATH)
+
+    return cred_path
+
+def target_project(credentials_path=None):
+    """
+    클라이언트를 만들지 않고 접속 대상 프로젝트를 확인합니다. (create_client와 같은 규칙)
+    - 에뮬레이터: GOOGLE_CLOUD_PROJECT (기본 demo-marketing)
+    - 그 외: 서비스 계정 키의 project_id
+
+    Returns:
+        str: 프로젝트 ID (키가 없으면 None)
+    """
+    if os.getenv('FIRESTORE_EMULATOR_HOST'):
+        return os.getenv('GOOGLE_CLOUD_PROJECT', 'demo-marketing')
+
+    credentials_path = credentials_path or resolve_credentials_path()
+    if not credentials_path:
+        return None
+    try:
+        with open(credentials_path, encoding='utf-8') as f:
+            return json.load(f).get('project_id')
+    except (OSError, ValueError):
+        return None
+
+def create_client(async_client=False, credentials_path=None):
+    """
+    Firestore 클라이언트를 생성합니다.
+
+    Args:
+        async_client (bool): True이면 firestore.AsyncClient (asyncio 로더용)
+        credentials_path (str): 서비스 계정 키 경로 (None이면 resolve_credentials_path)
+
+    Returns:
+        firestore.Client 또는 firestore.AsyncClient
+    """
+    # SDK는 클라이언트를 만들 때만 import (fingerprint 대상 확인 등은 SDK 없이 사용)
+    from google.cloud import firestore
+    from google.oauth2 import service_account
+
+    client_class = firestore.AsyncClient if async_client else firestore.Client
+
+    # 에뮬레이터는 인증 없이 접속
+    if os.getenv('FIRESTORE_EMULATOR_HOST'):
+        return client_class(project=os.getenv('GOOGLE_CLOUD_PROJECT', 'demo-marketing'))
+
+    credentials_path = credentials_path or resolve_credentials_path()
+    if not credentials_path:
+        raise EnvironmentError("GOOGLE_APPLICATION_CREDENTIALS not found.")
+
+    credentials = service_account.Credentials.from_service_account_file(credentials_path)
+    return client_class(credentials=credentials, project=credentials.project_id)
+
+async def close_async_client(db):
+    """
+    AsyncClient의 gRPC 채널을 닫습니다. 클라이언트를 만든 이벤트 루프 안에서 await합니다.
+    (SDK의 close()는 HTTP 세션만 정리하므로 채널은 GAPIC 전송 계층에서 직접 닫음)
+    """
+    api = getattr(db, '_firestore_api_internal', None)
+    if api is not None:
+        await api.transport.close()
+    db.close()
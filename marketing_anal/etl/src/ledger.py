@@ -0,0 +1,130 @@
+"""
+==================================================
+Source-File Ledger (Append-Delta Mode)
+==================================================
+Local SQLite ledger of what each input file has already added to
+metrics_daily through server-side increments (--append-delta).
+
+For every file it stores the content checksum and the per-document
+metric sums that were successfully applied. A run then only sends
+the difference between the file's current sums and the ledger:
+- new (late) file: its full sums
+- modified file: new sums minus the previously applied sums
+- same content again (re-run, copy under another name): nothing
+
+Documents that failed to upload keep their previous ledger values,
+so the next run retries exactly the missing increments.
+==================================================
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from datetime import datetime
+import pandas as pd
+
+DEFAULT_LEDGER_PATH = Path(__file__).parent.parent / 'data' / 'state' / 'delta_ledger.sqlite'
+
+KEY_COLUMNS = ['date', 'project_id', 'landing_id', 'channel_id']
+
+DELTA_TOLERANCE = 1e-6
+
+def open_ledger(path=DEFAULT_LEDGER_PATH):
+    """
+    Ledger 저장소(SQLite)를 열고 테이블을 준비합니다.
+
+    Returns:
+        sqlite3.Connection
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(str(path))
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS applied_files (
+            path TEXT PRIMARY KEY,
+            checksum TEXT NOT NULL,
+            contributions TEXT NOT NULL,
+            complete INTEGER NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+        """
+    )
+    return conn
+
+def _key(file_path):
+    return str(Path(file_path).resolve())
+
+def find_duplicate(conn, file_path, checksum):
+    """
+    같은 내용(checksum)이 다른 경로로 이미 반영되었는지 확인합니다.
+
+    Returns:
+        str: 먼저 반영된 파일 경로 (없으면 None)
+    """
+    row = conn.execute(
+        "SELECT path FROM applied_files WHERE checksum = ? AND path != ? AND complete = 1",
+        (checksum, _key(file_path))
+    ).fetchone()
+    return row[0] if row else None
+
+def load_contribution(conn, file_path):
+    """
+    파일이 이전에 반영한 문서별 합계를 읽습니다.
+
+    Returns:
+        pd.DataFrame: KEY_COLUMNS + 지표 컬럼 (없으면 빈 DataFrame)
+    """
+    row = conn.execute(
+        "SELECT contributions FROM applied_files WHERE path = ?", (_key(file_path),)
+    ).fetchone()
+    if row is None:
+        return pd.DataFrame()
+    return pd.DataFrame(json.loads(row[0]))
+
+def contribution_delta(current, previous):
+    """
+    파일의 현재 합계와 이전에 반영한 합계의 차이를 계산합니다. (0인 행은 제외)
+
+    Args:
+        current (pd.DataFrame): 이번 실행의 파일 단위 집계 (aggregate_data 결과)
+        previous (pd.DataFrame): load_contribution 결과
+
+    Returns:
+        pd.DataFrame: KEY_COLUMNS + 지표 컬럼의 증감분
+    """
+    if previous.empty:
+        return current.reset_index(drop=True)
+
+    current = current.copy()
+    for col in KEY_COLUMNS:
+        current[col] = current[col].astype(str)
+
+    delta = current.set_index(KEY_COLUMNS).sub(previous.set_index(KEY_COLUMNS), fill_value=0)
+    # 합산 순서에 따른 부동소수점 오차는 변경 없음으로 간주
+    delta = delta.where(delta.abs() > DELTA_TOLERANCE, 0)
+    delta = delta[(delta != 0).any(axis=1)]
+    return delta.reset_index()
+
+def record_contribution(conn, file_path, checksum, contribution, complete=True):
+    """
+    파일이 반영한 문서별 합계를 기록합니다.
+
+    Args:
+        contribution (pd.DataFrame): 실제로 반영된 합계 (실패한 문서는 이전 값)
+        complete (bool): 모든 증감분이 반영되었는지 여부
+    """
+    frame = contribution.copy()
+    for col in KEY_COLUMNS:
+        frame[col] = frame[col].astype(str)
+
+    with conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO applied_files (path, checksum, contributions, complete, applied_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (_key(file_path), checksum, frame.to_json(orient='records'), int(complete),
+             datetime.now().isoformat(timespec='seconds'))
+        )
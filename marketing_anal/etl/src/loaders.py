@@ -1,5 +1,16 @@
 import pandas as pd
-from google.cloud import firestore
+import numpy as np
+from bulk_writer import bulk_write, BATCH_LIMIT, UNAPPLIED_ERRORS, SERVER_TIMESTAMP
+from async_writer import async_bulk_write, iter_batches
+from fingerprints import diff_documents, payload_hash, save_fingerprints, forget_fingerprints
+
+# 문서의 updated_at은 SERVER_TIMESTAMP 자리 표시자로 만들고 커밋 직전에 bulk_writer가 실제 sentinel로 바꿉니다.
+# google.cloud.firestore는 Increment/조회가 필요한 함수 안에서만 import합니다.
+# (검증/변환/집계/dry-run 실행은 Firestore SDK를 로드하지 않음)
+
+# 집계 그룹핑 키 / 합산 대상 수치형 컬럼
+GROUP_KEYS = ['date', 'project_id', 'landing_id', 'channel_id']
+SUM_COLUMNS = ['sessions', 'impressions', 'clicks', 'cost', 'revenue', 'purchase_conversions']
 
 def aggregate_data(df):
     """
@@ -14,96 +25,1003 @@ def aggregate_data(df):
     if df.empty:
         return df
         
-    # 그룹핑 키
-    group_keys = ['date', 'project_id', 'landing_id', 'channel_id']
-    
     # 수치형 컬럼 (존재하는 것만)
-    numeric_cols = ['sessions', 'impressions', 'clicks', 'cost', 'revenue', 'purchase_conversions']
-    existing_numeric_cols = [col for col in numeric_cols if col in df.columns]
+    existing_numeric_cols = [col for col in SUM_COLUMNS if col in df.columns]
     
     # 그룹핑 및 합산
     # as_index=False로 하여 키를 컬럼으로 유지
-    aggregated = df.groupby(group_keys, as_index=False)[existing_numeric_cols].sum()
+    # observed=True: 카테고리 키는 실제로 존재하는 조합만 그룹핑 (카테시안 곱 방지)
+    aggregated = df.groupby(GROUP_KEYS, as_index=False, observed=True)[existing_numeric_cols].sum()
     
     return aggregated
 
-def upload_to_firestore(db, collection_name, df):
+def merge_aggregates(*frames):
     """
-    데이터프레임을 Firestore에 업로드합니다. (Batch 처리)
+    부분 집계 결과들을 합쳐 다시 집계합니다. (스트리밍/병렬 처리용)
+    
+    Args:
+        *frames (pd.DataFrame): aggregate_data 결과 (빈 DataFrame은 무시)
+        
+    Returns:
+        pd.DataFrame: 합산된 집계 데이터프레임
+    """
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+    
+    return aggregate_data(pd.concat(frames, ignore_index=True))
+
+# GA / 광고 파일이 각각 채우는 지표 컬럼 (다른 쪽 파일에는 없음)
+GA_METRIC_COLUMNS = ['sessions', 'revenue', 'purchase_conversions']
+AD_METRIC_COLUMNS = ['impressions', 'clicks', 'cost']
+
+# join_channel_metrics가 추가하는 KPI / 매칭 플래그 컬럼
+KPI_COLUMNS = ['ctr', 'cpc', 'cvr', 'roas']
+FLAG_COLUMNS = ['unmatched_spend', 'unmatched_sessions']
+
+def _ratio(numerator, denominator, scale=1):
+    """분모가 0이면 0 (대시보드와 동일, 압축 dtype(int8 등) 오버플로 방지를 위해 float64로 계산)"""
+    return (numerator.astype('float64') * scale / denominator.where(denominator > 0)).fillna(0.0)
+
+def join_channel_metrics(df):
+    """
+    GA 측 지표(sessions/revenue/conversions)와 광고 측 지표(impressions/clicks/cost)가
+    (date, project_id, landing_id, channel_id) 키로 합쳐진 집계에 KPI와 매칭 결과를 추가합니다.
+    캠페인 단위 행은 채널 매핑으로 이미 채널 키에 귀속되어 있습니다.
+    
+    - ctr = clicks / impressions * 100, cpc = cost / clicks
+    - cvr = conversions / sessions * 100, roas = revenue / cost * 100
+    - match: 'matched' (양쪽 모두), 'ga_only', 'ad_only'
+    - unmatched_spend: 광고비가 있지만 같은 키의 GA 세션/전환이 없음
+    - unmatched_sessions: 광고비가 발생하는 채널(같은 프로젝트)인데 그 날 광고 데이터가 없음
+    
+    Args:
+        df (pd.DataFrame): aggregate_data 결과
+        
+    Returns:
+        pd.DataFrame: KPI_COLUMNS, match, FLAG_COLUMNS가 추가된 데이터프레임
+    """
+    if df.empty:
+        return df
+    
+    df = df.copy()
+    metrics = {col: df[col].fillna(0) if col in df.columns else pd.Series(0, index=df.index)
+               for col in GA_METRIC_COLUMNS + AD_METRIC_COLUMNS}
+    has_ga = pd.concat([metrics[col] for col in GA_METRIC_COLUMNS], axis=1).ne(0).any(axis=1)
+    has_ad = pd.concat([metrics[col] for col in AD_METRIC_COLUMNS], axis=1).ne(0).any(axis=1)
+    
+    df['ctr'] = _ratio(metrics['clicks'], metrics['impressions'], 100)
+    df['cpc'] = _ratio(metrics['cost'], metrics['clicks'])
+    df['cvr'] = _ratio(metrics['purchase_conversions'], metrics['sessions'], 100)
+    df['roas'] = _ratio(metrics['revenue'], metrics['cost'], 100)
+    
+    df['match'] = np.select([has_ga & has_ad, has_ga, has_ad], ['matched', 'ga_only', 'ad_only'], 'empty')
+    paid_channel = (
+        metrics['cost'].groupby([df['project_id'], df['channel_id']], observed=True).transform('sum') > 0
+    )
+    df['unmatched_spend'] = has_ad & ~has_ga & (metrics['cost'] > 0)
+    df['unmatched_sessions'] = has_ga & ~has_ad & paid_channel
+    return df
+
+# 정수/실수 지표 컬럼 (문서 필드명과 동일)
+INT_METRIC_COLS = ['sessions', 'impressions', 'clicks']
+FLOAT_METRIC_COLS = ['cost', 'revenue']
+
+def metric_document_ids(df):
+    """문서 ID 목록 (date_project_landing_channel)"""
+    return (
+        df['date'].astype(str) + '_' + df['project_id'].astype(str) + '_'
+        + df['landing_id'].astype(str) + '_' + df['channel_id'].astype(str)
+    ).tolist()
+
+def build_metric_documents(df):
+    """
+    집계 데이터프레임을 Firestore 문서 목록으로 변환합니다. (iterrows 없이 컬럼 단위 변환)
+    
+    Args:
+        df (pd.DataFrame): aggregate_data 결과
+        
+    Returns:
+        list: (doc_id, doc_data) 튜플 목록
+    """
+    # Document ID 생성
+    doc_ids = metric_document_ids(df)
+    
+    key_cols = {col: df[col].tolist() for col in ['date', 'project_id', 'landing_id', 'channel_id']}
+    
+    # 수치 데이터 (존재하는 컬럼만, 기본 Python 타입으로 변환)
+    metric_cols = {col: df[col].astype('int64').tolist() for col in INT_METRIC_COLS if col in df.columns}
+    metric_cols.update({col: df[col].astype('float64').tolist() for col in FLOAT_METRIC_COLS if col in df.columns})
+    purchases = df['purchase_conversions'].astype('int64').tolist() if 'purchase_conversions' in df.columns else None
+    
+    # KPI / 매칭 플래그 (join_channel_metrics 결과인 경우)
+    derived_cols = {col: df[col].astype('float64').tolist() for col in KPI_COLUMNS if col in df.columns}
+    derived_cols.update({col: df[col].astype(bool).tolist() for col in FLAG_COLUMNS if col in df.columns})
+    if 'match' in df.columns:
+        derived_cols['match'] = df['match'].astype(str).tolist()
+    
+    documents = []
+    for i, doc_id in enumerate(doc_ids):
+        doc_data = {
+            'id': doc_id,
+            'date': key_cols['date'][i],
+            'project_id': key_cols['project_id'][i],
+            'landing_id': key_cols['landing_id'][i],
+            'channel_id': key_cols['channel_id'][i],
+            'updated_at': SERVER_TIMESTAMP
+        }
+        for col, values in metric_cols.items():
+            doc_data[col] = values[i]
+        
+        # Conversions Map 처리 (현재는 purchase만 있다고 가정)
+        if purchases is not None:
+            doc_data['conversions'] = {'purchase': purchases[i]}
+        
+        for col, values in derived_cols.items():
+            doc_data[col] = values[i]
+        
+        documents.append((doc_id, doc_data))
+    
+    return documents
+
+def build_increment_documents(delta_df):
+    """
+    증감분 데이터프레임을 Increment 문서 목록으로 변환합니다. (merge=True로 써야 함)
+    문서가 없으면 증감분이 그대로 값이 되고, 있으면 서버에서 기존 값에 더해집니다.
+    
+    Args:
+        delta_df (pd.DataFrame): GROUP_KEYS + 지표 컬럼의 증감분 (ledger.contribution_delta 결과)
+        
+    Returns:
+        list: (doc_id, doc_data) 튜플 목록
+    """
+    from google.cloud import firestore
+    doc_ids = metric_document_ids(delta_df)
+    key_cols = {col: delta_df[col].astype(str).tolist() for col in GROUP_KEYS}
+    
+    metric_cols = {col: delta_df[col].astype('int64').tolist() for col in INT_METRIC_COLS if col in delta_df.columns}
+    metric_cols.update({col: delta_df[col].astype('float64').tolist() for col in FLOAT_METRIC_COLS if col in delta_df.columns})
+    purchases = delta_df['purchase_conversions'].astype('int64').tolist() if 'purchase_conversions' in delta_df.columns else None
+    
+    documents = []
+    for i, doc_id in enumerate(doc_ids):
+        doc_data = {'id': doc_id, 'updated_at': SERVER_TIMESTAMP}
+        for col in GROUP_KEYS:
+            doc_data[col] = key_cols[col][i]
+        for col, values in metric_cols.items():
+            doc_data[col] = firestore.Increment(values[i])
+        if purchases is not None:
+            doc_data['conversions'] = {'purchase': firestore.Increment(purchases[i])}
+        documents.append((doc_id, doc_data))
+    
+    return documents
+
+def apply_metric_deltas(db, collection_name, delta_df, **writer_options):
+    """
+    증감분을 서버 측 Increment로 반영합니다. (기존 문서를 읽거나 다시 쓰지 않음)
+    Increment는 멱등이 아니므로 반영되지 않았음이 확실한 에러(UNAPPLIED_ERRORS)만 재시도합니다.
+    
+    Args:
+        db (firestore.Client): Firestore 클라이언트
+        collection_name (str): 컬렉션 이름
+        delta_df (pd.DataFrame): GROUP_KEYS + 지표 컬럼의 증감분
+        **writer_options: bulk_write 옵션 (max_in_flight, max_attempts 등)
+        
+    Returns:
+        dict: written, failed_ids, retries, seconds, docs_per_sec, inserted, updated, skipped
+    """
+    documents = build_increment_documents(delta_df) if not delta_df.empty else []
+    print(f"Applying increments to {len(documents)} documents...")
+    
+    report = bulk_write(
+        db, collection_name, documents, merge=True, retry_errors=UNAPPLIED_ERRORS, **writer_options
+    )
+    report.update({'inserted': 0, 'updated': len(documents), 'skipped': 0})
+    
+    print(f"✓ Increments applied. Total success: {report['written']}/{len(documents)}")
+    return report
+
+# 증감분 반영 후 값이 이 이하이면 0으로 간주 (cost/revenue 부동소수점 합산 오차)
+ZERO_TOLERANCE = 1e-6
+
+def refresh_metric_kpis(db, collection_name, df, fingerprint_store=None, **writer_options):
+    """
+    Increment 반영 후의 문서를 다시 읽어 KPI와 매칭 플래그만 갱신합니다. (--append-delta)
+    비율은 증감분끼리 더할 수 없으므로 반영된 합계로 다시 계산합니다.
+    문서에 없는 지표 필드는 0으로 채워 일반 업로드와 같은 문서 형식을 유지합니다. (있는 지표 값은 다시 쓰지 않음)
+    지표 합계가 모두 0이 된 문서(파일에서 날짜/채널이 빠진 경우)는 값이 0인 문서로 남기지 않고 삭제합니다.
+    
+    Args:
+        df (pd.DataFrame): 증감분이 반영된 문서의 키 (GROUP_KEYS 포함)
+        fingerprint_store (sqlite3.Connection): 지정 시 삭제한 문서의 fingerprint 제거
+        **writer_options: bulk_write 옵션 (max_in_flight, max_attempts 등)
+        
+    Returns:
+        dict: write_documents 결과 (+ deleted, deleted_ids: 삭제에 성공한 문서 ID)
+    """
+    collection_ref = db.collection(collection_name) if not df.empty else None
+    records = []
+    empty_ids = []
+    missing = {}
+    for doc_id in (metric_document_ids(df) if not df.empty else []):
+        snapshot = collection_ref.document(doc_id).get()
+        if not snapshot.exists:
+            continue
+        data = snapshot.to_dict()
+        record = {col: data.get(col) for col in GROUP_KEYS}
+        record.update({col: data.get(col, 0) for col in INT_METRIC_COLS + FLOAT_METRIC_COLS})
+        record['purchase_conversions'] = sum((data.get('conversions') or {}).values())
+        if all(abs(record[col] or 0) <= ZERO_TOLERANCE for col in SUM_COLUMNS):
+            empty_ids.append(doc_id)
+            continue
+        records.append(record)
+        # Increment로 만들어진 문서는 한쪽(GA/광고) 지표 필드가 없음 (일반 업로드처럼 0으로 채움)
+        missing[doc_id] = [col for col in INT_METRIC_COLS + FLOAT_METRIC_COLS + ['conversions'] if col not in data]
+    
+    documents = []
+    if records:
+        derived = KPI_COLUMNS + ['match'] + FLAG_COLUMNS
+        documents = [
+            (doc_id, {col: doc_data[col] for col in derived + missing[doc_id]})
+            for doc_id, doc_data in build_metric_documents(join_channel_metrics(pd.DataFrame(records)))
+        ]
+    print(f"Refreshing KPIs of {len(documents)} documents...")
+    report = write_documents(db, collection_name, documents, merge=True, **writer_options)
+    
+    report = _delete_empty_documents(
+        db, collection_name, report, empty_ids, fingerprint_store=fingerprint_store, **writer_options
+    )
+    failed = set(report['failed_ids'])
+    report['deleted_ids'] = [doc_id for doc_id in empty_ids if doc_id not in failed]
+    return report
+
+def write_documents(db, collection_name, documents, fingerprint_store=None, force=False, **writer_options):
+    """
+    문서 목록을 Firestore에 쓰고 상세 결과를 반환합니다.
+    동시 커밋/재시도는 bulk_writer.bulk_write가 담당합니다.
+    
+    Args:
+        db (firestore.Client): Firestore 클라이언트
+        collection_name (str): 컬렉션 이름
+        documents (list): (doc_id, doc_data) 튜플 목록
+        fingerprint_store (sqlite3.Connection): 지정 시 내용이 바뀐 문서만 업로드
+        force (bool): True이면 fingerprint와 무관하게 전체 업로드 (fingerprint는 갱신)
+        **writer_options: bulk_write 옵션 (max_in_flight, max_attempts, merge 등)
+        
+    Returns:
+        dict: written, failed_ids, retries, seconds, docs_per_sec, inserted, updated, skipped
+    """
+    counts = {'inserted': len(documents), 'updated': 0, 'skipped': 0}
+    hashes = None
+    
+    if fingerprint_store is not None:
+        changed, hashes, counts = diff_documents(fingerprint_store, collection_name, documents)
+        if force:
+            hashes = {doc_id: payload_hash(doc_data) for doc_id, doc_data in documents}
+        else:
+            documents = changed
+        print(f"Fingerprint check ({collection_name}): {counts['inserted']} new, "
+              f"{counts['updated']} changed, {counts['skipped']} unchanged")
+    
+    report = bulk_write(db, collection_name, documents, **writer_options)
+    report.update(counts)
+    
+    # 업로드에 성공한 문서만 fingerprint 기록
+    if hashes is not None:
+        failed = set(report['failed_ids'])
+        save_fingerprints(
+            fingerprint_store, collection_name,
+            {doc_id: h for doc_id, h in hashes.items() if doc_id not in failed}
+        )
+    
+    return report
+
+def delete_documents(db, collection_name, doc_ids, fingerprint_store=None, **writer_options):
+    """
+    문서들을 삭제합니다. (bulk_write의 삭제 쓰기, 삭제된 문서의 fingerprint도 제거)
+    
+    Args:
+        doc_ids (iterable): 삭제할 문서 ID
+        fingerprint_store (sqlite3.Connection): 지정 시 삭제에 성공한 문서의 fingerprint 제거
+        **writer_options: bulk_write 옵션 (max_in_flight, max_attempts 등)
+        
+    Returns:
+        dict: written(삭제 건수), failed_ids, retries, seconds, docs_per_sec
+    """
+    doc_ids = sorted(set(doc_ids))
+    report = bulk_write(db, collection_name, [(doc_id, None) for doc_id in doc_ids], **writer_options)
+    
+    if fingerprint_store is not None and doc_ids:
+        failed = set(report['failed_ids'])
+        forget_fingerprints(fingerprint_store, collection_name, [doc_id for doc_id in doc_ids if doc_id not in failed])
+    return report
+
+def fetch_metric_keys(db, collection_name, dates):
+    """
+    Firestore에서 날짜들의 일별 지표 문서 키를 읽습니다.
+    
+    Args:
+        dates (iterable): 날짜 (YYYY-MM-DD)
+        
+    Returns:
+        pd.DataFrame: GROUP_KEYS 컬럼
+    """
+    from google.cloud.firestore_v1.base_query import FieldFilter
+    records = []
+    for date in sorted(dates):
+        query = db.collection(collection_name).where(filter=FieldFilter('date', '==', date))
+        for doc in query.stream():
+            data = doc.to_dict()
+            records.append({col: data.get(col) for col in GROUP_KEYS})
+    
+    return pd.DataFrame(records, columns=GROUP_KEYS)
+
+def find_removed_metrics(db, collection_name, dates, df):
+    """
+    다시 집계한 날짜에 이전에 업로드되었지만 새 집계에는 없는 문서 키를 찾습니다.
+    (수정된 파일에서 날짜/채널이 빠진 경우 - 그대로 두면 이전 값이 남음)
+    
+    Args:
+        dates (set): 다시 집계한 날짜 중 이전에 업로드된 날짜
+        df (pd.DataFrame): 새 집계 결과 (해당 날짜 전체)
+        
+    Returns:
+        pd.DataFrame: 사라진 문서의 GROUP_KEYS
+    """
+    existing = fetch_metric_keys(db, collection_name, dates) if dates else pd.DataFrame(columns=GROUP_KEYS)
+    if existing.empty:
+        return existing
+    
+    current = set(metric_document_ids(df)) if not df.empty else set()
+    existing_ids = pd.Series(metric_document_ids(existing), index=existing.index)
+    return existing[~existing_ids.isin(current)].reset_index(drop=True)
+
+def upload_metrics(db, collection_name, df, fingerprint_store=None, force=False, **writer_options):
+    """
+    데이터프레임을 Firestore에 업로드하고 상세 결과를 반환합니다.
     
     Args:
         db (firestore.Client): Firestore 클라이언트
         collection_name (str): 컬렉션 이름
         df (pd.DataFrame): 업로드할 데이터프레임
+        fingerprint_store (sqlite3.Connection): 지정 시 내용이 바뀐 문서만 업로드
+        force (bool): True이면 fingerprint와 무관하게 전체 업로드 (fingerprint는 갱신)
+        **writer_options: bulk_write 옵션 (max_in_flight, max_attempts 등)
         
     Returns:
-        int: 성공 건수
+        dict: written, failed_ids, retries, seconds, docs_per_sec, inserted, updated, skipped
     """
     if df.empty:
         print("No data to upload.")
-        return 0
+        return write_documents(db, collection_name, [])
+    
+    print(f"Starting batch upload for {len(df)} records...")
+    report = write_documents(
+        db, collection_name, build_metric_documents(df),
+        fingerprint_store=fingerprint_store, force=force, **writer_options
+    )
+    
+    print(f"✓ Upload completed. Total success: {report['written']}/{len(df)}")
+    return report
+
+def iter_metric_documents(df, chunk_rows=BATCH_LIMIT):
+    """
+    build_metric_documents를 chunk_rows 행 단위로 나누어 필요한 만큼만 만듭니다. (비동기 업로드용)
+    
+    Yields:
+        tuple: (doc_id, doc_data)
+    """
+    for start in range(0, len(df), chunk_rows):
+        yield from build_metric_documents(df.iloc[start:start + chunk_rows])
+
+async def async_write_documents(db, collection_name, documents, fingerprint_store=None, force=False,
+                                chunk_size=BATCH_LIMIT, **writer_options):
+    """
+    write_documents의 비동기 버전. 문서 이터레이터를 chunk_size 단위로 fingerprint 비교하면서
+    바로 async_bulk_write로 흘려보냅니다. (앞선 배치가 커밋되는 동안 다음 문서를 준비)
+    
+    Args:
+        db (firestore.AsyncClient): 비동기 Firestore 클라이언트
+        documents (iterable): (doc_id, doc_data) 튜플 이터레이터
+        **writer_options: async_bulk_write 옵션 (max_in_flight, max_attempts, merge 등)
         
-    batch = db.batch()
-    batch_count = 0
-    total_success = 0
-    BATCH_LIMIT = 400 # Firestore limit is 500, keeping safety margin
+    Returns:
+        dict: written, failed_ids, retries, seconds, docs_per_sec, inserted, updated, skipped
+    """
+    counts = {'inserted': 0, 'updated': 0, 'skipped': 0}
+    hashes = {} if fingerprint_store is not None else None
     
-    collection_ref = db.collection(collection_name)
+    def changed_documents():
+        for chunk in iter_batches(documents, chunk_size):
+            if fingerprint_store is None:
+                counts['inserted'] += len(chunk)
+                yield from chunk
+                continue
+            
+            changed, chunk_hashes, chunk_counts = diff_documents(fingerprint_store, collection_name, chunk)
+            for key, value in chunk_counts.items():
+                counts[key] += value
+            if force:
+                chunk_hashes = {doc_id: payload_hash(doc_data) for doc_id, doc_data in chunk}
+                changed = chunk
+            hashes.update(chunk_hashes)
+            yield from changed
     
-    print(f"Starting batch upload for {len(df)} records...")
+    report = await async_bulk_write(db, collection_name, changed_documents(), **writer_options)
+    report.update(counts)
+    if fingerprint_store is not None:
+        print(f"Fingerprint check ({collection_name}): {counts['inserted']} new, "
+              f"{counts['updated']} changed, {counts['skipped']} unchanged")
+        
+        # 업로드에 성공한 문서만 fingerprint 기록
+        failed = set(report['failed_ids'])
+        save_fingerprints(
+            fingerprint_store, collection_name,
+            {doc_id: h for doc_id, h in hashes.items() if doc_id not in failed}
+        )
+    
+    return report
+
+async def async_upload_metrics(db, collection_name, df, fingerprint_store=None, force=False, **writer_options):
+    """
+    upload_metrics의 비동기 버전 (firestore.AsyncClient).
+    문서는 배치 단위로 만들어지며, 이전 배치의 커밋이 진행되는 동안 다음 배치를 만듭니다.
+    
+    Returns:
+        dict: written, failed_ids, retries, seconds, docs_per_sec, inserted, updated, skipped
+    """
+    if df.empty:
+        print("No data to upload.")
+        return await async_write_documents(db, collection_name, [])
+    
+    print(f"Starting async upload for {len(df)} records...")
+    report = await async_write_documents(
+        db, collection_name, iter_metric_documents(df),
+        fingerprint_store=fingerprint_store, force=force, **writer_options
+    )
     
-    for _, row in df.iterrows():
-        # Document ID 생성
-        doc_id = f"{row['date']}_{row['project_id']}_{row['landing_id']}_{row['channel_id']}"
-        doc_ref = collection_ref.document(doc_id)
+    print(f"✓ Upload completed. Total success: {report['written']}/{len(df)}")
+    return report
+
+def upload_to_firestore(db, collection_name, df, **writer_options):
+    """
+    데이터프레임을 Firestore에 업로드합니다. (Batch 처리)
+    
+    Args:
+        db (firestore.Client): Firestore 클라이언트
+        collection_name (str): 컬렉션 이름
+        df (pd.DataFrame): 업로드할 데이터프레임
         
-        # 데이터 딕셔너리 생성
-        doc_data = {
-            'id': doc_id,
-            'date': row['date'],
-            'project_id': row['project_id'],
-            'landing_id': row['landing_id'],
-            'channel_id': row['channel_id'],
-            'updated_at': firestore.SERVER_TIMESTAMP
-        }
+    Returns:
+        int: 성공 건수
+    """
+    return upload_metrics(db, collection_name, df, **writer_options)['written']
+
+# ==================================================
+# ROLLUPS (pre-aggregated dashboard documents)
+# ==================================================
+
+ROLLUP_COLLECTION = 'metrics_rollup'
+ROLLUP_PERIODS = ['day', 'week', 'month']
+ROLLUP_METRICS = ['cost', 'revenue', 'sessions', 'impressions', 'clicks', 'conversions']
+FLOAT_ROLLUP_METRICS = {'cost', 'revenue'}
+
+def _daily_metric_frame(df):
+    """
+    일별 집계(aggregate_data 결과)를 롤업 계산용 컬럼 구성으로 맞춥니다.
+    conversions는 purchase_conversions 값을 사용합니다.
+    """
+    # 카테고리 키도 문자열로 (Firestore에서 읽은 기존 데이터와 합치기 위해)
+    frame = df[['date', 'project_id', 'channel_id']].astype(str)
+    
+    source_cols = {'conversions': 'purchase_conversions'}
+    for metric in ROLLUP_METRICS:
+        col = source_cols.get(metric, metric)
+        frame[metric] = df[col].fillna(0) if col in df.columns else 0
+    
+    return frame
+
+def _scope_frame(aggregated_df, removed_df=None):
+    """
+    다시 계산할 (date, project_id) 목록: 이번 실행의 일별 집계 + 삭제된 metrics_daily 문서의 키
+    """
+    frames = [aggregated_df[['date', 'project_id']].astype(str)] if not aggregated_df.empty else []
+    if removed_df is not None and not removed_df.empty:
+        frames.append(removed_df[['date', 'project_id']].astype(str))
+    if not frames:
+        return pd.DataFrame(columns=['date', 'project_id'])
+    return pd.concat(frames, ignore_index=True).drop_duplicates(ignore_index=True)
+
+def _delete_empty_documents(db, collection_name, report, doc_ids, fingerprint_store=None, **writer_options):
+    """
+    다시 계산한 결과 데이터가 모두 사라진 문서를 삭제하고 쓰기 결과(report)에 합칩니다.
+    """
+    report['deleted'] = 0
+    if not doc_ids:
+        return report
+    
+    print(f"Deleting {len(doc_ids)} {collection_name} documents with no remaining data...")
+    deleted = delete_documents(db, collection_name, doc_ids, fingerprint_store=fingerprint_store, **writer_options)
+    report['deleted'] = deleted['written']
+    report['failed_ids'] = report['failed_ids'] + deleted['failed_ids']
+    return report
+
+def _period_bounds(dates, period):
+    """
+    날짜(datetime64) Series의 기간 키와 시작/종료일을 계산합니다.
+    - day: 2025-11-28 / week: 2025-W48 (ISO, 월~일) / month: 2025-11
+    
+    Returns:
+        tuple: (period_key, start_date, end_date) 문자열 Series
+    """
+    if period == 'day':
+        start = end = dates
+        key = dates.dt.strftime('%Y-%m-%d')
+    elif period == 'week':
+        iso = dates.dt.isocalendar()
+        key = iso['year'].astype(str) + '-W' + iso['week'].astype(str).str.zfill(2)
+        start = dates - pd.to_timedelta(dates.dt.weekday, unit='D')
+        end = start + pd.Timedelta(days=6)
+    elif period == 'month':
+        key = dates.dt.strftime('%Y-%m')
+        start = dates.dt.to_period('M').dt.start_time
+        end = dates.dt.to_period('M').dt.end_time.dt.normalize()
+    else:
+        raise ValueError(f"Unknown rollup period: {period}")
+    
+    return key, start.dt.strftime('%Y-%m-%d'), end.dt.strftime('%Y-%m-%d')
+
+def _metric_values(values):
+    """롤업 지표를 Firestore에 저장할 기본 Python 타입으로 변환합니다."""
+    return {
+        metric: float(values[metric]) if metric in FLOAT_ROLLUP_METRICS else int(values[metric])
+        for metric in ROLLUP_METRICS
+    }
+
+def build_rollup_documents(daily_df, periods=ROLLUP_PERIODS):
+    """
+    일별 집계로부터 프로젝트별 기간(day/week/month) 롤업 문서를 만듭니다.
+    문서 하나에 기간 합계(totals)와 채널별 합계(channels)를 담습니다.
+    
+    Args:
+        daily_df (pd.DataFrame): _daily_metric_frame 형식의 일별 데이터
+        
+    Returns:
+        list: (doc_id, doc_data) 튜플 목록 (doc_id: {project_id}_{period}_{period_key})
+    """
+    documents = []
+    dates = pd.to_datetime(daily_df['date'])
+    
+    for period in periods:
+        frame = daily_df[['project_id', 'channel_id'] + ROLLUP_METRICS].copy()
+        frame['period_key'], frame['start_date'], frame['end_date'] = _period_bounds(dates, period)
+        bucket_keys = ['project_id', 'period_key', 'start_date', 'end_date']
         
-        # 수치 데이터 추가 (0이 아닌 경우에만 저장하거나, 기본값 0)
-        if 'sessions' in row: doc_data['sessions'] = int(row['sessions'])
-        if 'impressions' in row: doc_data['impressions'] = int(row['impressions'])
-        if 'clicks' in row: doc_data['clicks'] = int(row['clicks'])
-        if 'cost' in row: doc_data['cost'] = float(row['cost'])
-        if 'revenue' in row: doc_data['revenue'] = float(row['revenue'])
+        by_channel = frame.groupby(bucket_keys + ['channel_id'], as_index=False, observed=True)[ROLLUP_METRICS].sum()
         
-        # Conversions Map 처리 (현재는 purchase만 있다고 가정)
-        if 'purchase_conversions' in row:
-            doc_data['conversions'] = {
-                'purchase': int(row['purchase_conversions'])
-            }
-            
-        # Batch에 추가 (set merge=True)
-        batch.set(doc_ref, doc_data, merge=True)
-        batch_count += 1
-        
-        # 배치 한도 도달 시 커밋
-        if batch_count >= BATCH_LIMIT:
-            try:
-                batch.commit()
-                total_success += batch_count
-                print(f"  - Committed batch of {batch_count} records")
-                batch = db.batch() # 새로운 배치 시작
-                batch_count = 0
-            except Exception as e:
-                print(f"  ✗ Batch commit failed: {str(e)}")
-                # 여기서 중단하거나 재시도 로직을 넣을 수 있음. MVP는 로그만 남김.
-                
-    # 남은 배치 커밋
-    if batch_count > 0:
-        try:
-            batch.commit()
-            total_success += batch_count
-            print(f"  - Committed final batch of {batch_count} records")
-        except Exception as e:
-            print(f"  ✗ Final batch commit failed: {str(e)}")
-            
-    print(f"✓ Upload completed. Total success: {total_success}/{len(df)}")
-    return total_success
+        for (project_id, period_key, start_date, end_date), group in by_channel.groupby(bucket_keys, observed=True):
+            doc_id = f"{project_id}_{period}_{period_key}"
+            documents.append((doc_id, {
+                'id': doc_id,
+                'project_id': project_id,
+                'period': period,
+                'period_key': period_key,
+                'start_date': start_date,
+                'end_date': end_date,
+                'totals': _metric_values(group[ROLLUP_METRICS].sum()),
+                'channels': {
+                    record['channel_id']: _metric_values(record)
+                    for record in group.to_dict('records')
+                },
+                'updated_at': SERVER_TIMESTAMP
+            }))
+    
+    return documents
+
+def fetch_daily_metrics(db, collection_name, project_id, start_date, end_date):
+    """
+    Firestore에서 프로젝트의 기간 내 일별 지표 문서를 읽습니다.
+    
+    Returns:
+        pd.DataFrame: _daily_metric_frame 형식
+    """
+    from google.cloud.firestore_v1.base_query import FieldFilter
+    query = (
+        db.collection(collection_name)
+        .where(filter=FieldFilter('project_id', '==', project_id))
+        .where(filter=FieldFilter('date', '>=', start_date))
+        .where(filter=FieldFilter('date', '<=', end_date))
+    )
+    
+    records = []
+    for doc in query.stream():
+        data = doc.to_dict()
+        record = {'date': data['date'], 'project_id': data['project_id'], 'channel_id': data['channel_id']}
+        for metric in ROLLUP_METRICS:
+            record[metric] = data.get(metric, 0)
+        # conversions map 합산 (대시보드와 동일)
+        record['conversions'] = sum((data.get('conversions') or {}).values())
+        records.append(record)
+    
+    return pd.DataFrame(records, columns=['date', 'project_id', 'channel_id'] + ROLLUP_METRICS)
+
+def update_rollups(db, aggregated_df, daily_collection='metrics_daily', rollup_collection=ROLLUP_COLLECTION,
+                   fingerprint_store=None, force=False, run_totals=True, removed_df=None, **writer_options):
+    """
+    이번 실행의 일별 집계가 포함된 기간(day/week/month)의 롤업 문서만 다시 계산합니다.
+    같은 기간의 다른 날짜는 Firestore의 metrics_daily에서 읽어 합칩니다. (증분 갱신)
+    
+    Args:
+        db (firestore.Client): Firestore 클라이언트
+        aggregated_df (pd.DataFrame): aggregate_data 결과 (이번 실행분)
+        run_totals (bool): True이면 aggregated_df가 해당 날짜의 전체 합계 (이번 집계 우선)
+            False이면 증감분 (--append-delta) - 모든 날짜를 반영 후의 metrics_daily에서 읽음
+        removed_df (pd.DataFrame): 이번 실행에서 삭제된 metrics_daily 문서의 키
+            (해당 기간도 다시 계산하고, 데이터가 모두 사라진 기간 문서는 삭제)
+        
+    Returns:
+        dict: write_documents 결과 (+ deleted)
+    """
+    scope_df = _scope_frame(aggregated_df, removed_df)
+    if scope_df.empty:
+        return write_documents(db, rollup_collection, [])
+    
+    run_df = _daily_metric_frame(aggregated_df) if not aggregated_df.empty else None
+    scope_dates = pd.to_datetime(scope_df['date'])
+    
+    # 영향받는 롤업 문서 ID 및 다시 읽어야 할 날짜 범위
+    affected_ids = set()
+    span_start, span_end = scope_df['date'].min(), scope_df['date'].max()
+    for period in ROLLUP_PERIODS:
+        keys, starts, ends = _period_bounds(scope_dates, period)
+        affected_ids.update(scope_df['project_id'] + f'_{period}_' + keys)
+        span_start, span_end = min(span_start, starts.min()), max(span_end, ends.max())
+    
+    # 이번 실행에 포함된 (project, date)는 이번 집계가 우선
+    use_run = run_totals and run_df is not None
+    frames = [run_df] if use_run else []
+    for project_id in sorted(set(scope_df['project_id'])):
+        existing = fetch_daily_metrics(db, daily_collection, project_id, span_start, span_end)
+        if use_run:
+            existing = existing[~existing['date'].isin(set(run_df.loc[run_df['project_id'] == project_id, 'date']))]
+        frames.append(existing)
+    frames = [f for f in frames if not f.empty]
+    daily_df = pd.concat(frames, ignore_index=True) if frames else None
+    
+    documents = [] if daily_df is None else [doc for doc in build_rollup_documents(daily_df) if doc[0] in affected_ids]
+    print(f"Updating {len(documents)} rollup documents ({span_start} ~ {span_end})...")
+    
+    # 기간 문서 전체를 교체 (사라진 채널이 남지 않도록 merge=False)
+    report = write_documents(
+        db, rollup_collection, documents,
+        fingerprint_store=fingerprint_store, force=force, merge=False, **writer_options
+    )
+    return _delete_empty_documents(
+        db, rollup_collection, report, affected_ids - {doc_id for doc_id, _ in documents},
+        fingerprint_store=fingerprint_store, **writer_options
+    )
+
+# ==================================================
+# PACKED SERIES (one document per project/channel/month)
+# ==================================================
+
+SERIES_COLLECTION = 'metrics_series'
+
+def _series_bounds(month):
+    """월 키('2025-11')의 시작일, 종료일, 일수"""
+    period = pd.Period(month, freq='M')
+    return period.start_time.strftime('%Y-%m-%d'), period.end_time.strftime('%Y-%m-%d'), period.days_in_month
+
+def _series_document(project_id, channel_id, month, values):
+    """
+    월별 묶음 문서를 만듭니다. 지표마다 해당 월 일수 길이의 배열 (인덱스 = 일 - 1)
+
+    Args:
+        values (dict): 지표 -> numpy 배열 (없으면 0으로 채움)
+    """
+    start_date, end_date, days = _series_bounds(month)
+    doc_id = f"{project_id}_{channel_id}_{month}"
+    doc_data = {
+        'id': doc_id,
+        'project_id': project_id,
+        'channel_id': channel_id,
+        'month': month,
+        'start_date': start_date,
+        'end_date': end_date,
+        'days': days,
+    }
+    totals = {}
+    for metric in ROLLUP_METRICS:
+        series = values.get(metric)
+        if series is None:
+            series = [0] * days
+        cast = float if metric in FLOAT_ROLLUP_METRICS else int
+        doc_data[metric] = [cast(v) for v in series]
+        totals[metric] = cast(sum(doc_data[metric]))
+    doc_data['totals'] = totals
+    doc_data['updated_at'] = SERVER_TIMESTAMP
+    return doc_id, doc_data
+
+def build_series_documents(daily_df):
+    """
+    일별 집계로부터 프로젝트/채널/월 단위 묶음 문서를 만듭니다. (landing은 합산)
+    90일 x 10채널 대시보드 조회가 문서 900개 대신 약 30개 읽기로 끝납니다.
+
+    Args:
+        daily_df (pd.DataFrame): _daily_metric_frame 형식의 일별 데이터
+
+    Returns:
+        list: (doc_id, doc_data) 튜플 목록 (doc_id: {project_id}_{channel_id}_{YYYY-MM})
+    """
+    if daily_df.empty:
+        return []
+
+    dates = pd.to_datetime(daily_df['date'])
+    frame = daily_df[['project_id', 'channel_id'] + ROLLUP_METRICS].copy()
+    frame['month'] = dates.dt.strftime('%Y-%m')
+    frame['day'] = dates.dt.day - 1
+    by_day = frame.groupby(['project_id', 'channel_id', 'month', 'day'], as_index=False, observed=True)[ROLLUP_METRICS].sum()
+
+    documents = []
+    for (project_id, channel_id, month), group in by_day.groupby(['project_id', 'channel_id', 'month'], observed=True):
+        days = _series_bounds(month)[2]
+        index = group['day'].to_numpy()
+        values = {}
+        for metric in ROLLUP_METRICS:
+            series = np.zeros(days, dtype='float64' if metric in FLOAT_ROLLUP_METRICS else 'int64')
+            series[index] = group[metric].to_numpy()
+            values[metric] = series
+        documents.append(_series_document(project_id, channel_id, month, values))
+
+    return documents
+
+def fetch_series_documents(db, collection_name, project_id, start_month, end_month):
+    """
+    Firestore에서 프로젝트의 기간 내 월별 묶음 문서를 읽어 일별 행으로 펼칩니다.
+
+    Returns:
+        tuple: (daily_df, doc_keys)
+            - daily_df: _daily_metric_frame 형식 (값이 모두 0인 날짜는 제외)
+            - doc_keys: 읽은 문서 ID -> (project_id, channel_id, month)
+    """
+    from google.cloud.firestore_v1.base_query import FieldFilter
+    query = (
+        db.collection(collection_name)
+        .where(filter=FieldFilter('project_id', '==', project_id))
+        .where(filter=FieldFilter('month', '>=', start_month))
+        .where(filter=FieldFilter('month', '<=', end_month))
+    )
+
+    records = []
+    doc_keys = {}
+    for doc in query.stream():
+        data = doc.to_dict()
+        doc_keys[doc.id] = (data['project_id'], data['channel_id'], data['month'])
+        start = pd.Timestamp(data['start_date'])
+        for day in range(data['days']):
+            record = {metric: (data.get(metric) or [0] * data['days'])[day] for metric in ROLLUP_METRICS}
+            if not any(record.values()):
+                continue
+            record.update({
+                'date': (start + pd.Timedelta(days=day)).strftime('%Y-%m-%d'),
+                'project_id': data['project_id'],
+                'channel_id': data['channel_id'],
+            })
+            records.append(record)
+
+    return pd.DataFrame(records, columns=['date', 'project_id', 'channel_id'] + ROLLUP_METRICS), doc_keys
+
+def update_series(db, aggregated_df, daily_collection='metrics_daily', series_collection=SERIES_COLLECTION,
+                  fingerprint_store=None, force=False, run_totals=True, removed_df=None, **writer_options):
+    """
+    이번 실행의 일별 집계가 포함된 월의 묶음 문서만 다시 씁니다.
+    기존 묶음 문서를 읽어(월당 채널 수만큼) 이번 실행의 날짜만 교체합니다. (증분 병합)
+
+    Args:
+        db (firestore.Client): Firestore 클라이언트
+        aggregated_df (pd.DataFrame): aggregate_data 결과 (이번 실행분)
+        run_totals (bool): True이면 aggregated_df가 해당 날짜의 전체 합계 (기존 묶음 문서와 병합)
+            False이면 증감분 (--append-delta) - 해당 월을 반영 후의 metrics_daily에서 다시 읽음
+        removed_df (pd.DataFrame): 이번 실행에서 삭제된 metrics_daily 문서의 키 (해당 날짜 값을 비움)
+
+    Returns:
+        dict: write_documents 결과 (+ deleted)
+    """
+    scope_df = _scope_frame(aggregated_df, removed_df)
+    if scope_df.empty:
+        return write_documents(db, series_collection, [])
+
+    run_df = _daily_metric_frame(aggregated_df) if not aggregated_df.empty else None
+    scope_months = pd.to_datetime(scope_df['date']).dt.strftime('%Y-%m')
+
+    frames = [run_df] if run_totals and run_df is not None else []
+    existing_keys = {}
+    for project_id, months in scope_months.groupby(scope_df['project_id']):
+        start_month, end_month = months.min(), months.max()
+        if run_totals:
+            existing, doc_keys = fetch_series_documents(db, series_collection, project_id, start_month, end_month)
+            existing = existing[~existing['date'].isin(set(scope_df.loc[months.index, 'date']))]
+            existing_keys.update(doc_keys)
+        else:
+            start_date, end_date = _series_bounds(start_month)[0], _series_bounds(end_month)[1]
+            existing = fetch_daily_metrics(db, daily_collection, project_id, start_date, end_date)
+        frames.append(existing)
+    frames = [f for f in frames if not f.empty]
+    daily_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    affected_months = set(scope_df['project_id'] + '_' + scope_months)
+    documents = [
+        (doc_id, doc_data) for doc_id, doc_data in build_series_documents(daily_df)
+        if f"{doc_data['project_id']}_{doc_data['month']}" in affected_months
+    ]
+
+    print(f"Updating {len(documents)} packed series documents...")
+
+    # 문서 전체를 교체 (배열은 부분 갱신이 불가능하므로 merge=False)
+    report = write_documents(
+        db, series_collection, documents,
+        fingerprint_store=fingerprint_store, force=force, merge=False, **writer_options
+    )
+
+    # 이번 실행 날짜에만 값이 있던 채널이 사라진 경우 해당 월 문서를 삭제
+    # (--append-delta는 기존 묶음 문서를 읽지 않으므로 삭제된 metrics_daily 키의 월 문서로 확인)
+    built_ids = {doc_id for doc_id, _ in documents}
+    candidates = dict(existing_keys)
+    if removed_df is not None and not removed_df.empty:
+        removed_months = pd.to_datetime(removed_df['date'].astype(str)).dt.strftime('%Y-%m')
+        for project_id, channel_id, month in zip(removed_df['project_id'].astype(str),
+                                                 removed_df['channel_id'].astype(str), removed_months):
+            candidates[f"{project_id}_{channel_id}_{month}"] = (project_id, channel_id, month)
+    empty_ids = {
+        doc_id for doc_id, (project_id, channel_id, month) in candidates.items()
+        if doc_id not in built_ids and f"{project_id}_{month}" in affected_months
+    }
+    return _delete_empty_documents(
+        db, series_collection, report, empty_ids, fingerprint_store=fingerprint_store, **writer_options
+    )
+
+# ==================================================
+# DASHBOARD SNAPSHOTS (one document per project/range)
+# ==================================================
+
+SNAPSHOT_COLLECTION = 'dashboard_snapshots'
+SNAPSHOT_RANGES = [7, 30, 90]
+SNAPSHOT_SCHEMA_VERSION = 1
+TREND_METRICS = ['sessions', 'revenue', 'conversions', 'cost']
+
+def _kpi_values(values):
+    """
+    지표 합계에 KPI를 더합니다. (대시보드와 동일한 정의)
+    - CTR = clicks / impressions * 100, CPC = cost / clicks
+    - CVR = conversions / sessions * 100, ROAS = revenue / cost * 100
+    """
+    metrics = _metric_values(values)
+    metrics['ctr'] = metrics['clicks'] / metrics['impressions'] * 100 if metrics['impressions'] > 0 else 0.0
+    metrics['cpc'] = metrics['cost'] / metrics['clicks'] if metrics['clicks'] > 0 else 0.0
+    metrics['cvr'] = metrics['conversions'] / metrics['sessions'] * 100 if metrics['sessions'] > 0 else 0.0
+    metrics['roas'] = metrics['revenue'] / metrics['cost'] * 100 if metrics['cost'] > 0 else 0.0
+    return metrics
+
+def build_snapshot_document(daily_df, project_id, end_date, days):
+    """
+    프로젝트의 최근 days일(end_date 포함) 대시보드 스냅샷 문서를 만듭니다.
+    첫 화면에 필요한 합계, 채널별 KPI, 일별 추이를 문서 하나에 담습니다.
+
+    Args:
+        daily_df (pd.DataFrame): _daily_metric_frame 형식의 일별 데이터 (해당 프로젝트)
+        end_date (str): 기간 마지막 날짜 (YYYY-MM-DD)
+        days (int): 기간 일수 (7/30/90)
+
+    Returns:
+        tuple: (doc_id, doc_data) - doc_id: {project_id}_{days}d
+    """
+    start_date = (pd.Timestamp(end_date) - pd.Timedelta(days=days - 1)).strftime('%Y-%m-%d')
+    frame = daily_df[(daily_df['date'] >= start_date) & (daily_df['date'] <= end_date)]
+
+    by_channel = frame.groupby('channel_id', as_index=False, observed=True)[ROLLUP_METRICS].sum()
+    channels = [
+        {'channel_id': record['channel_id'], **_kpi_values(record)}
+        for record in by_channel.to_dict('records')
+    ]
+    channels.sort(key=lambda channel: -channel['revenue'])
+
+    by_date = frame.groupby('date', as_index=False)[TREND_METRICS].sum().sort_values('date')
+    trend = [
+        {'date': record['date'], **{
+            metric: float(record[metric]) if metric in FLOAT_ROLLUP_METRICS else int(record[metric])
+            for metric in TREND_METRICS
+        }}
+        for record in by_date.to_dict('records')
+    ]
+
+    doc_id = f"{project_id}_{days}d"
+    doc_data = {
+        'id': doc_id,
+        'project_id': project_id,
+        'range_days': days,
+        'start_date': start_date,
+        'end_date': end_date,
+        'schema_version': SNAPSHOT_SCHEMA_VERSION,
+        'totals': _kpi_values(frame[ROLLUP_METRICS].sum()),
+        'channels': channels,
+        'trend': trend,
+    }
+    # 내용이 바뀔 때만 달라지는 버전 (클라이언트 캐시 키)
+    doc_data['version'] = payload_hash(doc_data)[:12]
+    doc_data['updated_at'] = SERVER_TIMESTAMP
+    return doc_id, doc_data
+
+# 최근 기간에 남은 데이터가 없을 때 마지막 날짜를 찾기 위한 전체 조회 시작일
+EARLIEST_DATE = '0001-01-01'
+
+def _fetch_snapshot_days(db, project_id, start_date, end_date, use_series, series_collection, daily_collection):
+    """스냅샷 계산용 일별 데이터 (묶음 문서 또는 metrics_daily)"""
+    if use_series:
+        daily_df, _ = fetch_series_documents(db, series_collection, project_id, start_date[:7], end_date[:7])
+        return daily_df
+    return fetch_daily_metrics(db, daily_collection, project_id, start_date, end_date)
+
+def update_snapshots(db, aggregated_df, snapshot_collection=SNAPSHOT_COLLECTION, series_collection=SERIES_COLLECTION,
+                     daily_collection='metrics_daily', use_series=True, ranges=SNAPSHOT_RANGES,
+                     fingerprint_store=None, force=False, removed_df=None, **writer_options):
+    """
+    이번 실행에 포함된 프로젝트의 대시보드 스냅샷(최근 7/30/90일)을 다시 만듭니다.
+    기간 마지막 날짜는 프로젝트에 실제로 남아 있는 데이터의 마지막 날짜입니다.
+    (이번 실행의 마지막 날짜와 이전 스냅샷의 end_date 중 늦은 날짜까지 읽어 찾으므로,
+    수정된 파일에서 마지막 날짜가 빠지면 그 이전 날짜로 돌아감)
+
+    Args:
+        db (firestore.Client): Firestore 클라이언트
+        aggregated_df (pd.DataFrame): aggregate_data 결과 (이번 실행분, 업로드/묶음 문서 반영 후)
+        use_series (bool): True이면 metrics_series 묶음 문서에서 읽음 (월 x 채널 수만큼 읽기)
+            False이면 metrics_daily에서 읽음 (--skip-series)
+        removed_df (pd.DataFrame): 이번 실행에서 삭제된 metrics_daily 문서의 키 (해당 프로젝트도 다시 만듦)
+
+    Returns:
+        dict: write_documents 결과 (+ deleted: 데이터가 모두 사라진 프로젝트의 스냅샷)
+    """
+    scope_df = _scope_frame(aggregated_df, removed_df)
+    if scope_df.empty:
+        return write_documents(db, snapshot_collection, [])
+
+    longest = max(ranges)
+    documents = []
+    empty_ids = set()
+
+    def window_start(end_date):
+        return (pd.Timestamp(end_date) - pd.Timedelta(days=longest - 1)).strftime('%Y-%m-%d')
+
+    for project_id, project_df in scope_df.groupby('project_id'):
+        # 마지막 날짜 후보: 이번 실행의 마지막 날짜와 이전 스냅샷의 end_date 중 늦은 날짜
+        candidate = project_df['date'].max()
+        previous = db.collection(snapshot_collection).document(f"{project_id}_{longest}d").get()
+        if previous.exists:
+            candidate = max(candidate, previous.to_dict().get('end_date') or candidate)
+
+        fetch_options = (use_series, series_collection, daily_collection)
+        daily_df = _fetch_snapshot_days(db, project_id, window_start(candidate), candidate, *fetch_options)
+        scanned_all = daily_df.empty
+        if scanned_all:
+            # 최근 기간의 데이터가 모두 사라진 경우 전체 기간에서 마지막 날짜를 찾음
+            daily_df = _fetch_snapshot_days(db, project_id, EARLIEST_DATE, candidate, *fetch_options)
+        if daily_df.empty:
+            empty_ids.update(f"{project_id}_{days}d" for days in ranges)
+            continue
+
+        end_date = daily_df['date'].max()
+        if end_date < candidate and not scanned_all:
+            # 기간이 앞당겨졌으므로 앞쪽 날짜까지 다시 읽음
+            daily_df = _fetch_snapshot_days(db, project_id, window_start(end_date), end_date, *fetch_options)
+        for days in ranges:
+            documents.append(build_snapshot_document(daily_df, project_id, end_date, days))
+
+    print(f"Updating {len(documents)} dashboard snapshot documents...")
+    report = write_documents(
+        db, snapshot_collection, documents,
+        fingerprint_store=fingerprint_store, force=force, merge=False, **writer_options
+    )
+    return _delete_empty_documents(
+        db, snapshot_collection, report, empty_ids, fingerprint_store=fingerprint_store, **writer_options
+    )
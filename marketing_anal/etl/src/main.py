@@ -16,27 +16,46 @@ Version: 0.4 (Phase 4 - Details)
 ==================================================
 """
 
+import time
+
+# 시작 시간 계측 (pandas 등 무거운 모듈 import 비용 포함)
+_import_started = time.perf_counter()
+
 import os
 import sys
 import shutil
+import argparse
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 from dotenv import load_dotenv
-import pandas as pd
-from google.cloud import firestore
+import atexit
+import queue
+import signal
+import threading
 import logging
+import logging.handlers
 
 # ==================================================
 # SECTION 1: LOGGING CONFIGURATION
 # ==================================================
 
+# 파일/콘솔 출력을 담당하는 백그라운드 리스너 (setup_logging에서 시작)
+_log_listener = None
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
 def setup_logging():
     """
     로깅 시스템을 설정합니다.
     - logs/ 폴더에 날짜별 로그 파일 생성
     - INFO, WARNING, ERROR 레벨 구분
     - 콘솔과 파일에 동시 출력
+    - 처리 스레드는 큐에 넣기만 하고, 포맷/파일 쓰기는 QueueListener 스레드가 담당
     """
+    global _log_listener
+    
     # Ensure logs directory exists
     logs_dir = Path(__file__).parent.parent / 'logs'
     logs_dir.mkdir(exist_ok=True)
@@ -46,35 +65,150 @@ def setup_logging():
     log_path = logs_dir / log_filename
     
     # Configure logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_path, encoding='utf-8'),
-            logging.StreamHandler()
-        ]
-    )
+    formatter = logging.Formatter(LOG_FORMAT)
+    output_handlers = [
+        logging.FileHandler(log_path, encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+    for handler in output_handlers:
+        handler.setFormatter(formatter)
+    
+    log_queue = queue.SimpleQueue()
+    _log_listener = logging.handlers.QueueListener(log_queue, *output_handlers, respect_handler_level=True)
+    _log_listener.start()
+    # 종료 시 큐에 남은 로그를 모두 기록
+    atexit.register(_log_listener.stop)
+    
+    # 메시지만 큐에 넣고 시간/레벨 포맷은 리스너 쪽 handler가 적용
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
     
     return logging.getLogger(__name__)
 
-# Initialize logger
-logger = setup_logging()
+def init_worker_logging(log_path=None):
+    """
+    병렬 모드 워커 프로세스의 로깅을 설정합니다. (init_worker에서 호출)
+    fork로 복제된 큐에는 리스너 스레드가 없으므로, 워커는 파일/콘솔에 직접 기록합니다.
+    spawn/forkserver 워커에는 리스너가 없으므로 부모의 로그 파일(log_path)에 이어서 기록합니다.
+    
+    Args:
+        log_path: 부모 프로세스의 로그 파일 경로 (get_log_path, 없으면 콘솔만)
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root.removeHandler(handler)
+    
+    if _log_listener is not None:
+        handlers = _log_listener.handlers
+    else:
+        handlers = [logging.StreamHandler()]
+        if log_path is not None:
+            handlers.append(logging.FileHandler(log_path, encoding='utf-8'))
+        for handler in handlers:
+            handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+def get_log_path():
+    """
+    현재 로그 파일 경로를 반환합니다. (실행 리포트를 같은 위치에 저장하기 위함)
+    """
+    handlers = list(logging.getLogger().handlers)
+    if _log_listener is not None:
+        handlers.extend(_log_listener.handlers)
+    for handler in handlers:
+        if isinstance(handler, logging.FileHandler):
+            return Path(handler.baseFilename)
+    return None
+
+# 핸들러는 main()에서 setup_logging()으로 설정 (--help나 import만으로 로그 파일을 만들지 않음)
+logger = logging.getLogger(__name__)
 
 # ==================================================
 # SECTION 2: IMPORT CUSTOM MODULES
 # ==================================================
 
 sys.path.append(str(Path(__file__).parent))
-from transformers import normalize_date, map_channel
-from loaders import aggregate_data, upload_to_firestore
+
+# pandas와 변환/적재 모듈은 인자 파싱 뒤 load_dependencies()에서 import합니다.
+# (--help와 인자 오류는 바로 끝남, cli.py와 같은 방식)
+
+def load_dependencies():
+    """
+    pandas와 변환/적재 모듈을 import하여 이 모듈의 전역 이름으로 등록합니다.
+    main(), cli.py, 워커 프로세스 초기화(spawn/forkserver)에서 파이프라인 함수보다 먼저 호출합니다.
+    
+    Returns:
+        float: import에 걸린 시간(초) - 이미 import된 경우 0에 가까움
+    """
+    global pd
+    global normalize_date, map_channel, normalize_date_series, infer_source_medium, map_channel_series
+    global compact_frame, concat_compact, DEFAULT_CHANNEL_RULES, get_channel_rules, set_channel_rules
+    global load_channel_rules_file, load_channel_rules_firestore
+    global aggregate_data, merge_aggregates, upload_metrics, async_upload_metrics, update_rollups, update_series
+    global update_snapshots, build_metric_documents, find_removed_metrics, delete_documents
+    global apply_metric_deltas, refresh_metric_kpis, join_channel_metrics, metric_document_ids, GROUP_KEYS, SUM_COLUMNS
+    global fingerprint_target, fingerprint_store_path, open_fingerprint_store, forget_fingerprints, diff_documents
+    global open_manifest, plan_files, files_with_dates, record_files
+    global open_ledger, find_duplicate, load_contribution, contribution_delta, record_contribution
+    global RunProfiler, stage, drain_records, get_peak_rss_mb
+    global write_staged_file, remove_staged_file, has_staged_file, read_staging
+    global open_metrics_store, sync_metrics, sync_metric_deltas, remove_metrics
+    global SCHEMAS, validate_frame, reject_frame, summarize_rejects, RejectReport
+    global load_partition_rules_file, load_partition_rules_firestore, resolve_partition, partition_key
+    global apply_partition_columns
+    
+    started = time.perf_counter()
+    import pandas as pd
+    from transformers import (
+        normalize_date, map_channel,
+        normalize_date_series, infer_source_medium, map_channel_series, compact_frame, concat_compact,
+        DEFAULT_CHANNEL_RULES, get_channel_rules, set_channel_rules, load_channel_rules_file, load_channel_rules_firestore
+    )
+    from loaders import (
+        aggregate_data, merge_aggregates, upload_metrics, async_upload_metrics, update_rollups, update_series,
+        update_snapshots, build_metric_documents, find_removed_metrics, delete_documents,
+        apply_metric_deltas, refresh_metric_kpis, join_channel_metrics, metric_document_ids, GROUP_KEYS, SUM_COLUMNS
+    )
+    from fingerprints import (
+        fingerprint_target, fingerprint_store_path, open_fingerprint_store, forget_fingerprints, diff_documents
+    )
+    from manifest import open_manifest, plan_files, files_with_dates, record_files
+    from ledger import open_ledger, find_duplicate, load_contribution, contribution_delta, record_contribution
+    from profiling import RunProfiler, stage, drain_records, get_peak_rss_mb
+    from staging import write_staged_file, remove_staged_file, has_staged_file, read_staging
+    from query import open_metrics_store, sync_metrics, sync_metric_deltas, remove_metrics
+    from validation import SCHEMAS, validate_frame, reject_frame, summarize_rejects, RejectReport
+    from partitions import (
+        load_partition_rules_file, load_partition_rules_firestore, resolve_partition, partition_key,
+        apply_partition_columns
+    )
+    return time.perf_counter() - started
+
+# 모듈 import에 걸린 시간 (실행 요약의 Startup 항목, 파이프라인 모듈은 load_dependencies에서 더함)
+IMPORT_SECONDS = time.perf_counter() - _import_started
+
+def init_worker(log_path=None):
+    """
+    병렬 모드 워커 프로세스를 초기화합니다. (ProcessPoolExecutor initializer)
+    로깅을 설정하고 파이프라인 모듈을 import합니다. (spawn/forkserver 워커는 main을 새로 import함)
+    """
+    init_worker_logging(log_path)
+    load_dependencies()
 
 # ==================================================
 # SECTION 3: ENVIRONMENT & CONFIGURATION
 # ==================================================
 
-def initialize_environment():
+def initialize_environment(require_credentials=True):
     """
     환경 변수를 로드하고 설정을 초기화합니다.
+    
+    Args:
+        require_credentials (bool): False이면 서비스 계정 키가 없어도 진행 (--dry-run, 검증 전용 실행)
     """
     try:
         env_path = Path(__file__).parent.parent / '.env'
@@ -89,7 +223,7 @@ def initialize_environment():
             if default_cred_path.exists():
                 credentials_path = str(default_cred_path)
                 os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = credentials_path
-            else:
+            elif require_credentials:
                 raise EnvironmentError("GOOGLE_APPLICATION_CREDENTIALS not set")
         
         config = {
@@ -109,26 +243,69 @@ def initialize_firestore():
     """
     Firestore 클라이언트를 초기화합니다.
     """
+    # Firestore SDK는 클라이언트가 필요할 때만 import (--dry-run/검증 전용 실행은 생략)
+    from firestore_client import create_client
     try:
-        db = firestore.Client()
+        db = create_client()
         logger.info("✓ Firestore client initialized successfully")
         return db
     except Exception as e:
         logger.error(f"✗ Error initializing Firestore: {str(e)}")
         raise
 
+def initialize_async_firestore():
+    """
+    비동기 Firestore 클라이언트(AsyncClient)를 초기화합니다. (--async-upload)
+    """
+    from firestore_client import create_client
+    try:
+        db = create_client(async_client=True)
+        logger.info("✓ Async Firestore client initialized successfully")
+        return db
+    except Exception as e:
+        logger.error(f"✗ Error initializing async Firestore: {str(e)}")
+        raise
+
+async def async_upload_with_client(collection_name, df, **upload_options):
+    """
+    AsyncClient를 업로드가 실행되는 이벤트 루프 안에서 만들고, 끝나면 채널을 닫습니다. (--async-upload)
+    asyncio.run은 실행마다 새 루프를 만들므로 클라이언트를 재사용하지 않으며,
+    --watch에서 배치마다 클라이언트/gRPC 채널이 남지 않습니다.
+    
+    Returns:
+        dict: async_upload_metrics 결과
+    """
+    from firestore_client import close_async_client
+    db = initialize_async_firestore()
+    try:
+        return await async_upload_metrics(db, collection_name, df, **upload_options)
+    finally:
+        await close_async_client(db)
+
 # ==================================================
 # SECTION 4: ERROR HANDLING UTILITIES
 # ==================================================
 
+# --dry-run: 입력 파일을 error 폴더로 옮기지 않음
+_dry_run = False
+
+def set_dry_run(enabled):
+    """드라이런 여부를 설정합니다. (워커 프로세스에서도 호출)"""
+    global _dry_run
+    _dry_run = bool(enabled)
+
 def move_to_error_folder(file_path, reason):
     """
-    문제가 있는 파일을 error 폴더로 이동합니다.
+    문제가 있는 파일을 error 폴더로 이동합니다. (--dry-run에서는 경고만 남김)
     
     Args:
         file_path: 이동할 파일 경로
         reason: 에러 원인
     """
+    if _dry_run:
+        logger.warning(f"⚠ Dry run: leaving problematic file in place: {Path(file_path).name} (Reason: {reason})")
+        return
+    
     try:
         error_dir = Path(__file__).parent.parent / 'data' / 'error'
         error_dir.mkdir(parents=True, exist_ok=True)
@@ -148,17 +325,295 @@ def move_to_error_folder(file_path, reason):
 # SECTION 5: DATA PROCESSING WITH ERROR HANDLING
 # ==================================================
 
-def process_ga_data(file_path, project_id, landing_id):
+def transform_ga_rows(df, project_id, landing_id):
+    """
+    GA 데이터를 행 단위(iterrows)로 변환합니다. (기존 방식, 검증용)
+    
+    Returns:
+        tuple: (result_df, rejects) - rejects는 행 인덱스별 스킵 사유 Series
+    """
+    valid_rows = []
+    rejects = {}
+    
+    for idx, row in df.iterrows():
+        try:
+            # 1. 날짜 정규화
+            row['date'] = normalize_date(row['date'])
+            
+            # 2. 채널 매핑
+            row['channel_id'] = map_channel(row.get('source', ''), row.get('medium', ''))
+            
+            # 3. 메타데이터 추가
+            row['project_id'] = project_id
+            row['landing_id'] = landing_id
+            
+            valid_rows.append(row)
+            
+        except Exception as e:
+            rejects[idx] = str(e)
+    
+    return pd.DataFrame(valid_rows), pd.Series(rejects, dtype=object, name='reason')
+
+def transform_ad_rows(df, project_id, landing_id):
+    """
+    광고 데이터를 행 단위(iterrows)로 변환합니다. (기존 방식, 검증용)
+    
+    Returns:
+        tuple: (result_df, rejects) - rejects는 행 인덱스별 스킵 사유 Series
+    """
+    valid_rows = []
+    rejects = {}
+    
+    for idx, row in df.iterrows():
+        try:
+            # 1. 날짜 정규화
+            row['date'] = normalize_date(row['date'])
+            
+            # 2. Source/Medium 추론
+            platform = str(row.get('platform', '')).lower()
+            if 'naver' in platform:
+                row['source'], row['medium'] = 'naver', 'cpc'
+            elif 'google' in platform:
+                row['source'], row['medium'] = 'google', 'cpc'
+            elif 'meta' in platform or 'facebook' in platform or 'instagram' in platform:
+                row['source'], row['medium'] = 'meta', 'sns_ad'
+            else:
+                row['source'], row['medium'] = 'unknown', 'unknown'
+            
+            # 3. 채널 매핑
+            row['channel_id'] = map_channel(row['source'], row['medium'])
+            
+            # 4. 메타데이터 추가
+            row['project_id'] = project_id
+            row['landing_id'] = landing_id
+            
+            valid_rows.append(row)
+            
+        except Exception as e:
+            rejects[idx] = str(e)
+    
+    return pd.DataFrame(valid_rows), pd.Series(rejects, dtype=object, name='reason')
+
+def _column_or_empty(df, column):
+    """컬럼이 없으면 row.get(column, '')과 동일하게 빈 문자열 Series를 반환합니다."""
+    if column in df.columns:
+        return df[column]
+    return pd.Series('', index=df.index, dtype=object)
+
+def _collect_rejects(*reason_series):
+    """여러 단계의 사유 Series를 합칩니다. 먼저 실패한 단계의 사유가 우선합니다."""
+    reasons = reason_series[0]
+    for later in reason_series[1:]:
+        reasons = reasons.where(reasons.notna(), later)
+    return reasons.dropna().rename('reason')
+
+def transform_ga_frame(df, project_id, landing_id):
+    """
+    GA 데이터를 컬럼 단위(벡터화)로 변환합니다. transform_ga_rows와 동일한 결과를 냅니다.
+    
+    Returns:
+        tuple: (result_df, rejects) - rejects는 행 인덱스별 스킵 사유 Series
+    """
+    # 1. 날짜 정규화
+    dates, date_reasons = normalize_date_series(df['date'])
+    
+    # 2. 채널 매핑
+    channels, channel_reasons = map_channel_series(
+        _column_or_empty(df, 'source'), _column_or_empty(df, 'medium')
+    )
+    
+    rejects = _collect_rejects(date_reasons, channel_reasons)
+    valid = ~df.index.isin(rejects.index)
+    if not valid.any():
+        return pd.DataFrame(), rejects
+    
+    result_df = df[valid].copy()
+    result_df['date'] = dates[valid]
+    result_df['channel_id'] = channels[valid]
+    
+    # 3. 메타데이터 추가
+    result_df['project_id'] = project_id
+    result_df['landing_id'] = landing_id
+    
+    return result_df, rejects
+
+def transform_ad_frame(df, project_id, landing_id):
+    """
+    광고 데이터를 컬럼 단위(벡터화)로 변환합니다. transform_ad_rows와 동일한 결과를 냅니다.
+    
+    Returns:
+        tuple: (result_df, rejects) - rejects는 행 인덱스별 스킵 사유 Series
+    """
+    # 1. 날짜 정규화
+    dates, date_reasons = normalize_date_series(df['date'])
+    
+    # 2. Source/Medium 추론
+    source, medium = infer_source_medium(_column_or_empty(df, 'platform'))
+    
+    # 3. 채널 매핑
+    channels, channel_reasons = map_channel_series(source, medium)
+    
+    rejects = _collect_rejects(date_reasons, channel_reasons)
+    valid = ~df.index.isin(rejects.index)
+    if not valid.any():
+        return pd.DataFrame(), rejects
+    
+    result_df = df[valid].copy()
+    result_df['date'] = dates[valid]
+    result_df['source'] = source[valid]
+    result_df['medium'] = medium[valid]
+    result_df['channel_id'] = channels[valid]
+    
+    # 4. 메타데이터 추가
+    result_df['project_id'] = project_id
+    result_df['landing_id'] = landing_id
+    
+    return result_df, rejects
+
+FILE_LABELS = {'ga': 'GA', 'ad': 'Ad'}
+
+# 변환 엔진: 'vectorized' (기본) / 'row' (기존 iterrows 방식)
+TRANSFORM_ENGINES = {
+    'vectorized': {'ga': transform_ga_frame, 'ad': transform_ad_frame},
+    'row': {'ga': transform_ga_rows, 'ad': transform_ad_rows},
+}
+
+def verify_transform(kind, df, project_id, landing_id, result_df, rejects):
+    """
+    벡터화 결과를 행 단위 결과와 비교합니다. 대용량 파일 전환 시 검증용입니다.
+    
+    Returns:
+        bool: 결과 일치 여부
+    """
+    row_df, row_rejects = TRANSFORM_ENGINES['row'][kind](df, project_id, landing_id)
+    try:
+        pd.testing.assert_frame_equal(
+            result_df.reset_index(drop=True), row_df.reset_index(drop=True), check_dtype=False
+        )
+        pd.testing.assert_series_equal(rejects.sort_index(), row_rejects.sort_index(), check_index_type=False)
+    except AssertionError as e:
+        logger.error(f"✗ Transform verification failed ({kind}): {str(e)}")
+        return False
+    
+    logger.info(f"✓ Transform verification passed ({kind}): {len(result_df)} rows, {len(rejects)} rejects")
+    return True
+
+# 스킵된 행 로그 방식
+# - summary: 에러 종류별 건수와 샘플 행만 기록 (기본, 전체 목록은 data/rejects 리포트)
+# - rows: 행마다 한 줄씩 기록 (기존 방식)
+SKIP_LOG_MODES = ('summary', 'rows')
+_skip_log_mode = 'summary'
+
+def set_skip_log_mode(mode):
+    """스킵된 행 로그 방식을 설정합니다. (워커 프로세스에서도 호출)"""
+    global _skip_log_mode
+    if mode not in SKIP_LOG_MODES:
+        raise ValueError(f"Unknown skip log mode: {mode}")
+    _skip_log_mode = mode
+
+def _log_rejects(rejects, invalid):
+    for idx, reason in rejects.items():
+        logger.warning(f"⚠ Skipped row {idx}: {reason}")
+    for idx, record in invalid.iterrows():
+        logger.warning(f"⚠ Skipped row {idx}: {record['reason']} ({record['field']}: {record['value']})")
+    
+    if len(rejects) + len(invalid) > 0:
+        logger.warning(f"⚠ Skipped {len(rejects) + len(invalid)} invalid rows")
+
+def _log_reject_summary(summary):
+    # 에러 종류별 한 줄 (건수 + 샘플 행)
+    for entry in summary:
+        samples = ', '.join(f"row {row}: {detail}" if detail else f"row {row}" for row, detail in entry['samples'])
+        more = ', ...' if entry['count'] > len(entry['samples']) else ''
+        logger.warning(f"⚠ Skipped {entry['count']} rows - {entry['error']} (e.g. {samples}{more})")
+
+def transform_data(kind, df, project_id, landing_id, engine='vectorized', verify=False, reject_report=None):
+    """
+    로드된 GA/광고 DataFrame(또는 청크)을 변환하고 스킵된 행을 기록합니다.
+    변환 후 스키마 검증(validation.SCHEMAS)을 통과한 행만 반환합니다.
+    
+    Args:
+        kind: 'ga' 또는 'ad'
+        df: 원본 DataFrame
+        project_id, landing_id: 파일의 파티션 (원본의 project_id/landing_id 컬럼 값이 우선)
+        engine: 변환 엔진 ('vectorized' 또는 'row')
+        verify: True이면 행 단위 결과와 비교 검증
+        reject_report (RejectReport): 지정 시 스킵/거부 행을 파일별 리포트에 추가
+        
+    Returns:
+        pd.DataFrame: 변환된 유효 행
+    """
+    result_df, rejects = TRANSFORM_ENGINES[engine][kind](df, project_id, landing_id)
+    
+    if verify and engine != 'row':
+        verify_transform(kind, df, project_id, landing_id, result_df, rejects)
+    
+    # 원본에 project_id / landing_id 컬럼이 있으면 행 단위 파티션 우선
+    result_df = apply_partition_columns(result_df, df)
+    
+    # 필수 필드/숫자 변환/음수/날짜 범위 검증 (컬럼 단위)
+    result_df, invalid = validate_frame(result_df, SCHEMAS[kind])
+    
+    if reject_report is not None:
+        reject_report.add('transform', rejects)
+        reject_report.add('validate', invalid)
+    
+    if _skip_log_mode == 'rows':
+        _log_rejects(rejects, invalid)
+    elif reject_report is None:
+        # 리포트가 있으면 파일 처리가 끝난 뒤 파일 단위로 한 번만 요약
+        _log_reject_summary(summarize_rejects(pd.concat(
+            [reject_frame('transform', rejects), reject_frame('validate', invalid)], ignore_index=True
+        )))
+    
+    # 컬럼 매핑
+    if 'conversions' in result_df.columns:
+        result_df.rename(columns={'conversions': 'purchase_conversions'}, inplace=True)
+    
+    return result_df
+
+def write_reject_report(reject_report):
+    """파일별 스킵/거부 행 리포트를 저장하고 경로를 로그에 남깁니다. (summary 모드는 요약도 기록)"""
+    if _skip_log_mode == 'summary':
+        _log_reject_summary(reject_report.summary())
+    try:
+        report_path = reject_report.write()
+    except Exception as e:
+        logger.error(f"✗ Failed to write reject report: {str(e)}")
+        return
+    if report_path is not None:
+        logger.warning(f"⚠ {reject_report.count} rejected rows written to {report_path}")
+
+def compact_transformed(df, file_name):
+    """
+    변환 결과의 dtype을 축소하고(compact_frame) 전후 메모리 사용량을 계측 기록에 남깁니다.
+    """
+    if df.empty:
+        return df
+    
+    with stage('compact', file=file_name, rows=len(df)) as record:
+        record['memory_before_mb'] = df.memory_usage(deep=True).sum() / (1024 * 1024)
+        df = compact_frame(df)
+        record['memory_after_mb'] = df.memory_usage(deep=True).sum() / (1024 * 1024)
+    return df
+
+def process_ga_data(file_path, project_id, landing_id, engine='vectorized', verify=False):
     """
     GA 데이터를 로드하고 전처리합니다.
     에러 발생 시 빈 DataFrame을 반환합니다.
+    
+    Args:
+        engine: 변환 엔진 ('vectorized' 또는 'row')
+        verify: True이면 행 단위 결과와 비교 검증
     """
     try:
         logger.info(f"Processing GA file: {Path(file_path).name}")
         
         # Load CSV with error handling
         try:
-            df = pd.read_csv(file_path)
+            with stage('read_csv', file=Path(file_path).name) as record:
+                df = pd.read_csv(file_path)
+                record['rows'] = len(df)
         except Exception as e:
             logger.error(f"✗ Failed to load CSV: {str(e)}")
             move_to_error_folder(file_path, f"CSV Load Error: {str(e)}")
@@ -166,36 +621,12 @@ def process_ga_data(file_path, project_id, landing_id):
         
         logger.info(f"✓ Loaded {len(df)} GA rows")
         
-        # Process rows with error handling
-        valid_rows = []
-        skipped_rows = 0
-        
-        for idx, row in df.iterrows():
-            try:
-                # 1. 날짜 정규화
-                row['date'] = normalize_date(row['date'])
-                
-                # 2. 채널 매핑
-                row['channel_id'] = map_channel(row.get('source', ''), row.get('medium', ''))
-                
-                # 3. 메타데이터 추가
-                row['project_id'] = project_id
-                row['landing_id'] = landing_id
-                
-                valid_rows.append(row)
-                
-            except Exception as e:
-                skipped_rows += 1
-                logger.warning(f"⚠ Skipped row {idx}: {str(e)}")
-        
-        if skipped_rows > 0:
-            logger.warning(f"⚠ Skipped {skipped_rows} invalid rows")
-        
-        result_df = pd.DataFrame(valid_rows)
-        
-        # 컬럼 매핑
-        if 'conversions' in result_df.columns:
-            result_df.rename(columns={'conversions': 'purchase_conversions'}, inplace=True)
+        # Transform with error handling
+        reject_report = RejectReport(file_path)
+        with stage('transform', file=Path(file_path).name, rows=len(df)):
+            result_df = transform_data('ga', df, project_id, landing_id, engine, verify, reject_report)
+        write_reject_report(reject_report)
+        result_df = compact_transformed(result_df, Path(file_path).name)
         
         logger.info(f"✓ Processed {len(result_df)} valid GA rows")
         return result_df
@@ -204,17 +635,23 @@ def process_ga_data(file_path, project_id, landing_id):
         logger.error(f"✗ Error processing GA data: {str(e)}")
         return pd.DataFrame()
 
-def process_ad_data(file_path, project_id, landing_id):
+def process_ad_data(file_path, project_id, landing_id, engine='vectorized', verify=False):
     """
     광고 데이터를 로드하고 전처리합니다.
     에러 발생 시 빈 DataFrame을 반환합니다.
+    
+    Args:
+        engine: 변환 엔진 ('vectorized' 또는 'row')
+        verify: True이면 행 단위 결과와 비교 검증
     """
     try:
         logger.info(f"Processing Ad file: {Path(file_path).name}")
         
         # Load CSV with error handling
         try:
-            df = pd.read_csv(file_path)
+            with stage('read_csv', file=Path(file_path).name) as record:
+                df = pd.read_csv(file_path)
+                record['rows'] = len(df)
         except Exception as e:
             logger.error(f"✗ Failed to load CSV: {str(e)}")
             move_to_error_folder(file_path, f"CSV Load Error: {str(e)}")
@@ -222,43 +659,13 @@ def process_ad_data(file_path, project_id, landing_id):
         
         logger.info(f"✓ Loaded {len(df)} Ad rows")
         
-        # Process rows with error handling
-        valid_rows = []
-        skipped_rows = 0
+        # Transform with error handling
+        reject_report = RejectReport(file_path)
+        with stage('transform', file=Path(file_path).name, rows=len(df)):
+            result_df = transform_data('ad', df, project_id, landing_id, engine, verify, reject_report)
+        write_reject_report(reject_report)
+        result_df = compact_transformed(result_df, Path(file_path).name)
         
-        for idx, row in df.iterrows():
-            try:
-                # 1. 날짜 정규화
-                row['date'] = normalize_date(row['date'])
-                
-                # 2. Source/Medium 추론
-                platform = str(row.get('platform', '')).lower()
-                if 'naver' in platform:
-                    row['source'], row['medium'] = 'naver', 'cpc'
-                elif 'google' in platform:
-                    row['source'], row['medium'] = 'google', 'cpc'
-                elif 'meta' in platform or 'facebook' in platform or 'instagram' in platform:
-                    row['source'], row['medium'] = 'meta', 'sns_ad'
-                else:
-                    row['source'], row['medium'] = 'unknown', 'unknown'
-                
-                # 3. 채널 매핑
-                row['channel_id'] = map_channel(row['source'], row['medium'])
-                
-                # 4. 메타데이터 추가
-                row['project_id'] = project_id
-                row['landing_id'] = landing_id
-                
-                valid_rows.append(row)
-                
-            except Exception as e:
-                skipped_rows += 1
-                logger.warning(f"⚠ Skipped row {idx}: {str(e)}")
-        
-        if skipped_rows > 0:
-            logger.warning(f"⚠ Skipped {skipped_rows} invalid rows")
-        
-        result_df = pd.DataFrame(valid_rows)
         logger.info(f"✓ Processed {len(result_df)} valid Ad rows")
         return result_df
         
@@ -266,104 +673,1159 @@ def process_ad_data(file_path, project_id, landing_id):
         logger.error(f"✗ Error processing Ad data: {str(e)}")
         return pd.DataFrame()
 
+def stream_file_data(kind, file_path, project_id, landing_id, chunksize, engine='vectorized', verify=False,
+                     staging=False):
+    """
+    CSV를 청크 단위로 읽어 변환한 뒤, 파일 단위 부분 집계로 누적합니다.
+    메모리 사용량은 원본 행 수가 아니라 고유 키 (date, project_id, landing_id, channel_id) 수에 비례합니다.
+    에러 발생 시 빈 DataFrame을 반환합니다. (부분 결과는 버림)
+    
+    Args:
+        kind: 'ga' 또는 'ad'
+        chunksize: 청크당 행 수
+        staging: True이면 변환된 청크를 Parquet staging에 저장
+        
+    Returns:
+        tuple: (file_aggregate, rows_processed)
+    """
+    label = FILE_LABELS[kind]
+    try:
+        file_name = Path(file_path).name
+        logger.info(f"Streaming {label} file: {file_name} (chunksize={chunksize})")
+        
+        file_aggregate = pd.DataFrame()
+        reject_report = RejectReport(file_path)
+        rows_loaded = 0
+        rows_processed = 0
+        chunk_no = 0
+        load_error = None
+        
+        try:
+            reader = pd.read_csv(file_path, chunksize=chunksize)
+        except Exception as e:
+            reader = None
+            load_error = e
+        
+        if reader is not None:
+            with reader:
+                while True:
+                    # Load chunk with error handling
+                    try:
+                        with stage('read_csv', file=file_name) as record:
+                            chunk = next(reader)
+                            record['rows'] = len(chunk)
+                    except StopIteration:
+                        break
+                    except Exception as e:
+                        load_error = e
+                        break
+                    
+                    rows_loaded += len(chunk)
+                    with stage('transform', file=file_name, rows=len(chunk)):
+                        result_df = transform_data(kind, chunk, project_id, landing_id, engine, verify, reject_report)
+                    if result_df.empty:
+                        continue
+                    result_df = compact_transformed(result_df, file_name)
+                    
+                    rows_processed += len(result_df)
+                    if staging:
+                        chunk_no += 1
+                        with stage('write_staging', file=file_name, rows=len(result_df)):
+                            write_staged_file(result_df, file_path, part=chunk_no)
+                    with stage('aggregate', file=file_name, rows=len(result_df)):
+                        file_aggregate = merge_aggregates(file_aggregate, aggregate_data(result_df))
+        
+        # 파일을 닫은 뒤에 이동 (Windows 파일 잠금 방지)
+        if load_error is not None:
+            logger.error(f"✗ Failed to load CSV: {str(load_error)}")
+            move_to_error_folder(file_path, f"CSV Load Error: {str(load_error)}")
+            return pd.DataFrame(), 0
+        
+        logger.info(f"✓ Loaded {rows_loaded} {label} rows")
+        write_reject_report(reject_report)
+        logger.info(f"✓ Processed {rows_processed} valid {label} rows into {len(file_aggregate)} partial aggregates")
+        return file_aggregate, rows_processed
+        
+    except Exception as e:
+        logger.error(f"✗ Error processing {label} data: {str(e)}")
+        return pd.DataFrame(), 0
+
+FILE_PROCESSORS = {'ga': process_ga_data, 'ad': process_ad_data}
+
+def process_file(kind, file_path, project_id, landing_id, args):
+    """
+    실행 옵션에 따라 파일 하나를 처리합니다.
+    
+    Returns:
+        tuple: (df, rows_processed)
+            - 일반 모드: 변환된 행 전체
+            - 스트리밍 모드 (--chunksize): 파일 단위 부분 집계
+    """
+    if args.staging:
+        # 이전 실행의 조각은 먼저 삭제 (재처리/실패 시 오래된 데이터가 남지 않도록)
+        remove_staged_file(file_path)
+    
+    if args.chunksize:
+        return stream_file_data(
+            kind, file_path, project_id, landing_id, args.chunksize,
+            engine=args.engine, verify=args.verify_transform, staging=args.staging
+        )
+    
+    df = FILE_PROCESSORS[kind](
+        file_path, project_id, landing_id,
+        engine=args.engine, verify=args.verify_transform
+    )
+    if args.staging and not df.empty:
+        with stage('write_staging', file=Path(file_path).name, rows=len(df)):
+            write_staged_file(df, file_path)
+    return df, len(df)
+
+def uses_partial_aggregates(args):
+    """파일 단위 부분 집계를 반환하는 모드인지 여부 (스트리밍, 병렬 또는 --append-delta)"""
+    return bool(args.chunksize) or args.workers > 1 or args.append_delta
+
+def run_file_job(kind, file_path, project_id, landing_id, args):
+    """
+    파일 하나를 처리하고 소요 시간을 측정합니다. (직렬/병렬 공통 작업 단위)
+    병렬 모드에서는 워커 프로세스에서 실행되며, 전송량을 줄이기 위해 부분 집계만 반환합니다.
+    
+    Returns:
+        dict: kind, file, df, rows, seconds, error
+    """
+    started = time.perf_counter()
+    
+    # 워커 프로세스(spawn)에도 부모와 같은 채널 규칙/로그 방식 적용
+    if args.channel_rule_table is not None and get_channel_rules() != args.channel_rule_table:
+        set_channel_rules(args.channel_rule_table)
+    set_skip_log_mode(args.skip_log)
+    set_dry_run(args.dry_run)
+    
+    result = {'kind': kind, 'path': file_path, 'file': Path(file_path).name,
+              'partition': partition_key(project_id, landing_id),
+              'df': pd.DataFrame(), 'rows': 0, 'dates': [], 'error': None}
+    
+    try:
+        with stage('file', file=result['file']) as record:
+            df, rows = process_file(kind, file_path, project_id, landing_id, args)
+            if not df.empty:
+                result['dates'] = sorted(df['date'].astype(str).unique())
+                if uses_partial_aggregates(args) and not args.chunksize:
+                    df = aggregate_data(df)
+            record['rows'] = rows
+        result['df'], result['rows'] = df, rows
+    except Exception as e:
+        result['error'] = str(e)
+    
+    result['seconds'] = time.perf_counter() - started
+    # 단계별 계측 기록 (워커 프로세스에서도 부모로 전달)
+    result['stages'] = drain_records()
+    return result
+
+def iter_file_results(jobs, args):
+    """
+    파일 작업을 실행하고 결과를 완료 순서대로 반환합니다.
+    --workers가 2 이상이면 프로세스 풀에서 파일 단위로 병렬 처리합니다. (모든 파티션이 같은 풀을 공유)
+    
+    Args:
+        jobs (list): (kind, file_path, (project_id, landing_id)) 목록
+    """
+    if args.workers <= 1:
+        for kind, file_path, (project_id, landing_id) in jobs:
+            yield run_file_job(kind, file_path, project_id, landing_id, args)
+        return
+    
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker,
+                             initargs=(get_log_path(),)) as pool:
+        futures = {
+            pool.submit(run_file_job, kind, file_path, *partition, args): (kind, file_path, partition)
+            for kind, file_path, partition in jobs
+        }
+        for future in as_completed(futures):
+            kind, file_path, partition = futures[future]
+            try:
+                yield future.result()
+            except Exception as e:
+                # 워커 프로세스 자체가 비정상 종료된 경우 (BrokenProcessPool 등)
+                yield {'kind': kind, 'path': file_path, 'file': Path(file_path).name,
+                       'partition': partition_key(*partition), 'df': pd.DataFrame(),
+                       'rows': 0, 'dates': [], 'seconds': None, 'stages': [], 'error': str(e)}
+
+def partition_stats(stats, partition):
+    """
+    파티션별 통계 항목을 반환합니다. (없으면 생성)
+    """
+    return stats['partitions'].setdefault(partition, {
+        'files_processed': 0,
+        'files_failed': 0,
+        'rows_processed': 0,
+        'records': 0
+    })
+
+def collect_file_results(jobs, args, stats, file_timings, profiler):
+    """
+    파일 작업을 실행하고 결과를 모아 통계(전체 + 파티션별)를 갱신합니다.
+    
+    Args:
+        jobs (list): (kind, file_path, (project_id, landing_id)) 목록
+    
+    Returns:
+        tuple: (all_data, aggregated_df, file_dates)
+            - all_data: 일반 모드의 변환 결과 목록
+            - aggregated_df: 스트리밍/병렬 모드의 누적 부분 집계
+            - file_dates: 성공한 파일 경로 -> 포함된 날짜 목록
+    """
+    all_data = []
+    aggregated_df = pd.DataFrame()
+    file_dates = {}
+    partial_mode = uses_partial_aggregates(args)
+    
+    for result in iter_file_results(jobs, args):
+        label = FILE_LABELS[result['kind']]
+        df = result['df']
+        file_timings.append(result)
+        profiler.add(result['stages'])
+        partition = partition_stats(stats, result['partition'])
+        
+        if result['error'] is not None:
+            logger.error(f"✗ Failed to process {label} file {result['file']}: {result['error']}")
+            stats['files_failed'] += 1
+            partition['files_failed'] += 1
+        elif not df.empty:
+            stats['files_processed'] += 1
+            stats['rows_processed'] += result['rows']
+            partition['files_processed'] += 1
+            partition['rows_processed'] += result['rows']
+            file_dates[result['path']] = result['dates']
+            if partial_mode:
+                # 스트리밍/병렬 모드: 파일 단위 부분 집계를 전체 집계에 바로 합산
+                aggregated_df = merge_aggregates(aggregated_df, df)
+                stats['peak_aggregate_rows'] = max(stats['peak_aggregate_rows'], len(aggregated_df))
+            else:
+                all_data.append(df)
+        else:
+            stats['files_failed'] += 1
+            partition['files_failed'] += 1
+    
+    return all_data, aggregated_df, file_dates
+
 # ==================================================
 # SECTION 6: MAIN ETL EXECUTION
 # ==================================================
 
-def main():
+def load_channel_rules(source, db):
     """
-    메인 ETL 파이프라인 실행
+    --channel-rules 옵션에 따라 채널 매핑 규칙을 불러와 적용합니다.
+    
+    Args:
+        source: None (기본 규칙), 'firestore' (channels 컬렉션) 또는 설정 파일 경로
+        
+    Returns:
+        dict or None: 적용된 규칙 (기본 규칙이면 None)
+        
+    Note:
+        규칙이 바뀌어도 manifest상 변경 없는 파일은 다시 처리되지 않으므로 --reprocess-all과 함께 사용합니다.
     """
-    logger.info("="*50)
-    logger.info("ETL Pipeline Started")
-    logger.info("="*50)
+    if source is None:
+        return None
     
-    start_time = datetime.now()
+    if source == 'firestore':
+        rules = load_channel_rules_firestore(db)
+    else:
+        rules = load_channel_rules_file(source)
     
-    # Statistics tracking
-    stats = {
+    if not rules:
+        logger.warning(f"⚠ No channel rules found in {source}, using default rules")
+        return None
+    
+    # 불러온 규칙이 기본 규칙보다 우선
+    set_channel_rules({**DEFAULT_CHANNEL_RULES, **rules})
+    logger.info(f"✓ Loaded {len(rules)} channel rules from {source}")
+    return get_channel_rules()
+
+def load_partition_rules(source, db):
+    """
+    --partitions 옵션에 따라 파일 -> (project_id, landing_id) 라우팅 규칙을 불러옵니다.
+    
+    Args:
+        source: None (모든 파일이 .env의 PROJECT_ID/LANDING_ID), 'firestore' (landings 컬렉션) 또는 설정 파일 경로
+        
+    Returns:
+        list: 파티션 규칙 (없으면 빈 목록)
+        
+    Note:
+        규칙이 바뀌어도 manifest상 변경 없는 파일은 다시 처리되지 않으므로 --reprocess-all과 함께 사용합니다.
+    """
+    if source is None:
+        return []
+    
+    if source == 'firestore':
+        rules = load_partition_rules_firestore(db)
+    else:
+        rules = load_partition_rules_file(source)
+    
+    if not rules:
+        logger.warning(f"⚠ No partition rules found in {source}, using PROJECT_ID/LANDING_ID for all files")
+        return []
+    
+    logger.info(f"✓ Loaded {len(rules)} partition rules from {source}")
+    return rules
+
+def route_input_files(files, rules, config):
+    """
+    입력 파일마다 (project_id, landing_id) 파티션을 정하고 파티션별 파일 수를 로그에 남깁니다.
+    
+    Returns:
+        dict: file_path -> (project_id, landing_id)
+    """
+    default = (config['project_id'], config['landing_id'])
+    partitions = {f: resolve_partition(f, rules, default) for f in files}
+    
+    counts = {}
+    for partition in partitions.values():
+        key = partition_key(*partition)
+        counts[key] = counts.get(key, 0) + 1
+    if counts:
+        logger.info(f"Routed {len(partitions)} files to {len(counts)} partitions: "
+                    + ', '.join(f"{key} ({count})" for key, count in sorted(counts.items())))
+    return partitions
+
+def aggregate_staging(dates=None, sources=None):
+    """
+    Parquet staging에서 집계에 필요한 컬럼만 읽어 집계합니다. (원본 CSV 재파싱 없음)
+    
+    Args:
+        dates (set): 읽을 날짜 파티션 (None이면 전체)
+        sources (list): 원본 파일 경로 목록 (None이면 전체)
+        
+    Returns:
+        tuple: (aggregated_df, rows_read)
+    """
+    with stage('read_staging') as record:
+        staged_df = read_staging(dates=dates, columns=GROUP_KEYS + SUM_COLUMNS, sources=sources)
+        record['rows'] = len(staged_df)
+    
+    with stage('aggregate', rows=len(staged_df)):
+        return aggregate_data(staged_df), len(staged_df)
+
+def apply_file_deltas(db, file_results, plan, fingerprint_store, file_dates, args):
+    """
+    --append-delta 모드: 파일별 부분 집계와 ledger의 이전 반영분을 비교하여
+    증감분만 metrics_daily에 Increment로 반영합니다. (기존 문서를 읽거나 재처리하지 않음)
+    
+    - 이미 같은 내용이 반영된 파일 (다른 이름의 복사본 등)은 건너뜀
+    - 일반 모드로 반영된 뒤 수정된 파일은 이전 반영분을 알 수 없으므로 건너뜀
+      (file_dates에서 제외하여 manifest에 기록되지 않도록 함)
+    
+    Args:
+        file_results (list): collect_file_results가 모은 파일별 결과 (df: 파일 단위 부분 집계)
+        plan (dict): plan_files 결과
+        file_dates (dict): 성공한 파일 경로 -> 날짜 목록 (건너뛴 파일은 제거됨)
+        
+    Returns:
+        tuple: (delta_df, report)
+            - delta_df: 실제로 반영된 증감분 (실패한 문서 제외)
+            - report: apply_metric_deltas 결과
+    """
+    ledger = open_ledger()
+    try:
+        entries = []
+        run_checksums = {}
+        for result in file_results:
+            path = result['path']
+            if result['error'] is not None or result['df'].empty or path not in file_dates:
+                continue
+            
+            info = plan['changed'][path]
+            duplicate = find_duplicate(ledger, path, info['checksum']) or run_checksums.get(info['checksum'])
+            if duplicate is not None:
+                logger.warning(f"⚠ Skipping {result['file']}: same content already applied from {Path(duplicate).name}")
+                continue
+            
+            previous = load_contribution(ledger, path)
+            if previous.empty and info['status'] == 'modified':
+                logger.warning(f"⚠ Skipping {result['file']}: modified file has no delta ledger entry "
+                               f"(loaded without --append-delta), run without --append-delta to reload its dates")
+                del file_dates[path]
+                continue
+            
+            run_checksums[info['checksum']] = path
+            entries.append((path, info['checksum'], result['df'], previous,
+                            contribution_delta(result['df'], previous)))
+        
+        delta_df = merge_aggregates(*[entry[4] for entry in entries])
+        report = apply_metric_deltas(
+            db, 'metrics_daily', delta_df,
+            max_in_flight=args.upload_concurrency, max_attempts=args.upload_attempts
+        )
+        
+        # 파일별 반영분 기록 (실패한 문서는 이전 값을 유지하여 다음 실행에서 다시 시도)
+        failed = set(report['failed_ids'])
+        for path, checksum, current, previous, delta in entries:
+            current = current[~pd.Series(metric_document_ids(current), index=current.index).isin(failed)]
+            if not previous.empty:
+                previous = previous[pd.Series(metric_document_ids(previous), index=previous.index).isin(failed)]
+            complete = not (set(metric_document_ids(delta)) & failed) if not delta.empty else True
+            record_contribution(ledger, path, checksum, merge_aggregates(current, previous), complete=complete)
+        
+        if delta_df.empty:
+            return delta_df, report
+        
+        # 서버에서 값이 바뀐 문서는 fingerprint 무효화 (다음 일반 업로드에서 다시 쓰도록)
+        doc_ids = pd.Series(metric_document_ids(delta_df), index=delta_df.index)
+        forget_fingerprints(fingerprint_store, 'metrics_daily', doc_ids[~doc_ids.isin(failed)].tolist())
+        return delta_df[~doc_ids.isin(failed)], report
+    finally:
+        ledger.close()
+
+def find_removed_keys(db, plan, target_files, aggregated_df):
+    """
+    변경 파일의 이전 날짜에 업로드되었지만 새 집계에는 없는 metrics_daily 문서 키를 찾습니다.
+    (수정된 파일에서 날짜/채널이 빠진 경우 - 이전 문서와 이를 합산한 롤업/묶음/스냅샷이 남지 않도록 삭제)
+    
+    Args:
+        plan (dict): plan_files 결과
+        target_files (list): 이번 실행에서 처리한 변경 파일
+        aggregated_df (pd.DataFrame): 해당 날짜 전체를 다시 집계한 결과
+        
+    Returns:
+        pd.DataFrame: 사라진 문서의 GROUP_KEYS
+    """
+    previous_dates = set()
+    for f in target_files:
+        previous_dates.update(plan['previous_dates'].get(f, set()))
+    if not previous_dates:
+        return pd.DataFrame(columns=GROUP_KEYS)
+    
+    with stage('find_removed', rows=len(previous_dates)) as record:
+        removed_df = find_removed_metrics(db, 'metrics_daily', previous_dates, aggregated_df)
+        record['rows'] = len(removed_df)
+    if not removed_df.empty:
+        logger.info(f"Found {len(removed_df)} metrics_daily documents no longer in the input "
+                    f"({len(previous_dates)} previous dates checked)")
+    return removed_df
+
+def log_unmatched_metrics(joined_df, stats):
+    """
+    GA/광고 매칭 결과를 통계에 기록하고, 매칭되지 않은 광고비/세션이 있으면 경고합니다.
+    """
+    stats['unmatched_spend'] = int(joined_df['unmatched_spend'].sum())
+    stats['unmatched_sessions'] = int(joined_df['unmatched_sessions'].sum())
+    
+    if stats['unmatched_spend']:
+        cost = joined_df.loc[joined_df['unmatched_spend'], 'cost'].sum()
+        logger.warning(f"⚠ {stats['unmatched_spend']} records have ad spend ({cost:,.0f}) "
+                       f"without GA sessions/conversions (unmatched_spend)")
+    if stats['unmatched_sessions']:
+        sessions = joined_df.loc[joined_df['unmatched_sessions'], 'sessions'].sum()
+        logger.warning(f"⚠ {stats['unmatched_sessions']} paid-channel records have {sessions:,.0f} sessions "
+                       f"without ad data (unmatched_sessions)")
+
+def write_run_report(profiler, args, stats, start_time, name=None):
+    """
+    단계별/파일별 계측 결과를 로그 파일 옆에 JSON 리포트로 저장합니다. (logs/etl_*.json)
+    
+    Args:
+        name (str): 리포트 이름 접미사 (watch 모드의 배치 번호, 예: etl_*.cycle0001.json)
+    """
+    try:
+        profiler.stop()
+        log_path = get_log_path()
+        if log_path is None:
+            log_path = Path(__file__).parent.parent / 'logs' / f"etl_{start_time.strftime('%Y%m%d_%H%M%S')}.log"
+        
+        summary = {
+            'started_at': start_time.isoformat(timespec='seconds'),
+            'duration_seconds': (datetime.now() - start_time).total_seconds(),
+            'log_file': str(log_path),
+            'args': {k: v for k, v in vars(args).items() if k not in ('channel_rule_table', 'partition_rules')},
+            'stats': stats,
+        }
+        report_path = log_path.with_suffix('.json') if name is None else log_path.with_name(f"{log_path.stem}.{name}.json")
+        report_path = profiler.write_report(report_path, summary)
+        logger.info(f"✓ Run report written to {report_path}")
+    except Exception as e:
+        logger.error(f"✗ Failed to write run report: {str(e)}")
+
+def parse_args(argv=None):
+    """
+    커맨드라인 인자를 파싱합니다.
+    """
+    parser = argparse.ArgumentParser(description='Marketing Analytics ETL Pipeline')
+    parser.add_argument('--engine', choices=sorted(TRANSFORM_ENGINES), default='vectorized',
+                        help='변환 엔진 (기본: vectorized, 기존 방식: row)')
+    parser.add_argument('--verify-transform', action='store_true',
+                        help='벡터화 결과를 행 단위 결과와 비교 검증')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='스트리밍 모드: CSV를 N행 단위로 읽어 부분 집계로 누적')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='병렬 모드: N개 프로세스로 파일 단위 병렬 처리 (기본: 1)')
+    parser.add_argument('--upload-concurrency', type=int, default=4,
+                        help='동시에 진행할 Firestore 배치 커밋 수 (기본: 4)')
+    parser.add_argument('--upload-attempts', type=int, default=5,
+                        help='일시적 에러 시 배치당 최대 시도 횟수 (기본: 5)')
+    parser.add_argument('--async-upload', action='store_true',
+                        help='비동기 클라이언트(AsyncClient)로 문서 생성과 커밋을 겹쳐서 업로드')
+    parser.add_argument('--full-upload', action='store_true',
+                        help='내용이 바뀌지 않은 문서도 모두 다시 업로드 (fingerprint 무시)')
+    parser.add_argument('--append-delta', action='store_true',
+                        help='새/수정 파일의 증감분만 기존 metrics_daily 문서에 Increment로 더함 (늦게 도착한 파일용)')
+    parser.add_argument('--reprocess-all', action='store_true',
+                        help='manifest를 무시하고 입력 파일을 모두 다시 처리')
+    parser.add_argument('--channel-rules', default=None,
+                        help="채널 매핑 규칙: 설정 파일 경로(JSON/CSV) 또는 'firestore' (channels 컬렉션)")
+    parser.add_argument('--partitions', default=None,
+                        help="파일 -> project_id/landing_id 라우팅 규칙: 설정 파일 경로(JSON/CSV) 또는 'firestore' (landings 컬렉션)")
+    parser.add_argument('--skip-rollups', action='store_true',
+                        help='기간별 롤업 문서(metrics_rollup) 갱신 생략')
+    parser.add_argument('--skip-series', action='store_true',
+                        help='프로젝트/채널/월 묶음 문서(metrics_series) 갱신 생략')
+    parser.add_argument('--skip-snapshots', action='store_true',
+                        help='대시보드 스냅샷 문서(dashboard_snapshots, 최근 7/30/90일) 갱신 생략')
+    parser.add_argument('--skip-query-store', action='store_true',
+                        help='로컬 지표 저장소(data/state/metrics.sqlite) 동기화 생략')
+    parser.add_argument('--staging', action='store_true',
+                        help='변환 결과를 날짜 파티션 Parquet(data/staging)에 저장하고 재집계 시 재사용')
+    parser.add_argument('--from-staging', action='store_true',
+                        help='입력 CSV 대신 staging 데이터 전체를 재집계하여 업로드')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Firestore 연결 없이 변환/집계 후 업로드될 문서 수만 확인 (manifest/staging/로컬 저장소 갱신 없음)')
+    parser.add_argument('--watch', action='store_true',
+                        help='data/input을 계속 감시하며 새/변경 파일을 바로 처리 (Ctrl+C로 종료)')
+    parser.add_argument('--poll-interval', type=float, default=2.0,
+                        help='--watch 모드의 입력 폴더 확인 주기(초, 기본: 2)')
+    parser.add_argument('--skip-log', choices=SKIP_LOG_MODES, default='summary',
+                        help='스킵된 행 로그: summary (에러 종류별 건수+샘플, 기본) 또는 rows (행마다 기록)')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='tracemalloc으로 단계별 최대 메모리 할당량 측정 (느려짐)')
+    parser.add_argument('--profile', action='store_true',
+                        help='cProfile 프로파일을 logs/etl_*.prof로 저장')
+    args = parser.parse_args(argv)
+    args.channel_rule_table = None
+    args.partition_rules = []
+    
+    if args.workers < 1:
+        parser.error('--workers must be >= 1')
+    if args.chunksize is not None and args.chunksize < 1:
+        parser.error('--chunksize must be >= 1')
+    if args.upload_concurrency < 1 or args.upload_attempts < 1:
+        parser.error('--upload-concurrency and --upload-attempts must be >= 1')
+    if args.append_delta and (args.reprocess_all or args.from_staging or args.async_upload):
+        # 증감분은 manifest와 ledger 기준으로 계산하므로 전체 재처리/재업로드와 함께 쓸 수 없음
+        parser.error('--append-delta cannot be combined with --reprocess-all, --from-staging or --async-upload')
+    if args.watch and (args.reprocess_all or args.from_staging):
+        # 매 배치마다 전체를 다시 처리하게 되므로 manifest 기반 증분 실행만 지원
+        parser.error('--watch cannot be combined with --reprocess-all or --from-staging')
+    if args.poll_interval <= 0:
+        parser.error('--poll-interval must be > 0')
+    if args.dry_run and (args.watch or args.append_delta or args.staging):
+        # 모두 실행 상태(manifest, ledger, staging)를 갱신하는 모드
+        parser.error('--dry-run cannot be combined with --watch, --append-delta or --staging')
+    if args.dry_run and 'firestore' in (args.channel_rules, args.partitions):
+        parser.error("--dry-run cannot load rules from 'firestore'; use a config file")
+    
+    return args
+
+INPUT_DIR = Path(__file__).parent.parent / 'data' / 'input'
+
+# watch 모드: 업로드 실패 후 같은 파일을 다시 시도하기까지 대기 시간(초)
+WATCH_RETRY_DELAY = 60
+
+def new_run_stats():
+    """
+    실행 통계 초기값을 반환합니다.
+    """
+    return {
         'files_processed': 0,
         'files_failed': 0,
         'rows_processed': 0,
-        'rows_uploaded': 0
+        'rows_uploaded': 0,
+        'peak_aggregate_rows': 0,
+        'upload_docs_per_sec': 0.0,
+        'upload_failed_ids': [],
+        'docs_inserted': 0,
+        'docs_updated': 0,
+        'docs_skipped': 0,
+        'docs_deleted': 0,
+        'files_skipped': 0,
+        'rollups_written': 0,
+        'series_written': 0,
+        'snapshots_written': 0,
+        'unmatched_spend': 0,
+        'unmatched_sessions': 0,
+        'query_store_rows': 0,
+        'frame_memory_before_mb': 0.0,
+        'frame_memory_after_mb': 0.0,
+        'combined_memory_mb': None,
+        'import_seconds': None,
+        'startup_seconds': None,
+        'partitions': {}
     }
+
+def list_input_files(input_files=None):
+    """
+    처리할 GA/광고 CSV 파일 목록을 반환합니다.
     
-    try:
-        # 1. Initialize
-        config = initialize_environment()
-        db = initialize_firestore()
+    Args:
+        input_files (list): 대상 파일 (None이면 data/input의 ga_*.csv / ad_*.csv 전체)
+        
+    Returns:
+        tuple: (ga_files, ad_files)
+    """
+    if input_files is None:
+        return list(INPUT_DIR.glob('ga_*.csv')), list(INPUT_DIR.glob('ad_*.csv'))
+    
+    input_files = [Path(f) for f in input_files]
+    return ([f for f in input_files if f.name.startswith('ga_')],
+            [f for f in input_files if f.name.startswith('ad_')])
+
+def combine_file_results(all_data, aggregated_df, stats):
+    """
+    파일별 변환 결과를 합쳐 집계하고 부분 집계(스트리밍/병렬)와 합산합니다. (4단계)
+    
+    Returns:
+        pd.DataFrame: 집계 결과
+    """
+    if not all_data:
+        return aggregated_df
+    
+    with stage('concat') as record:
+        combined_df = concat_compact(all_data)
+        record['rows'] = len(combined_df)
+    stats['combined_memory_mb'] = combined_df.memory_usage(deep=True).sum() / (1024 * 1024)
+    logger.info(f"✓ Combined {len(combined_df)} total rows ({stats['combined_memory_mb']:.1f} MB)")
+    
+    with stage('aggregate', rows=len(combined_df)):
+        return merge_aggregates(aggregated_df, aggregate_data(combined_df))
+
+def join_aggregates(aggregated_df, stats):
+    """
+    GA x 광고 지표를 채널 키로 매칭하고 KPI를 추가한 뒤 매칭되지 않은 행을 기록합니다.
+    """
+    with stage('join', rows=len(aggregated_df)):
+        aggregated_df = join_channel_metrics(aggregated_df)
+    log_unmatched_metrics(aggregated_df, stats)
+    return aggregated_df
+
+def count_partition_records(aggregated_df, stats):
+    """파티션별 집계 레코드 수를 통계에 기록합니다."""
+    for (project_id, landing_id), records in aggregated_df.groupby(['project_id', 'landing_id'], observed=True).size().items():
+        partition_stats(stats, partition_key(project_id, landing_id))['records'] = int(records)
+
+def initialize_pipeline(args):
+    """
+    환경 변수, Firestore 클라이언트, 채널 매핑/파티션 규칙을 준비합니다. (watch 모드에서는 한 번만 실행)
+    모든 파티션이 같은 클라이언트를 사용합니다.
+    
+    Returns:
+        tuple: (config, db)
+    """
+    config = initialize_environment()
+    db = initialize_firestore()
+    args.channel_rule_table = load_channel_rules(args.channel_rules, db)
+    args.partition_rules = load_partition_rules(args.partitions, db)
+    return config, db
+
+def initialize_dry_run(args):
+    """
+    Firestore 클라이언트 없이 환경 변수와 채널 매핑/파티션 규칙만 준비합니다. (--dry-run, cli.py)
+    서비스 계정 키가 없어도 실행되며, 처리할 수 없는 입력 파일도 error 폴더로 옮기지 않습니다.
+    
+    Returns:
+        dict: config
+    """
+    set_dry_run(True)
+    config = initialize_environment(require_credentials=False)
+    args.channel_rule_table = load_channel_rules(args.channel_rules, None)
+    args.partition_rules = load_partition_rules(args.partitions, None)
+    return config
+
+def process_input_files(args, config, profiler, stats, input_files=None):
+    """
+    manifest를 보지 않고 입력 파일 전체를 변환합니다. (--dry-run, cli.py validate/transform/aggregate)
+    
+    Args:
+        input_files (list): 대상 파일 (None이면 data/input 전체)
+        
+    Returns:
+        tuple: (all_data, aggregated_df, file_timings) - all_data/aggregated_df는 collect_file_results와 동일
+    """
+    file_timings = []
+    ga_files, ad_files = list_input_files(input_files)
+    logger.info(f"Found {len(ga_files)} GA files and {len(ad_files)} Ad files")
+    
+    kinds = {f: 'ga' for f in ga_files}
+    kinds.update({f: 'ad' for f in ad_files})
+    partitions = route_input_files(list(kinds), args.partition_rules, config)
+    
+    profiler.collect()
+    all_data, aggregated_df, _ = collect_file_results(
+        [(kinds[f], f, partitions[f]) for f in kinds], args, stats, file_timings, profiler
+    )
+    return all_data, aggregated_df, file_timings
+
+def run_pipeline(args, config, db, profiler, stats, input_files=None):
+    """
+    입력 파일을 처리하여 업로드, 롤업, 로컬 저장소 동기화까지 한 번 실행합니다. (2~7단계)
+    
+    Args:
+        profiler (RunProfiler): 단계별 계측
+        stats (dict): new_run_stats 결과 (실행 중 갱신)
+        input_files (list): 대상 파일 (None이면 data/input 전체)
         
+    Returns:
+        list: 파일별 처리 결과 (file_timings)
+    """
+    all_data = []
+    file_timings = []
+    manifest = None
+    target_dates = None
+    
+    if args.from_staging:
+        # 2-3. 원본 CSV 대신 staging 데이터를 재집계 (재업로드/롤업 재계산)
+        aggregated_df, rows_read = aggregate_staging()
+        stats['rows_processed'] = rows_read
+        logger.info(f"✓ Read {rows_read} staged rows")
+    else:
         # 2. Load CSV files
-        data_dir = Path(__file__).parent.parent / 'data' / 'input'
-        ga_files = list(data_dir.glob('ga_*.csv'))
-        ad_files = list(data_dir.glob('ad_*.csv'))
+        ga_files, ad_files = list_input_files(input_files)
         
         logger.info(f"Found {len(ga_files)} GA files and {len(ad_files)} Ad files")
         
-        all_data = []
+        # 3. Process GA files, then Ad files (--workers N: 병렬)
+        kinds = {f: 'ga' for f in ga_files}
+        kinds.update({f: 'ad' for f in ad_files})
+        partitions = route_input_files(list(kinds), args.partition_rules, config)
         
-        # 3. Process GA files
-        for ga_file in ga_files:
-            try:
-                df = process_ga_data(ga_file, config['project_id'], config['landing_id'])
-                if not df.empty:
-                    all_data.append(df)
-                    stats['files_processed'] += 1
-                    stats['rows_processed'] += len(df)
-                else:
-                    stats['files_failed'] += 1
-            except Exception as e:
-                logger.error(f"✗ Failed to process GA file {ga_file.name}: {str(e)}")
-                stats['files_failed'] += 1
+        manifest = None if args.reprocess_all else open_manifest()
+        if manifest is not None:
+            # 증분 실행: 새 파일/변경 파일만 처리
+            with stage('plan_files', rows=len(kinds)):
+                plan = plan_files(manifest, list(kinds))
+            stats['files_skipped'] = len(plan['unchanged'])
+            logger.info(f"Manifest: {len(plan['changed'])} new/modified files, "
+                        f"{len(plan['unchanged'])} unchanged files skipped")
+            target_files = list(plan['changed'])
+        else:
+            target_files = list(kinds)
         
-        # 4. Process Ad files
-        for ad_file in ad_files:
-            try:
-                df = process_ad_data(ad_file, config['project_id'], config['landing_id'])
-                if not df.empty:
-                    all_data.append(df)
-                    stats['files_processed'] += 1
-                    stats['rows_processed'] += len(df)
-                else:
-                    stats['files_failed'] += 1
-            except Exception as e:
-                logger.error(f"✗ Failed to process Ad file {ad_file.name}: {str(e)}")
-                stats['files_failed'] += 1
+        # 워커 프로세스(fork)에 부모의 기록이 복제되지 않도록 먼저 수집
+        profiler.collect()
+        all_data, aggregated_df, file_dates = collect_file_results(
+            [(kinds[f], f, partitions[f]) for f in target_files], args, stats, file_timings, profiler
+        )
         
-        # 5. Merge and aggregate
-        if all_data:
-            combined_df = pd.concat(all_data, ignore_index=True)
-            logger.info(f"✓ Combined {len(combined_df)} total rows")
+        if manifest is not None:
+            # 변경된 날짜 파티션 = 변경 파일의 새 날짜 + 이전 날짜
+            target_dates = set()
+            for f in target_files:
+                target_dates.update(file_dates.get(f, []))
+                target_dates.update(plan['previous_dates'].get(f, set()))
+            
+            # 같은 날짜를 포함하는 변경 없는 파일도 함께 재집계 (부분 합으로 덮어쓰기 방지)
+            # --append-delta는 증감분만 더하므로 재집계 불필요
+            overlapping = [] if args.append_delta else files_with_dates(manifest, plan['unchanged'], target_dates)
+            
+            # staging에 저장된 파일은 해당 날짜 파티션만 Parquet에서 읽음 (CSV 재파싱 생략)
+            staged = [f for f in overlapping if has_staged_file(f)] if args.staging else []
+            if staged:
+                logger.info(f"Reading {len(staged)} unchanged files from staging for "
+                            f"{len(target_dates)} affected dates")
+                staged_aggregate, _ = aggregate_staging(dates=target_dates, sources=staged)
+                aggregated_df = merge_aggregates(aggregated_df, staged_aggregate)
             
-            aggregated_df = aggregate_data(combined_df)
+            overlapping = [f for f in overlapping if f not in staged]
+            if overlapping:
+                logger.info(f"Re-reading {len(overlapping)} unchanged files sharing "
+                            f"{len(target_dates)} affected dates")
+                more_data, more_aggregated, _ = collect_file_results(
+                    [(kinds[f], f, partitions[f]) for f in overlapping], args, stats, file_timings, profiler
+                )
+                all_data.extend(more_data)
+                aggregated_df = merge_aggregates(aggregated_df, more_aggregated)
+    
+    # 4. Merge and aggregate
+    aggregated_df = combine_file_results(all_data, aggregated_df, stats)
+    
+    if target_dates is not None and not aggregated_df.empty:
+        aggregated_df = aggregated_df[aggregated_df['date'].isin(target_dates)]
+    
+    # 수정된 파일에서 빠진 키 (이전 날짜의 기존 문서 중 새 집계에 없는 것)
+    # --append-delta는 ledger의 이전 반영분을 빼고, 합계가 0이 된 문서는 업로드 단계에서 삭제
+    removed_df = pd.DataFrame(columns=GROUP_KEYS)
+    if manifest is not None and not args.append_delta:
+        removed_df = find_removed_keys(db, plan, target_files, aggregated_df)
+    
+    if not aggregated_df.empty or not removed_df.empty:
+        if not aggregated_df.empty:
             logger.info(f"✓ Aggregated to {len(aggregated_df)} unique records")
             
-            # 6. Upload to Firestore
-            uploaded_count = upload_to_firestore(db, 'metrics_daily', aggregated_df)
-            stats['rows_uploaded'] = uploaded_count
-            logger.info(f"✓ Uploaded {uploaded_count} records to Firestore")
+            # GA x 광고 매칭 + KPI (--append-delta는 반영 후 문서에서 다시 계산)
+            if not args.append_delta:
+                aggregated_df = join_aggregates(aggregated_df, stats)
+            count_partition_records(aggregated_df, stats)
+        
+        # 5. Upload to Firestore
+        # 전체 재처리/재업로드는 fingerprint와 무관하게 모두 씀 (다른 대상으로 옮길 때 누락 방지, fingerprint는 갱신)
+        force_upload = args.full_upload or args.reprocess_all or args.from_staging
+        fingerprint_store = open_fingerprint_store(fingerprint_target(db))
+        try:
+            with stage('upload', rows=len(aggregated_df)):
+                if args.append_delta:
+                    # 증감분만 Increment로 반영 (이후 롤업/로컬 저장소도 증감분 기준)
+                    aggregated_df, upload_report = apply_file_deltas(
+                        db, file_timings, plan, fingerprint_store, file_dates, args
+                    )
+                    kpi_report = refresh_metric_kpis(
+                        db, 'metrics_daily', aggregated_df, fingerprint_store=fingerprint_store,
+                        max_in_flight=args.upload_concurrency, max_attempts=args.upload_attempts
+                    )
+                    upload_report['failed_ids'] = upload_report['failed_ids'] + kpi_report['failed_ids']
+                    if kpi_report['deleted_ids']:
+                        # 합계가 0이 된 문서는 삭제됨 (이후 롤업/묶음/스냅샷/로컬 저장소에서도 제거)
+                        deleted = pd.Series(metric_document_ids(aggregated_df), index=aggregated_df.index).isin(
+                            set(kpi_report['deleted_ids'])
+                        )
+                        removed_df = aggregated_df.loc[deleted, GROUP_KEYS].reset_index(drop=True)
+                        aggregated_df = aggregated_df[~deleted]
+                        stats['docs_deleted'] = kpi_report['deleted']
+                        logger.info(f"✓ Deleted {kpi_report['deleted']} metrics_daily documents whose totals reached zero")
+                elif args.async_upload:
+                    # 문서 생성과 배치 커밋을 겹쳐서 진행 (AsyncClient)
+                    upload_report = asyncio.run(async_upload_with_client(
+                        'metrics_daily', aggregated_df,
+                        fingerprint_store=fingerprint_store, force=force_upload,
+                        max_in_flight=args.upload_concurrency, max_attempts=args.upload_attempts
+                    ))
+                else:
+                    upload_report = upload_metrics(
+                        db, 'metrics_daily', aggregated_df,
+                        fingerprint_store=fingerprint_store, force=force_upload,
+                        max_in_flight=args.upload_concurrency, max_attempts=args.upload_attempts
+                    )
+                if not removed_df.empty and not args.append_delta:
+                    # 사라진 키의 문서 삭제 (이후 롤업/묶음/스냅샷도 해당 날짜를 다시 계산)
+                    delete_report = delete_documents(
+                        db, 'metrics_daily', metric_document_ids(removed_df), fingerprint_store=fingerprint_store,
+                        max_in_flight=args.upload_concurrency, max_attempts=args.upload_attempts
+                    )
+                    stats['docs_deleted'] = delete_report['written']
+                    upload_report['failed_ids'] = upload_report['failed_ids'] + delete_report['failed_ids']
+                    logger.info(f"✓ Deleted {delete_report['written']} metrics_daily documents no longer in the input")
+            stats['rows_uploaded'] = upload_report['written']
+            stats['upload_docs_per_sec'] = upload_report['docs_per_sec']
+            stats['upload_failed_ids'] = upload_report['failed_ids']
+            for key in ('inserted', 'updated', 'skipped'):
+                stats[f'docs_{key}'] = upload_report[key]
+            
+            # 6. Update rollup documents (day/week/month)
+            if not args.skip_rollups:
+                with stage('rollups', rows=len(aggregated_df)):
+                    rollup_report = update_rollups(
+                        db, aggregated_df, fingerprint_store=fingerprint_store, force=force_upload,
+                        run_totals=not args.append_delta, removed_df=removed_df,
+                        max_in_flight=args.upload_concurrency, max_attempts=args.upload_attempts
+                    )
+                stats['rollups_written'] = rollup_report['written']
+                stats['upload_failed_ids'] = stats['upload_failed_ids'] + rollup_report['failed_ids']
+            
+            # 6-1. Update packed series documents (project/channel/month)
+            if not args.skip_series:
+                with stage('series', rows=len(aggregated_df)):
+                    series_report = update_series(
+                        db, aggregated_df, fingerprint_store=fingerprint_store, force=force_upload,
+                        run_totals=not args.append_delta, removed_df=removed_df,
+                        max_in_flight=args.upload_concurrency, max_attempts=args.upload_attempts
+                    )
+                stats['series_written'] = series_report['written']
+                stats['upload_failed_ids'] = stats['upload_failed_ids'] + series_report['failed_ids']
+            
+            # 6-2. Publish dashboard snapshots (last 7/30/90 days per project)
+            if not args.skip_snapshots:
+                with stage('snapshots', rows=len(aggregated_df)):
+                    snapshot_report = update_snapshots(
+                        db, aggregated_df, use_series=not args.skip_series,
+                        fingerprint_store=fingerprint_store, force=force_upload, removed_df=removed_df,
+                        max_in_flight=args.upload_concurrency, max_attempts=args.upload_attempts
+                    )
+                stats['snapshots_written'] = snapshot_report['written']
+                stats['upload_failed_ids'] = stats['upload_failed_ids'] + snapshot_report['failed_ids']
+        finally:
+            fingerprint_store.close()
+        logger.info(f"✓ Uploaded {upload_report['written']} records to Firestore")
+        
+        # 7. Sync local query store (src/query.py)
+        if not args.skip_query_store:
+            with stage('query_store', rows=len(aggregated_df)):
+                metrics_store = open_metrics_store()
+                try:
+                    sync = sync_metric_deltas if args.append_delta else sync_metrics
+                    stats['query_store_rows'] = sync(metrics_store, aggregated_df)
+                    remove_metrics(metrics_store, removed_df)
+                finally:
+                    metrics_store.close()
+            logger.info(f"✓ Synced {stats['query_store_rows']} records to local query store")
+    else:
+        logger.warning("⚠ No valid data to process")
+    
+    # 업로드가 모두 성공한 경우에만 manifest 기록 (실패 시 다음 실행에서 재처리)
+    if manifest is not None:
+        if stats['upload_failed_ids']:
+            logger.warning("⚠ Manifest not updated because some documents failed to upload")
+        else:
+            record_files(manifest, plan['changed'], file_dates)
+        manifest.close()
+    
+    return file_timings
+
+def run_dry_run(args, config, profiler, stats, input_files=None):
+    """
+    입력 파일을 변환/집계하고 metrics_daily에 쓰일 문서 수만 계산합니다. (--dry-run, 2~5단계)
+    Firestore에 연결하지 않으며 manifest, fingerprint, staging, 로컬 지표 저장소를 갱신하지 않습니다.
+    - manifest를 보지 않으므로 입력 파일 전체를 처리합니다.
+    - fingerprint 저장소가 있으면 읽기만 하여 new/changed/unchanged를 셉니다.
+    - 롤업/시리즈/스냅샷은 기존 Firestore 문서가 필요하므로 계산하지 않습니다.
+    
+    Returns:
+        list: 파일별 처리 결과 (file_timings)
+    """
+    if args.from_staging:
+        file_timings = []
+        aggregated_df, rows_read = aggregate_staging()
+        stats['rows_processed'] = rows_read
+        logger.info(f"✓ Read {rows_read} staged rows")
+    else:
+        all_data, aggregated_df, file_timings = process_input_files(args, config, profiler, stats, input_files)
+        aggregated_df = combine_file_results(all_data, aggregated_df, stats)
+    
+    if aggregated_df.empty:
+        logger.warning("⚠ No valid data to process")
+        return file_timings
+    
+    logger.info(f"✓ Aggregated to {len(aggregated_df)} unique records")
+    aggregated_df = join_aggregates(aggregated_df, stats)
+    count_partition_records(aggregated_df, stats)
+    
+    with stage('build_documents', rows=len(aggregated_df)):
+        documents = build_metric_documents(aggregated_df)
+    counts = {'inserted': len(documents), 'updated': 0, 'skipped': 0}
+    target = fingerprint_target()
+    if fingerprint_store_path(target).exists():
+        fingerprint_store = open_fingerprint_store(target)
+        try:
+            _, _, counts = diff_documents(fingerprint_store, 'metrics_daily', documents)
+        finally:
+            fingerprint_store.close()
+    for key in ('inserted', 'updated', 'skipped'):
+        stats[f'docs_{key}'] = counts[key]
+    
+    force_upload = args.full_upload or args.reprocess_all or args.from_staging
+    would_write = len(documents) if force_upload else counts['inserted'] + counts['updated']
+    logger.info(f"✓ Dry run: {would_write} of {len(documents)} metrics_daily documents would be written "
+                f"({counts['inserted']} new, {counts['updated']} changed, {counts['skipped']} unchanged)")
+    return file_timings
+
+def log_run_summary(args, stats, file_timings, profiler, start_time):
+    """
+    실행 요약을 로그에 기록합니다. (8단계)
+    """
+    end_time = datetime.now()
+    stats['frame_memory_before_mb'] = profiler.total('compact', 'memory_before_mb')
+    stats['frame_memory_after_mb'] = profiler.total('compact', 'memory_after_mb')
+    duration = (end_time - start_time).total_seconds()
+    
+    logger.info("="*50)
+    logger.info("ETL Pipeline Completed Successfully")
+    logger.info("="*50)
+    logger.info(f"Duration: {duration:.2f} seconds")
+    if stats['startup_seconds'] is not None:
+        logger.info(f"Startup: {stats['startup_seconds']:.2f} seconds (imports {stats['import_seconds']:.2f}s)")
+    if args.dry_run:
+        logger.info("Dry Run: Firestore not contacted, no documents written, local state unchanged")
+    logger.info(f"Files Processed: {stats['files_processed']}")
+    logger.info(f"Files Failed: {stats['files_failed']}")
+    logger.info(f"Files Skipped (unchanged): {stats['files_skipped']}")
+    logger.info(f"Rows Processed: {stats['rows_processed']}")
+    logger.info(f"Rows Uploaded: {stats['rows_uploaded']}")
+    logger.info(f"Docs Inserted/Updated/Skipped: {stats['docs_inserted']}/"
+                f"{stats['docs_updated']}/{stats['docs_skipped']}")
+    if stats['docs_deleted']:
+        logger.info(f"Docs Deleted (no longer in input): {stats['docs_deleted']}")
+    logger.info(f"Rollup Docs Written: {stats['rollups_written']}")
+    logger.info(f"Series Docs Written: {stats['series_written']}")
+    logger.info(f"Snapshot Docs Written: {stats['snapshots_written']}")
+    logger.info(f"Unmatched Spend/Sessions Records: {stats['unmatched_spend']}/{stats['unmatched_sessions']}")
+    logger.info(f"Query Store Rows Synced: {stats['query_store_rows']}")
+    logger.info(f"Upload Throughput: {stats['upload_docs_per_sec']:.1f} docs/sec")
+    if stats['upload_failed_ids']:
+        logger.error(f"Upload Failed IDs ({len(stats['upload_failed_ids'])}): "
+                     f"{', '.join(stats['upload_failed_ids'])}")
+    if uses_partial_aggregates(args):
+        logger.info(f"Peak Aggregate Rows: {stats['peak_aggregate_rows']}")
+    if stats['frame_memory_before_mb']:
+        logger.info(f"Transformed Frame Memory: {stats['frame_memory_before_mb']:.2f} MB -> "
+                    f"{stats['frame_memory_after_mb']:.2f} MB (compact dtypes)")
+    peak_rss_mb = get_peak_rss_mb()
+    if peak_rss_mb is not None:
+        logger.info(f"Peak Memory (RSS): {peak_rss_mb:.1f} MB")
+    if args.workers > 1 and peak_rss_mb is not None:
+        logger.info(f"Peak Worker Memory (RSS): {get_peak_rss_mb(children=True):.1f} MB")
+    if len(stats['partitions']) > 1 or args.partition_rules:
+        logger.info("Per-partition Stats (project/landing):")
+        for key, partition in sorted(stats['partitions'].items()):
+            logger.info(f"  - {key}: {partition['files_processed']} files processed, "
+                        f"{partition['files_failed']} failed, {partition['rows_processed']} rows, "
+                        f"{partition['records']} records")
+    if file_timings:
+        logger.info(f"Per-file Timings (workers={args.workers}):")
+        for result in file_timings:
+            status = 'failed' if result['error'] is not None or result['df'].empty else 'ok'
+            seconds = f"{result['seconds']:.2f}s" if result['seconds'] is not None else 'n/a'
+            logger.info(f"  - {FILE_LABELS[result['kind']]} {result['file']}: {seconds}, "
+                        f"{result['rows']} rows ({status})")
+    logger.info("="*50)
+
+def snapshot_input_files():
+    """
+    data/input의 ga_*.csv / ad_*.csv 파일별 (크기, mtime)을 반환합니다.
+    """
+    snapshot = {}
+    for pattern in ('ga_*.csv', 'ad_*.csv'):
+        for file_path in INPUT_DIR.glob(pattern):
+            try:
+                stat = file_path.stat()
+            except FileNotFoundError:
+                # 스캔 도중 이동/삭제된 파일
+                continue
+            snapshot[file_path] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
+
+def run_watch_cycle(args, config, db, input_files, cycle):
+    """
+    watch 모드에서 한 번의 마이크로 배치를 실행합니다. 실패해도 watch 루프는 계속됩니다.
+    
+    Returns:
+        bool: 성공 여부 (업로드 실패 문서가 없고 예외가 없으면 True)
+    """
+    start_time = datetime.now()
+    profiler = RunProfiler(trace_memory=args.trace_memory, profile=args.profile)
+    profiler.start()
+    stats = new_run_stats()
+    
+    try:
+        file_timings = run_pipeline(args, config, db, profiler, stats, input_files=input_files)
+        log_run_summary(args, stats, file_timings, profiler, start_time)
+    except Exception as e:
+        logger.error(f"✗ Watch cycle {cycle} failed: {str(e)}")
+        import traceback
+        logger.error(traceback.format_exc())
+        stats['error'] = str(e)
+    finally:
+        write_run_report(profiler, args, stats, start_time, name=f"cycle{cycle:04d}")
+    
+    return 'error' not in stats and not stats['upload_failed_ids']
+
+def watch_input(args):
+    """
+    data/input을 주기적으로 확인하여 새로 들어온/변경된 파일을 바로 처리합니다. (--watch)
+    Firestore 클라이언트와 채널 매핑 규칙은 한 번만 준비하여 계속 사용합니다.
+    
+    - 두 번 연속 같은 (크기, mtime)인 파일만 처리 (복사 중인 파일 제외)
+    - 한 번의 확인에서 준비된 파일들은 하나의 마이크로 배치로 처리
+    - 변경 없는 파일은 manifest로 건너뛰고, 같은 날짜의 기존 파일은 함께 재집계
+    - SIGINT(Ctrl+C)/SIGTERM을 받으면 진행 중인 배치를 마친 뒤 종료
+    """
+    with stage('initialize'):
+        config, db = initialize_pipeline(args)
+    drain_records()
+    
+    logger.info(f"Watching {INPUT_DIR} for ga_*.csv / ad_*.csv (poll every {args.poll_interval}s, Ctrl+C to stop)")
+    
+    previous = {}
+    processed = {}
+    retry_at = 0.0
+    cycle = 0
+    
+    stop = threading.Event()
+    def request_stop(signum, frame):
+        logger.info("Stop requested, finishing current batch...")
+        stop.set()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, request_stop)
+    
+    while not stop.is_set():
+        current = snapshot_input_files()
+        stable = {path: sig for path, sig in current.items() if previous.get(path) == sig}
+        ready = [path for path, sig in stable.items() if processed.get(path) != sig]
+        
+        if ready and time.monotonic() >= retry_at:
+            cycle += 1
+            logger.info(f"Watch cycle {cycle}: {len(ready)} new/updated files "
+                        f"({', '.join(sorted(path.name for path in ready))})")
+            # 변경 중인 파일을 제외한 전체를 넘겨 같은 날짜의 기존 파일도 재집계되도록 함
+            if run_watch_cycle(args, config, db, list(stable), cycle):
+                processed.update(stable)
+            else:
+                retry_at = time.monotonic() + WATCH_RETRY_DELAY
+                logger.warning(f"⚠ Watch cycle {cycle} incomplete, retrying in {WATCH_RETRY_DELAY}s")
+        
+        previous = current
+        stop.wait(args.poll_interval)
+    
+    logger.info(f"Watch mode stopped after {cycle} cycles")
+
+def main(argv=None):
+    """
+    메인 ETL 파이프라인 실행
+    """
+    args = parse_args(argv)
+    import_seconds = IMPORT_SECONDS + load_dependencies()
+    setup_logging()
+    
+    logger.info("="*50)
+    logger.info("ETL Pipeline Started" + (" (dry run)" if args.dry_run else ""))
+    logger.info("="*50)
+    
+    if args.watch:
+        watch_input(args)
+        return
+    
+    start_time = datetime.now()
+    
+    # Per-stage instrumentation (--trace-memory, --profile)
+    profiler = RunProfiler(trace_memory=args.trace_memory, profile=args.profile)
+    profiler.start()
+    
+    # Statistics tracking
+    stats = new_run_stats()
+    
+    try:
+        # 1. Initialize (--dry-run: Firestore 클라이언트 없음)
+        with stage('initialize'):
+            if args.dry_run:
+                config, db = initialize_dry_run(args), None
+            else:
+                config, db = initialize_pipeline(args)
+        stats['import_seconds'] = import_seconds
+        stats['startup_seconds'] = time.perf_counter() - _import_started
+        
+        # 2-7. Process, upload, rollups, query store
+        if args.dry_run:
+            file_timings = run_dry_run(args, config, profiler, stats)
         else:
-            logger.warning("⚠ No valid data to process")
-        
-        # 7. Final summary
-        end_time = datetime.now()
-        duration = (end_time - start_time).total_seconds()
-        
-        logger.info("="*50)
-        logger.info("ETL Pipeline Completed Successfully")
-        logger.info("="*50)
-        logger.info(f"Duration: {duration:.2f} seconds")
-        logger.info(f"Files Processed: {stats['files_processed']}")
-        logger.info(f"Files Failed: {stats['files_failed']}")
-        logger.info(f"Rows Processed: {stats['rows_processed']}")
-        logger.info(f"Rows Uploaded: {stats['rows_uploaded']}")
-        logger.info("="*50)
+            file_timings = run_pipeline(args, config, db, profiler, stats)
+        
+        # 8. Final summary
+        log_run_summary(args, stats, file_timings, profiler, start_time)
         
     except Exception as e:
         logger.error(f"✗ ETL Pipeline failed: {str(e)}")
         import traceback
         logger.error(traceback.format_exc())
+        stats['error'] = str(e)
         raise
+    
+    finally:
+        write_run_report(profiler, args, stats, start_time)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,156 @@
+"""
+==================================================
+Processed-File Manifest
+==================================================
+Local SQLite manifest of input files that have already been loaded,
+keyed by path with size, mtime and a content checksum, plus the set
+of dates each file contributed.
+
+Used by main() for incremental runs:
+- unchanged files are skipped
+- only the date partitions touched by new/modified files are
+  re-aggregated (together with any unchanged files that share
+  those dates) and re-uploaded
+
+path_hash (same resolved-path key) also names the per-file reject
+reports and staging pieces, so same-named files from different
+folders stay apart.
+==================================================
+"""
+
+import json
+import sqlite3
+import hashlib
+from pathlib import Path
+from datetime import datetime
+
+DEFAULT_MANIFEST_PATH = Path(__file__).parent.parent / 'data' / 'state' / 'file_manifest.sqlite'
+
+def open_manifest(path=DEFAULT_MANIFEST_PATH):
+    """
+    Manifest 저장소(SQLite)를 열고 테이블을 준비합니다.
+
+    Returns:
+        sqlite3.Connection
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(str(path))
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS processed_files (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime REAL NOT NULL,
+            checksum TEXT NOT NULL,
+            dates TEXT NOT NULL,
+            processed_at TEXT NOT NULL
+        )
+        """
+    )
+    return conn
+
+def file_checksum(file_path, block_size=1024 * 1024):
+    """
+    파일 내용의 SHA-256 체크섬을 계산합니다.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def path_hash(file_path):
+    """
+    원본 파일 전체 경로(manifest 키와 같은 resolve 경로)의 짧은 해시입니다.
+    파일별 산출물(거부 리포트, staging 조각) 이름에 붙여 다른 폴더의 같은 이름 파일을 구분합니다.
+    """
+    return hashlib.sha1(str(Path(file_path).resolve()).encode('utf-8')).hexdigest()[:8]
+
+def plan_files(conn, file_paths):
+    """
+    입력 파일들을 manifest와 비교하여 새 파일/변경 파일/변경 없는 파일로 분류합니다.
+    크기와 mtime이 같으면 체크섬 계산 없이 변경 없음으로 간주합니다.
+
+    Args:
+        file_paths (list): 입력 파일 경로 목록
+
+    Returns:
+        dict:
+            - changed: {path: {'size', 'mtime', 'checksum', 'status'}} (status: 'new' 또는 'modified')
+            - unchanged: [path, ...]
+            - previous_dates: {path: set(dates)} (변경 파일의 이전 날짜, 재집계 대상)
+    """
+    plan = {'changed': {}, 'unchanged': [], 'previous_dates': {}}
+
+    for file_path in file_paths:
+        key = str(Path(file_path).resolve())
+        stat = Path(file_path).stat()
+        row = conn.execute(
+            "SELECT size, mtime, checksum, dates FROM processed_files WHERE path = ?", (key,)
+        ).fetchone()
+
+        if row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime:
+            plan['unchanged'].append(file_path)
+            continue
+
+        checksum = file_checksum(file_path)
+        if row is not None and row[2] == checksum:
+            # 내용은 같고 mtime만 바뀐 경우 (touch, 복사 등)
+            plan['unchanged'].append(file_path)
+            conn.execute(
+                "UPDATE processed_files SET size = ?, mtime = ? WHERE path = ?",
+                (stat.st_size, stat.st_mtime, key)
+            )
+            continue
+
+        plan['changed'][file_path] = {
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'checksum': checksum,
+            'status': 'new' if row is None else 'modified'
+        }
+        if row is not None:
+            plan['previous_dates'][file_path] = set(json.loads(row[3]))
+
+    conn.commit()
+    return plan
+
+def files_with_dates(conn, file_paths, dates):
+    """
+    주어진 날짜 중 하나라도 포함하는 (manifest에 기록된) 파일만 골라냅니다.
+
+    Returns:
+        list: 해당 날짜 파티션에 기여하는 파일 경로 목록
+    """
+    overlapping = []
+    for file_path in file_paths:
+        row = conn.execute(
+            "SELECT dates FROM processed_files WHERE path = ?", (str(Path(file_path).resolve()),)
+        ).fetchone()
+        if row is not None and dates.intersection(json.loads(row[0])):
+            overlapping.append(file_path)
+    return overlapping
+
+def record_files(conn, changed, file_dates):
+    """
+    처리 완료된 파일을 manifest에 기록합니다.
+
+    Args:
+        changed (dict): plan_files의 'changed' 항목 (path -> size/mtime/checksum)
+        file_dates (dict): path -> 파일에 포함된 날짜 목록
+    """
+    processed_at = datetime.now().isoformat(timespec='seconds')
+    with conn:
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO processed_files (path, size, mtime, checksum, dates, processed_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (str(Path(path).resolve()), info['size'], info['mtime'], info['checksum'],
+                 json.dumps(sorted(file_dates[path])), processed_at)
+                for path, info in changed.items() if path in file_dates
+            ]
+        )
@@ -0,0 +1,150 @@
+"""
+==================================================
+Project / Landing Partition Routing
+==================================================
+Routes each input file to a (project_id, landing_id) partition so
+several projects and landing pages can be loaded in one run (one
+Firestore client, one worker pool) instead of one run per .env.
+
+Partition rules come from a config table (--partitions):
+- JSON: [{"pattern": "ga_brand_a_*.csv", "project_id": "p_brand_a",
+          "landing_id": "landing_a"}, ...]
+- CSV: pattern,project_id,landing_id header
+- 'firestore': landings collection documents with a file_pattern field
+
+A pattern is either a glob on the file name, or a regex ("regex"
+key) whose named groups (?P<project_id>...) / (?P<landing_id>...)
+take the partition from the file name itself. The first matching
+rule wins; missing values fall back to PROJECT_ID / LANDING_ID.
+
+Rows can also carry their own partition: if a CSV has project_id /
+landing_id columns, non-empty values override the file's partition
+(apply_partition_columns).
+==================================================
+"""
+
+import re
+import json
+from fnmatch import fnmatch
+from pathlib import Path
+import pandas as pd
+
+PARTITION_COLUMNS = ['project_id', 'landing_id']
+
+# ==================================================
+# SECTION 1: RULES
+# ==================================================
+
+def _has_value(value):
+    return value is not None and not (isinstance(value, float) and pd.isna(value)) and str(value).strip() != ''
+
+def _rules_from_records(records):
+    """
+    설정 레코드를 규칙 목록으로 정리합니다. (pattern 또는 regex가 없는 레코드는 무시)
+
+    Returns:
+        list: {'pattern', 'regex', 'project_id', 'landing_id'} (없는 값은 None)
+    """
+    rules = []
+    for record in records:
+        pattern = record.get('pattern') or record.get('file_pattern')
+        regex = record.get('regex')
+        if not _has_value(pattern) and not _has_value(regex):
+            continue
+        rules.append({
+            'pattern': str(pattern).strip() if _has_value(pattern) else None,
+            'regex': re.compile(str(regex).strip()) if _has_value(regex) else None,
+            'project_id': str(record['project_id']).strip() if _has_value(record.get('project_id')) else None,
+            'landing_id': str(record['landing_id']).strip() if _has_value(record.get('landing_id')) else None,
+        })
+    return rules
+
+def load_partition_rules_file(path):
+    """
+    설정 파일에서 파티션 규칙을 읽습니다.
+    - JSON: [{"pattern": ..., "project_id": ..., "landing_id": ...}, ...]
+    - CSV: pattern,project_id,landing_id 헤더 (regex 컬럼 선택)
+
+    Returns:
+        list: 규칙 목록 (파일 순서 = 우선순위)
+    """
+    path = Path(path)
+    if path.suffix.lower() == '.json':
+        with open(path, encoding='utf-8') as f:
+            records = json.load(f)
+    else:
+        records = pd.read_csv(path, dtype=str).to_dict('records')
+
+    return _rules_from_records(records)
+
+def load_partition_rules_firestore(db, collection_name='landings'):
+    """
+    Firestore landings 컬렉션에서 파티션 규칙을 읽습니다.
+    file_pattern (또는 regex) 필드가 있는 문서만 사용하며, landing_id가 없으면 문서 ID를 사용합니다.
+
+    Returns:
+        list: 규칙 목록 (문서 ID 순)
+    """
+    records = []
+    for doc in db.collection(collection_name).stream():
+        record = doc.to_dict()
+        record.setdefault('landing_id', doc.id)
+        records.append(record)
+
+    return _rules_from_records(records)
+
+# ==================================================
+# SECTION 2: ROUTING
+# ==================================================
+
+def resolve_partition(file_path, rules, default):
+    """
+    파일 이름으로 파티션을 정합니다. 처음 일치한 규칙을 사용합니다.
+
+    Args:
+        rules (list): load_partition_rules_* 결과
+        default (tuple): 규칙이 없거나 값이 빠진 경우의 (project_id, landing_id)
+
+    Returns:
+        tuple: (project_id, landing_id)
+    """
+    name = Path(file_path).name
+    for rule in rules:
+        if rule['regex'] is not None:
+            match = rule['regex'].fullmatch(name)
+            if match is None:
+                continue
+            groups = match.groupdict()
+            project_id = rule['project_id'] or groups.get('project_id') or default[0]
+            landing_id = rule['landing_id'] or groups.get('landing_id') or default[1]
+            return project_id, landing_id
+        if fnmatch(name, rule['pattern']):
+            return rule['project_id'] or default[0], rule['landing_id'] or default[1]
+    return default
+
+def partition_key(project_id, landing_id):
+    """통계/로그용 파티션 이름 ('p_main/landing_main')"""
+    return f"{project_id}/{landing_id}"
+
+def apply_partition_columns(result_df, source_df):
+    """
+    원본에 project_id / landing_id 컬럼이 있으면 비어 있지 않은 값으로 행의 파티션을 덮어씁니다.
+
+    Args:
+        result_df (pd.DataFrame): 변환 결과 (원본 행 인덱스 유지, 파일 파티션이 채워져 있음)
+        source_df (pd.DataFrame): 원본 DataFrame (또는 청크)
+
+    Returns:
+        pd.DataFrame
+    """
+    if result_df.empty:
+        return result_df
+
+    for column in PARTITION_COLUMNS:
+        if column not in source_df.columns:
+            continue
+        values = source_df[column].reindex(result_df.index)
+        present = values.notna() & values.astype(str).str.strip().ne('')
+        if present.any():
+            result_df[column] = result_df[column].astype(object).where(~present, values.astype(str).str.strip())
+    return result_df
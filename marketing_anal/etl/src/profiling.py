@@ -0,0 +1,198 @@
+"""
+==================================================
+ETL Run Instrumentation
+==================================================
+Per-stage / per-file performance metrics for an ETL run:
+- wall time, CPU time, rows/sec
+- peak RSS at the end of each stage
+- allocated memory blocks (net) per stage
+- optional tracemalloc peak per stage (--trace-memory)
+- optional cProfile capture (--profile)
+
+Stages are recorded in a process-local list so that worker
+processes can hand their records back to the parent with each
+file result. Records with the same (stage, file) key, e.g. the
+chunks of a streamed file, are merged in the run report.
+==================================================
+"""
+
+import sys
+import json
+import time
+import pstats
+import cProfile
+import tracemalloc
+from io import StringIO
+from contextlib import contextmanager
+
+# 현재 프로세스에서 수집 중인 단계 기록
+_records = []
+
+# 같은 단계 기록을 합칠 때 합산하는 선택 항목 (예: compact 단계의 전후 메모리)
+OPTIONAL_SUM_FIELDS = ('memory_before_mb', 'memory_after_mb')
+
+def get_peak_rss_mb(children=False):
+    """
+    현재 프로세스의 최대 메모리 사용량(RSS, MB)을 반환합니다.
+    resource 모듈이 없는 환경(Windows)에서는 None을 반환합니다.
+
+    Args:
+        children: True이면 종료된 자식(워커) 프로세스 중 최대값
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # macOS는 bytes, Linux는 KB 단위
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+@contextmanager
+def stage(name, file=None, rows=None):
+    """
+    코드 블록의 성능 지표를 기록합니다.
+
+    Usage:
+        with stage('read_csv', file=path.name) as record:
+            df = pd.read_csv(path)
+            record['rows'] = len(df)
+
+    Yields:
+        dict: 단계 기록 (블록 안에서 rows 등을 채울 수 있음)
+    """
+    record = {'stage': name, 'file': file, 'rows': rows}
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+
+    blocks_before = sys.getallocatedblocks()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield record
+    finally:
+        record['wall_seconds'] = time.perf_counter() - wall_start
+        record['cpu_seconds'] = time.process_time() - cpu_start
+        record['alloc_blocks'] = sys.getallocatedblocks() - blocks_before
+        record['peak_rss_mb'] = get_peak_rss_mb()
+        if tracing:
+            record['traced_peak_mb'] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        _records.append(record)
+
+def drain_records():
+    """
+    수집된 단계 기록을 꺼내고 비웁니다. (파일 작업 결과에 담아 부모 프로세스로 전달)
+    """
+    records = list(_records)
+    _records.clear()
+    return records
+
+def merge_records(records):
+    """
+    같은 (stage, file) 기록을 합칩니다. (스트리밍 청크 등)
+    시간/행 수/할당 블록은 합산, 메모리는 최대값을 사용합니다.
+
+    Returns:
+        list: 합쳐진 단계 기록 (rows_per_sec 포함)
+    """
+    merged = {}
+    for record in records:
+        key = (record['stage'], record['file'])
+        if key not in merged:
+            merged[key] = dict(record)
+            continue
+
+        target = merged[key]
+        for field in ('wall_seconds', 'cpu_seconds', 'alloc_blocks'):
+            target[field] += record[field]
+        for field in OPTIONAL_SUM_FIELDS:
+            if record.get(field) is not None:
+                target[field] = (target.get(field) or 0) + record[field]
+        if record.get('rows') is not None:
+            target['rows'] = (target.get('rows') or 0) + record['rows']
+        for field in ('peak_rss_mb', 'traced_peak_mb'):
+            if record.get(field) is not None:
+                target[field] = max(target.get(field) or 0, record[field])
+
+    results = []
+    for record in merged.values():
+        rows, wall = record.get('rows'), record['wall_seconds']
+        record['rows_per_sec'] = rows / wall if rows and wall > 0 else None
+        results.append(record)
+    return results
+
+class RunProfiler:
+    """
+    ETL 실행 전체의 계측 데이터를 모아 JSON 리포트로 저장합니다.
+
+    Args:
+        trace_memory (bool): tracemalloc으로 단계별 최대 할당량 측정 (느려짐)
+        profile (bool): cProfile로 함수별 프로파일 수집
+    """
+
+    def __init__(self, trace_memory=False, profile=False):
+        self.trace_memory = trace_memory
+        self.records = []
+        self._profiler = cProfile.Profile() if profile else None
+
+    def start(self):
+        if self.trace_memory:
+            tracemalloc.start()
+        if self._profiler is not None:
+            self._profiler.enable()
+
+    def stop(self):
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def add(self, records):
+        """워커 등에서 전달받은 단계 기록을 추가합니다."""
+        self.records.extend(records)
+
+    def collect(self):
+        """현재 프로세스에서 수집된 단계 기록을 가져옵니다."""
+        self.add(drain_records())
+
+    def total(self, stage_name, field):
+        """
+        지금까지 수집된 기록 중 한 단계의 항목 합계를 반환합니다. (예: total('compact', 'memory_after_mb'))
+        """
+        self.collect()
+        return sum(r.get(field) or 0 for r in self.records if r['stage'] == stage_name)
+
+    def _profile_top(self, limit=30):
+        stream = StringIO()
+        stats = pstats.Stats(self._profiler, stream=stream)
+        stats.sort_stats('cumulative').print_stats(limit)
+        return stream.getvalue().splitlines()
+
+    def write_report(self, report_path, summary):
+        """
+        실행 리포트(JSON)를 저장합니다. --profile 사용 시 .prof 파일도 함께 저장합니다.
+
+        Args:
+            report_path (Path): 리포트 경로 (logs/etl_*.json)
+            summary (dict): 실행 요약 (stats, args 등)
+        """
+        self.collect()
+        stages = merge_records(self.records)
+        report = dict(summary)
+        report['stages'] = [r for r in stages if r['file'] is None]
+        report['files'] = [r for r in stages if r['file'] is not None]
+        report['peak_rss_mb'] = get_peak_rss_mb()
+        report['peak_worker_rss_mb'] = get_peak_rss_mb(children=True)
+
+        if self._profiler is not None:
+            profile_path = report_path.with_suffix('.prof')
+            self._profiler.dump_stats(str(profile_path))
+            report['profile_file'] = str(profile_path)
+            report['profile_top'] = self._profile_top()
+
+        report_path.write_text(json.dumps(report, indent=2, default=str), encoding='utf-8')
+        return report_path
@@ -0,0 +1,325 @@
+"""
+==================================================
+Local Metrics Query Engine
+==================================================
+Embedded SQLite copy of the aggregate_data output (the same rows
+that are uploaded to metrics_daily), kept in sync by main() after
+each run, so ad-hoc questions can be answered locally without
+reading Firestore.
+
+KPIs follow the dashboard (frontend/lib/firebase.ts):
+- CTR  = clicks / impressions * 100
+- CPC  = cost / clicks
+- CVR  = conversions / sessions * 100
+- ROAS = revenue / cost * 100
+
+Usage:
+    python src/query.py channels --project p_main --days 30
+    python src/query.py trend --project p_main --start 2025-11-01 --end 2025-11-30
+    python src/query.py summary --project p_main
+    python src/query.py sql "SELECT channel_id, SUM(cost) FROM metrics_daily GROUP BY 1"
+    python src/query.py sync            # staging(Parquet) 전체로 다시 채우기
+==================================================
+"""
+
+import sys
+import sqlite3
+import argparse
+from pathlib import Path
+from datetime import datetime, timedelta
+import pandas as pd
+
+DEFAULT_METRICS_DB_PATH = Path(__file__).parent.parent / 'data' / 'state' / 'metrics.sqlite'
+
+KEY_COLUMNS = ['date', 'project_id', 'landing_id', 'channel_id']
+VALUE_COLUMNS = ['sessions', 'impressions', 'clicks', 'cost', 'revenue', 'purchase_conversions']
+
+# ==================================================
+# SECTION 1: STORE
+# ==================================================
+
+def open_metrics_store(path=DEFAULT_METRICS_DB_PATH):
+    """
+    로컬 지표 저장소(SQLite)를 열고 테이블/인덱스를 준비합니다.
+
+    Returns:
+        sqlite3.Connection
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(str(path))
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS metrics_daily (
+            date TEXT NOT NULL,
+            project_id TEXT NOT NULL,
+            landing_id TEXT NOT NULL,
+            channel_id TEXT NOT NULL,
+            sessions INTEGER NOT NULL DEFAULT 0,
+            impressions INTEGER NOT NULL DEFAULT 0,
+            clicks INTEGER NOT NULL DEFAULT 0,
+            cost REAL NOT NULL DEFAULT 0,
+            revenue REAL NOT NULL DEFAULT 0,
+            purchase_conversions INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (project_id, date, landing_id, channel_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_metrics_project_channel_date
+            ON metrics_daily (project_id, channel_id, date);
+        CREATE INDEX IF NOT EXISTS idx_metrics_date
+            ON metrics_daily (date);
+        """
+    )
+    return conn
+
+def _store_frame(df):
+    """저장소 컬럼 순서와 타입으로 맞춘 DataFrame"""
+    frame = df.reindex(columns=KEY_COLUMNS + VALUE_COLUMNS)
+    frame[VALUE_COLUMNS] = frame[VALUE_COLUMNS].fillna(0)
+    for col in KEY_COLUMNS:
+        frame[col] = frame[col].astype(str)
+    for col in ('sessions', 'impressions', 'clicks', 'purchase_conversions'):
+        frame[col] = frame[col].astype('int64')
+    for col in ('cost', 'revenue'):
+        frame[col] = frame[col].astype('float64')
+    return frame
+
+def sync_metrics(conn, df):
+    """
+    집계 결과를 로컬 저장소에 반영합니다. (같은 키는 교체)
+    main()은 변경된 날짜 파티션 전체를 다시 집계하므로 교체가 곧 최신 합계입니다.
+
+    Args:
+        df (pd.DataFrame): aggregate_data 결과
+
+    Returns:
+        int: 반영한 행 수
+    """
+    if df.empty:
+        return 0
+
+    frame = _store_frame(df)
+    columns = ', '.join(KEY_COLUMNS + VALUE_COLUMNS)
+    placeholders = ', '.join('?' * len(KEY_COLUMNS + VALUE_COLUMNS))
+    with conn:
+        conn.executemany(
+            f"INSERT OR REPLACE INTO metrics_daily ({columns}) VALUES ({placeholders})",
+            frame.itertuples(index=False, name=None)
+        )
+    return len(frame)
+
+def sync_metric_deltas(conn, delta_df):
+    """
+    증감분을 로컬 저장소에 더합니다. (--append-delta 모드, 없는 키는 새로 추가)
+
+    Args:
+        delta_df (pd.DataFrame): KEY_COLUMNS + 지표 컬럼의 증감분
+
+    Returns:
+        int: 반영한 행 수
+    """
+    if delta_df.empty:
+        return 0
+
+    frame = _store_frame(delta_df)
+    columns = ', '.join(KEY_COLUMNS + VALUE_COLUMNS)
+    placeholders = ', '.join('?' * len(KEY_COLUMNS + VALUE_COLUMNS))
+    increments = ', '.join(f"{col} = {col} + excluded.{col}" for col in VALUE_COLUMNS)
+    with conn:
+        conn.executemany(
+            f"INSERT INTO metrics_daily ({columns}) VALUES ({placeholders}) "
+            f"ON CONFLICT (project_id, date, landing_id, channel_id) DO UPDATE SET {increments}",
+            frame.itertuples(index=False, name=None)
+        )
+    return len(frame)
+
+def remove_metrics(conn, keys_df):
+    """
+    Firestore에서 삭제된 metrics_daily 문서의 행을 로컬 저장소에서도 지웁니다.
+
+    Args:
+        keys_df (pd.DataFrame): KEY_COLUMNS
+
+    Returns:
+        int: 삭제한 행 수
+    """
+    if keys_df.empty:
+        return 0
+
+    keys = keys_df[KEY_COLUMNS].astype(str).itertuples(index=False, name=None)
+    conditions = ' AND '.join(f"{col} = ?" for col in KEY_COLUMNS)
+    with conn:
+        cursor = conn.executemany(f"DELETE FROM metrics_daily WHERE {conditions}", keys)
+    return cursor.rowcount
+
+# ==================================================
+# SECTION 2: KPI QUERIES
+# ==================================================
+
+_KPI_SELECT = """
+    SUM(cost) AS cost,
+    SUM(impressions) AS impressions,
+    SUM(clicks) AS clicks,
+    SUM(sessions) AS sessions,
+    SUM(purchase_conversions) AS conversions,
+    SUM(revenue) AS revenue,
+    CASE WHEN SUM(impressions) > 0 THEN SUM(clicks) * 100.0 / SUM(impressions) ELSE 0 END AS ctr,
+    CASE WHEN SUM(clicks) > 0 THEN SUM(cost) * 1.0 / SUM(clicks) ELSE 0 END AS cpc,
+    CASE WHEN SUM(sessions) > 0 THEN SUM(purchase_conversions) * 100.0 / SUM(sessions) ELSE 0 END AS cvr,
+    CASE WHEN SUM(cost) > 0 THEN SUM(revenue) * 100.0 / SUM(cost) ELSE 0 END AS roas
+"""
+
+def resolve_date_range(conn, project_id, start=None, end=None, days=None):
+    """
+    조회 기간을 정합니다. --days N은 저장된 마지막 날짜(또는 end)까지의 N일입니다.
+
+    Returns:
+        tuple: (start, end) - 'YYYY-MM-DD' 또는 None (제한 없음)
+    """
+    if days is None:
+        return start, end
+
+    if end is None:
+        end = conn.execute(
+            "SELECT MAX(date) FROM metrics_daily WHERE project_id = ?", (project_id,)
+        ).fetchone()[0]
+        if end is None:
+            return start, None
+    start = (datetime.strptime(end, '%Y-%m-%d') - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+    return start, end
+
+def _where(project_id, start, end):
+    clauses, params = ["project_id = ?"], [project_id]
+    if start:
+        clauses.append("date >= ?")
+        params.append(start)
+    if end:
+        clauses.append("date <= ?")
+        params.append(end)
+    return ' AND '.join(clauses), params
+
+def query_channels(conn, project_id, start=None, end=None):
+    """
+    채널별 지표와 KPI (대시보드 채널 테이블과 동일, 매출 내림차순)
+
+    Returns:
+        pd.DataFrame
+    """
+    where, params = _where(project_id, start, end)
+    sql = f"SELECT channel_id, {_KPI_SELECT} FROM metrics_daily WHERE {where} GROUP BY channel_id ORDER BY revenue DESC"
+    return pd.read_sql_query(sql, conn, params=params)
+
+def query_trend(conn, project_id, start=None, end=None, channel_id=None):
+    """
+    일별 추이 (대시보드 추이 차트와 동일한 합계 + KPI)
+
+    Returns:
+        pd.DataFrame
+    """
+    where, params = _where(project_id, start, end)
+    if channel_id:
+        where += " AND channel_id = ?"
+        params.append(channel_id)
+    sql = f"SELECT date, {_KPI_SELECT} FROM metrics_daily WHERE {where} GROUP BY date ORDER BY date"
+    return pd.read_sql_query(sql, conn, params=params)
+
+def query_summary(conn, project_id, start=None, end=None):
+    """
+    기간 전체 합계와 KPI
+
+    Returns:
+        pd.DataFrame: 1행
+    """
+    where, params = _where(project_id, start, end)
+    sql = f"SELECT MIN(date) AS start, MAX(date) AS end, {_KPI_SELECT} FROM metrics_daily WHERE {where}"
+    return pd.read_sql_query(sql, conn, params=params)
+
+def query_sql(conn, sql):
+    """임의의 SQL을 실행합니다. (metrics_daily 테이블)"""
+    return pd.read_sql_query(sql, conn)
+
+# ==================================================
+# SECTION 3: CLI
+# ==================================================
+
+def rebuild_from_staging(conn):
+    """
+    Parquet staging 전체를 다시 집계하여 저장소를 채웁니다. (pyarrow 필요)
+    staging이 비어 있으면 기존 저장소를 그대로 둡니다.
+
+    Returns:
+        int: 반영한 행 수
+    """
+    sys.path.append(str(Path(__file__).parent))
+    from staging import read_staging
+    from loaders import aggregate_data, GROUP_KEYS, SUM_COLUMNS
+
+    aggregated = aggregate_data(read_staging(columns=GROUP_KEYS + SUM_COLUMNS))
+    if aggregated.empty:
+        return 0
+    with conn:
+        conn.execute("DELETE FROM metrics_daily")
+    return sync_metrics(conn, aggregated)
+
+def _print_frame(df, output_format):
+    if output_format == 'csv':
+        print(df.to_csv(index=False), end='')
+    elif output_format == 'json':
+        print(df.to_json(orient='records', force_ascii=False, indent=2))
+    elif df.empty:
+        print("(no rows)")
+    else:
+        print(df.to_string(index=False, float_format=lambda v: f"{v:,.2f}"))
+
+def parse_args(argv=None):
+    # 모든 하위 명령 공통 옵션
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--db', type=Path, default=DEFAULT_METRICS_DB_PATH, help='로컬 지표 저장소 경로')
+    common.add_argument('--format', choices=['table', 'csv', 'json'], default='table')
+
+    parser = argparse.ArgumentParser(description='Query local metrics store (CTR/CPC/CVR/ROAS)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    for name, help_text in [('channels', '채널별 KPI'), ('trend', '일별 추이'), ('summary', '기간 합계')]:
+        command = commands.add_parser(name, help=help_text, parents=[common])
+        command.add_argument('--project', required=True, help='project_id')
+        command.add_argument('--start', help='시작일 (YYYY-MM-DD)')
+        command.add_argument('--end', help='종료일 (YYYY-MM-DD)')
+        command.add_argument('--days', type=int, help='마지막 날짜 기준 최근 N일')
+        if name == 'trend':
+            command.add_argument('--channel', help='channel_id 필터')
+
+    command = commands.add_parser('sql', help='임의 SQL 실행', parents=[common])
+    command.add_argument('sql')
+    commands.add_parser('sync', help='staging(Parquet) 전체로 저장소 재구성', parents=[common])
+
+    args = parser.parse_args(argv)
+    if getattr(args, 'days', None) is not None and args.days < 1:
+        parser.error('--days must be >= 1')
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    conn = open_metrics_store(args.db)
+    try:
+        if args.command == 'sync':
+            rows = rebuild_from_staging(conn)
+            print(f"✓ Synced {rows} rows into {args.db}")
+            return
+        if args.command == 'sql':
+            _print_frame(query_sql(conn, args.sql), args.format)
+            return
+
+        start, end = resolve_date_range(conn, args.project, args.start, args.end, args.days)
+        if args.command == 'channels':
+            result = query_channels(conn, args.project, start, end)
+        elif args.command == 'trend':
+            result = query_trend(conn, args.project, start, end, channel_id=args.channel)
+        else:
+            result = query_summary(conn, args.project, start, end)
+        _print_frame(result, args.format)
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -6,153 +6,91 @@ Purpose: Populate Firestore with initial seed data for:
 - landings collection (landing pages)
 - annotations collection (marketing action logs)
 
+Seed rows live in data/seed/landings.csv and annotations.jsonl and are
+written by the bulk dimension loader (src/dimensions.py); use that
+script directly for larger catalogs.
+
 This script uses google-cloud-firestore (already in requirements.txt)
 instead of firebase-admin to avoid dependency conflicts.
 ==================================================
 """
 
 import os
+import sys
 from pathlib import Path
-from dotenv import load_dotenv
-from google.cloud import firestore
-from google.oauth2 import service_account
-from datetime import datetime
+
+sys.path.append(str(Path(__file__).parent))
+from firestore_client import load_environment, create_client
+from fingerprints import fingerprint_target, open_fingerprint_store
+from dimensions import DEFAULT_SEED_DIR, load_dimension_file
+
+DEFAULT_LANDINGS_FILE = DEFAULT_SEED_DIR / 'landings.csv'
+DEFAULT_ANNOTATIONS_FILE = DEFAULT_SEED_DIR / 'annotations.jsonl'
 
 # ==================================================
 # SECTION 1: Environment & Firebase Initialization
 # ==================================================
 
-def initialize_firestore():
+def initialize_firestore(async_client=False):
     """
     Initialize Firestore client using service account credentials.
+    Client setup is shared with the ETL (firestore_client.create_client).
+    
+    Args:
+        async_client: Return firestore.AsyncClient instead of firestore.Client
     Returns: Firestore client instance
     """
     # Load environment variables from .env file
-    env_path = Path(__file__).parent.parent / '.env'
-    load_dotenv(dotenv_path=env_path)
-    
-    # Get credentials path
-    cred_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
-    
-    # Fallback to local file if env var is not absolute or missing
-    if not cred_path or not os.path.isabs(cred_path):
-        default_cred_path = Path(__file__).parent.parent / 'service-account-key.json'
-        if default_cred_path.exists():
-            cred_path = str(default_cred_path)
-    
-    if not cred_path:
-        raise EnvironmentError("GOOGLE_APPLICATION_CREDENTIALS not found.")
-    
-    # Initialize Firestore with service account
-    credentials = service_account.Credentials.from_service_account_file(cred_path)
-    db = firestore.Client(credentials=credentials)
-    
-    return db
+    load_environment()
+    return create_client(async_client=async_client)
 
 # ==================================================
 # SECTION 2: Seed Landings Collection
 # ==================================================
 
-def seed_landings(db, project_id):
+def seed_landings(db, project_id, file_path=DEFAULT_LANDINGS_FILE, fingerprint_store=None):
     """
-    Populate 'landings' collection with initial landing page data.
+    Populate 'landings' collection from a CSV/JSONL file (default: data/seed/landings.csv).
+    Rows are streamed and written in chunks by dimensions.load_dimension_file.
     
     Args:
         db: Firestore client
-        project_id: Project identifier (e.g., 'p_main')
+        project_id: Project identifier for rows without project_id (e.g., 'p_main')
+        file_path: Landing catalog file
+        fingerprint_store: Write only new/changed documents when given
     """
-    landings = [
-        {
-            'landing_id': 'landing_main',
-            'project_id': project_id,
-            'name': 'Main Homepage',
-            'url': 'https://mindbodylab.com',
-            'is_active': True,
-            'created_at': firestore.SERVER_TIMESTAMP
-        },
-        {
-            'landing_id': 'landing_anxiety',
-            'project_id': project_id,
-            'name': 'Anxiety Program Landing',
-            'url': 'https://mindbodylab.com/anxiety',
-            'is_active': True,
-            'created_at': firestore.SERVER_TIMESTAMP
-        },
-        {
-            'landing_id': 'landing_self_esteem',
-            'project_id': project_id,
-            'name': 'Self-Esteem Program Landing',
-            'url': 'https://mindbodylab.com/self-esteem',
-            'is_active': True,
-            'created_at': firestore.SERVER_TIMESTAMP
-        }
-    ]
-    
-    # Use batch for efficient writes
-    batch = db.batch()
-    collection_ref = db.collection('landings')
-    
-    print(f"📍 Seeding {len(landings)} landing pages...")
-    for landing in landings:
-        doc_ref = collection_ref.document(landing['landing_id'])
-        batch.set(doc_ref, landing, merge=True)
-        print(f"  - {landing['name']}")
-        
-    batch.commit()
+    print(f"📍 Seeding landing pages from {Path(file_path).name}...")
+    result = load_dimension_file(db, 'landings', file_path, project_id, fingerprint_store=fingerprint_store)
+    _print_result(result)
     print("✓ Landings seeded successfully.\n")
 
 # ==================================================
 # SECTION 3: Seed Annotations Collection
 # ==================================================
 
-def seed_annotations(db, project_id):
+def seed_annotations(db, project_id, file_path=DEFAULT_ANNOTATIONS_FILE, fingerprint_store=None):
     """
-    Populate 'annotations' collection with marketing action logs.
+    Populate 'annotations' collection with marketing action logs
+    from a CSV/JSONL file (default: data/seed/annotations.jsonl).
     
     Args:
         db: Firestore client
-        project_id: Project identifier (e.g., 'p_main')
+        project_id: Project identifier for rows without project_id (e.g., 'p_main')
+        file_path: Annotation log file
+        fingerprint_store: Write only new/changed documents when given
     """
-    annotations = [
-        {
-            'annotation_id': 'note_launch',
-            'project_id': project_id,
-            'date': '2025-11-01',
-            'type': 'launch',
-            'note': 'Service Official Launch',
-            'created_at': firestore.SERVER_TIMESTAMP
-        },
-        {
-            'annotation_id': 'note_ad_boost',
-            'project_id': project_id,
-            'date': '2025-11-15',
-            'type': 'budget',
-            'note': 'Increased Instagram Ad Budget by 50%',
-            'created_at': firestore.SERVER_TIMESTAMP
-        },
-        {
-            'annotation_id': 'note_black_friday',
-            'project_id': project_id,
-            'date': '2025-11-25',
-            'type': 'promotion',
-            'note': 'Black Friday Promotion Started',
-            'created_at': firestore.SERVER_TIMESTAMP
-        }
-    ]
-    
-    # Use batch for efficient writes
-    batch = db.batch()
-    collection_ref = db.collection('annotations')
-    
-    print(f"📝 Seeding {len(annotations)} annotations...")
-    for note in annotations:
-        doc_ref = collection_ref.document(note['annotation_id'])
-        batch.set(doc_ref, note, merge=True)
-        print(f"  - {note['date']}: {note['note']}")
-        
-    batch.commit()
+    print(f"📝 Seeding annotations from {Path(file_path).name}...")
+    result = load_dimension_file(db, 'annotations', file_path, project_id, fingerprint_store=fingerprint_store)
+    _print_result(result)
     print("✓ Annotations seeded successfully.\n")
 
+def _print_result(result):
+    print(f"  - {result['records']} records, {result['written']} written, {result['rejected']} rejected")
+    if result['rejects_path']:
+        print(f"  - Rejected rows: {result['rejects_path']}")
+    if result['failed_ids']:
+        raise RuntimeError(f"{len(result['failed_ids'])} documents failed: {result['failed_ids'][:10]}")
+
 # ==================================================
 # SECTION 4: Main Execution
 # ==================================================
@@ -173,9 +111,13 @@ def main():
         
         print(f"🎯 Target Project: {project_id}\n")
         
-        # Seed collections
-        seed_landings(db, project_id)
-        seed_annotations(db, project_id)
+        # Seed collections (only new/changed documents are written)
+        fingerprint_store = open_fingerprint_store(fingerprint_target(db))
+        try:
+            seed_landings(db, project_id, fingerprint_store=fingerprint_store)
+            seed_annotations(db, project_id, fingerprint_store=fingerprint_store)
+        finally:
+            fingerprint_store.close()
         
         print("="*50)
         print("✅ All seed data populated successfully!")
@@ -0,0 +1,182 @@
+"""
+==================================================
+Columnar Staging Layer (Parquet)
+==================================================
+Stores the normalized output of process_ga_data / process_ad_data
+as date-partitioned Parquet files so that re-aggregation, rollups
+and re-uploads do not need to parse and transform the raw CSVs again.
+
+Layout:
+    data/staging/date=2025-11-28/ga_sessions_sample.1f0c9a2b.parquet
+    data/staging/date=2025-11-28/ga_big.7d41e0c5.part0001.parquet  (--chunksize)
+
+- one piece per (date, source file); pieces are named after the file
+  plus a short hash of its full path, so same-named files from
+  different folders do not replace each other; reprocessing a file
+  replaces all of its pieces
+- key columns (project_id, landing_id, channel_id, source, medium,
+  campaign, platform) are written dictionary-encoded
+- readers prune partitions by date and read only the needed columns
+
+Requires pyarrow (optional dependency, imported lazily).
+==================================================
+"""
+
+import glob
+from pathlib import Path
+import pandas as pd
+
+from manifest import path_hash
+
+DEFAULT_STAGING_DIR = Path(__file__).parent.parent / 'data' / 'staging'
+
+# 딕셔너리 인코딩으로 저장할 문자열 컬럼
+DICTIONARY_COLUMNS = ['project_id', 'landing_id', 'channel_id', 'source', 'medium', 'campaign', 'platform']
+
+PARTITION_PREFIX = 'date='
+
+def _require_pyarrow():
+    """pyarrow를 불러옵니다. 설치되지 않은 경우 안내 메시지와 함께 에러를 발생시킵니다."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "Parquet staging requires pyarrow. Install it with: pip install pyarrow"
+        ) from e
+    return pyarrow, pyarrow.parquet
+
+def _piece_name(file_path):
+    """조각 파일 이름의 원본 파일 부분: 파일명 + 전체 경로 해시 (다른 폴더의 같은 이름 파일 구분)"""
+    return f"{Path(file_path).stem}.{path_hash(file_path)}"
+
+def _piece_patterns(file_path):
+    """원본 파일 하나에 해당하는 staging 조각 파일의 glob 패턴"""
+    name = glob.escape(_piece_name(file_path))
+    return [f"{PARTITION_PREFIX}*/{name}.parquet", f"{PARTITION_PREFIX}*/{name}.part*.parquet"]
+
+def staged_pieces(file_path, staging_dir=DEFAULT_STAGING_DIR):
+    """
+    원본 파일에서 만들어진 staging 조각 파일 목록을 반환합니다.
+    """
+    staging_dir = Path(staging_dir)
+    pieces = []
+    for pattern in _piece_patterns(file_path):
+        pieces.extend(staging_dir.glob(pattern))
+    return sorted(pieces)
+
+def has_staged_file(file_path, staging_dir=DEFAULT_STAGING_DIR):
+    """원본 파일이 staging에 저장되어 있는지 여부"""
+    return bool(staged_pieces(file_path, staging_dir))
+
+def remove_staged_file(file_path, staging_dir=DEFAULT_STAGING_DIR):
+    """
+    원본 파일의 staging 조각을 모두 삭제합니다. (재처리 또는 처리 실패 시)
+
+    Returns:
+        int: 삭제한 조각 수
+    """
+    pieces = staged_pieces(file_path, staging_dir)
+    for piece in pieces:
+        piece.unlink()
+        # 비어 있는 날짜 파티션 정리
+        if not any(piece.parent.iterdir()):
+            piece.parent.rmdir()
+    return len(pieces)
+
+def write_staged_file(df, file_path, part=None, staging_dir=DEFAULT_STAGING_DIR):
+    """
+    변환된 데이터를 날짜 파티션별 Parquet 조각으로 저장합니다.
+    date 컬럼은 파티션 디렉터리 이름으로만 저장됩니다.
+
+    Args:
+        df (pd.DataFrame): process_ga_data/process_ad_data 결과 (또는 스트리밍 청크)
+        file_path: 원본 CSV 경로 (조각 파일 이름에 사용)
+        part (int): 스트리밍 모드의 청크 번호 (None이면 파일 전체)
+
+    Returns:
+        int: 저장한 조각 수
+    """
+    if df.empty:
+        return 0
+
+    pa, pq = _require_pyarrow()
+    staging_dir = Path(staging_dir)
+    stem = _piece_name(file_path)
+    name = f"{stem}.parquet" if part is None else f"{stem}.part{part:04d}.parquet"
+
+    df = df.copy()
+    for col in DICTIONARY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
+    written = 0
+    for date, piece in df.groupby(df['date'].astype(str), sort=True):
+        partition = staging_dir / f"{PARTITION_PREFIX}{date}"
+        partition.mkdir(parents=True, exist_ok=True)
+
+        table = pa.Table.from_pandas(piece.drop(columns=['date']), preserve_index=False)
+        # 임시 파일에 쓴 뒤 교체 (중간에 실패해도 읽는 쪽에 깨진 파일이 보이지 않도록)
+        tmp_path = partition / f".{name}.tmp"
+        pq.write_table(table, tmp_path)
+        tmp_path.replace(partition / name)
+        written += 1
+
+    return written
+
+def staged_dates(staging_dir=DEFAULT_STAGING_DIR):
+    """staging에 존재하는 날짜 파티션 목록"""
+    staging_dir = Path(staging_dir)
+    if not staging_dir.exists():
+        return []
+    return sorted(
+        p.name[len(PARTITION_PREFIX):] for p in staging_dir.iterdir()
+        if p.is_dir() and p.name.startswith(PARTITION_PREFIX)
+    )
+
+def read_staging(dates=None, columns=None, sources=None, staging_dir=DEFAULT_STAGING_DIR):
+    """
+    staging 데이터를 읽습니다. 날짜 파티션과 컬럼 단위로 필요한 부분만 읽습니다.
+
+    Args:
+        dates (iterable): 읽을 날짜 (None이면 전체)
+        columns (list): 읽을 컬럼 (None이면 전체, 조각에 없는 컬럼은 무시)
+        sources (list): 원본 파일 경로 목록 (None이면 전체)
+
+    Returns:
+        pd.DataFrame: date 컬럼을 포함한 staging 데이터 (없으면 빈 DataFrame)
+    """
+    _, pq = _require_pyarrow()
+    staging_dir = Path(staging_dir)
+
+    wanted_dates = staged_dates(staging_dir)
+    if dates is not None:
+        wanted_dates = sorted(set(wanted_dates).intersection(str(d) for d in dates))
+
+    if sources is not None:
+        source_pieces = set()
+        for file_path in sources:
+            source_pieces.update(staged_pieces(file_path, staging_dir))
+
+    frames = []
+    for date in wanted_dates:
+        for path in sorted((staging_dir / f"{PARTITION_PREFIX}{date}").glob('*.parquet')):
+            if sources is not None and path not in source_pieces:
+                continue
+
+            read_columns = None
+            if columns is not None:
+                available = pq.read_schema(path).names
+                read_columns = [col for col in columns if col in available]
+
+            frame = pq.read_table(path, columns=read_columns).to_pandas()
+            # 조각마다 카테고리가 달라 concat 시 object로 섞이므로 미리 문자열로 복원
+            for col in frame.columns:
+                if isinstance(frame[col].dtype, pd.CategoricalDtype):
+                    frame[col] = frame[col].astype(object)
+            frame.insert(0, 'date', date)
+            frames.append(frame)
+
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
@@ -9,7 +9,13 @@ Functions for data transformation and validation:
 - validate_required_fields: Check for required columns
 - validate_numeric: Safely convert to numeric types
 - get_traffic_type: Classify traffic as paid/organic
-- map_channel: Map source/medium to channel_id
+- map_channel: Map source/medium to channel_id (table-driven, LRU cached)
+- set_channel_rules / load_channel_rules_*: Load mapping rules from config or Firestore
+- map_channel_pairs: Bulk-map unique source/medium pairs
+- normalize_date_series: Column-wise normalize_date (format inference, per-value cache)
+- infer_source_medium: Derive source/medium from Ad platform column
+- map_channel_series: Column-wise map_channel with rejection reasons
+- compact_frame / concat_compact: Categorical keys and downcast metrics
 
 Author: Marketing Analytics Team
 Date: 2025-11-29
@@ -17,10 +23,14 @@ Version: 0.4 (Phase 4 - Details)
 ==================================================
 """
 
+import numpy as np
 import pandas as pd
 from datetime import datetime
 import re
+import json
 import logging
+from pathlib import Path
+from functools import lru_cache
 
 # Get logger
 logger = logging.getLogger(__name__)
@@ -113,6 +123,29 @@ def normalize_date(date_input):
             
     raise ValueError(f"Unknown date format: {date_str}")
 
+# ==================================================
+# SECTION 3: CHANNEL MAPPING
+# ==================================================
+
+PAID_MEDIUMS = frozenset(['cpc', 'display', 'sns_ad', 'video_ad', 'paid'])
+ORGANIC_MEDIUMS = frozenset(['sns', 'blog', 'social', 'qr', 'organic', 'referral', 'email'])
+
+# 규칙 기반 매핑 (utm-rules-v0.2.md 참조): (source, medium) -> channel_id
+DEFAULT_CHANNEL_RULES = {
+    ('naver', 'cpc'): 'naver_sa',                 # 네이버 검색광고
+    ('google', 'cpc'): 'google_sa',               # 구글 검색광고
+    ('google', 'display'): 'google_da',           # 구글 배너광고
+    ('meta', 'sns_ad'): 'meta_ad',                # 인스타/페북 광고
+    ('youtube', 'video_ad'): 'youtube_ad',        # 유튜브 광고
+    ('instagram', 'sns'): 'instagram_organic',    # 인스타 프로필
+    ('naver_blog', 'blog'): 'naver_blog',         # 블로그 포스팅
+    ('youtube', 'social'): 'youtube_organic',     # 유튜브 설명란
+    ('offline', 'qr'): 'offline_qr',              # 오프라인 QR
+}
+
+# 현재 적용 중인 규칙 인덱스 (set_channel_rules로 교체)
+_channel_rules = dict(DEFAULT_CHANNEL_RULES)
+
 def get_traffic_type(medium):
     """
     utm_medium을 기반으로 traffic_type(paid/organic)을 분류합니다.
@@ -128,23 +161,97 @@ def get_traffic_type(medium):
         
     medium = medium.lower().strip()
     
-    paid_mediums = ['cpc', 'display', 'sns_ad', 'video_ad', 'paid']
-    organic_mediums = ['sns', 'blog', 'social', 'qr', 'organic', 'referral', 'email']
-    
-    if medium in paid_mediums:
+    if medium in PAID_MEDIUMS:
         return 'paid'
-    elif medium in organic_mediums:
+    elif medium in ORGANIC_MEDIUMS:
         return 'organic'
     else:
         # 기본 규칙: _ad가 붙으면 paid, 아니면 organic으로 추정하되 보수적으로 unknown 처리할 수도 있음
         # 여기서는 명시된 것 외에는 unknown으로 처리
         return 'unknown'
 
+def get_channel_rules():
+    """
+    현재 적용 중인 채널 매핑 규칙을 반환합니다.
+    
+    Returns:
+        dict: (source, medium) -> channel_id
+    """
+    return dict(_channel_rules)
+
+def set_channel_rules(rules):
+    """
+    채널 매핑 규칙을 교체하고 매핑 캐시를 비웁니다.
+    
+    Args:
+        rules (dict): (source, medium) -> channel_id (키는 소문자/공백 제거 후 저장)
+    """
+    global _channel_rules
+    _channel_rules = {
+        (str(s).lower().strip(), str(m).lower().strip()): channel_id
+        for (s, m), channel_id in rules.items()
+    }
+    _lookup_channel.cache_clear()
+
+def _rules_from_records(records):
+    """source/medium/channel_id 레코드 목록을 규칙 dict로 변환합니다."""
+    rules = {}
+    for record in records:
+        source = record.get('utm_source', record.get('source'))
+        medium = record.get('utm_medium', record.get('medium'))
+        channel_id = record.get('channel_id')
+        if source and medium and channel_id:
+            rules[(source, medium)] = channel_id
+    return rules
+
+def load_channel_rules_file(path):
+    """
+    설정 파일에서 채널 매핑 규칙을 읽습니다.
+    - JSON: [{"source": ..., "medium": ..., "channel_id": ...}, ...]
+    - CSV: source,medium,channel_id 헤더
+    
+    Returns:
+        dict: (source, medium) -> channel_id
+    """
+    path = Path(path)
+    if path.suffix.lower() == '.json':
+        with open(path, encoding='utf-8') as f:
+            records = json.load(f)
+    else:
+        records = pd.read_csv(path, dtype=str).to_dict('records')
+    
+    return _rules_from_records(records)
+
+def load_channel_rules_firestore(db, collection_name='channels'):
+    """
+    Firestore channels 컬렉션에서 채널 매핑 규칙을 읽습니다.
+    utm_source/utm_medium (또는 source/medium) 필드가 있는 문서만 사용합니다.
+    
+    Returns:
+        dict: (source, medium) -> channel_id
+    """
+    records = []
+    for doc in db.collection(collection_name).stream():
+        record = doc.to_dict()
+        record.setdefault('channel_id', doc.id)
+        records.append(record)
+    
+    return _rules_from_records(records)
+
+@lru_cache(maxsize=4096)
+def _lookup_channel(source, medium):
+    """정규화 후 규칙 인덱스에서 channel_id를 찾습니다. (입력별 LRU 캐시)"""
+    s = source.lower().strip()
+    m = medium.lower().strip()
+    
+    # 매핑 실패 시 조합하여 반환 (추후 DB 등록을 위해)
+    return _channel_rules.get((s, m), f"{s}_{m}")
+
 def map_channel(source, medium):
     """
     Source/Medium을 기반으로 Channel ID를 매핑합니다.
-    실제 구현에서는 Firestore의 channels 컬렉션을 참조해야 하지만,
-    MVP 단계에서는 규칙 기반으로 처리합니다.
+    규칙은 DEFAULT_CHANNEL_RULES 또는 set_channel_rules로 불러온
+    설정 파일/channels 컬렉션 규칙을 사용합니다.
     
     Args:
         source (str): utm_source
@@ -155,30 +262,250 @@ def map_channel(source, medium):
     """
     if not source or not medium:
         return 'unknown_channel'
+    
+    return _lookup_channel(source, medium)
+
+def map_channel_pairs(sources, mediums):
+    """
+    고유한 (source, medium) 조합 목록을 한 번에 매핑합니다.
+    
+    Args:
+        sources (array-like): source 값 목록
+        mediums (array-like): medium 값 목록 (sources와 같은 길이)
         
-    s = source.lower().strip()
-    m = medium.lower().strip()
+    Returns:
+        tuple: (channel_ids, reasons) object ndarray (실패 항목은 reasons에 에러 메시지)
+    """
+    channels = np.full(len(sources), np.nan, dtype=object)
+    reasons = np.full(len(sources), np.nan, dtype=object)
+    
+    for i, (s, m) in enumerate(zip(sources, mediums)):
+        try:
+            channels[i] = map_channel(s, m)
+        except Exception as e:
+            reasons[i] = str(e)
+    
+    return channels, reasons
+
+# ==================================================
+# SECTION 4: VECTORIZED (COLUMNAR) TRANSFORMS
+# ==================================================
+# 행 단위 함수(normalize_date, map_channel)와 동일한 결과를 DataFrame 컬럼
+# 전체에 한 번에 적용합니다. 실패한 행은 예외 대신 사유(reason) Series로 반환합니다.
+
+# (strptime 포맷, 엄격한 정규식) - normalize_date의 시도 순서와 동일해야 함
+# 정규식에 맞는 값만 빠른 경로로 파싱하고, 나머지는 normalize_date로 처리합니다.
+DATE_FORMAT_PATTERNS = [
+    ('%Y%m%d', r'^[0-9]{8}$'),
+    ('%Y-%m-%d', r'^[0-9]{4}-[0-9]{2}-[0-9]{2}$'),
+    ('%d/%m/%Y', r'^[0-9]{2}/[0-9]{2}/[0-9]{4}$'),
+    ('%m/%d/%Y', r'^[0-9]{2}/[0-9]{2}/[0-9]{4}$'),
+    ('%Y.%m.%d', r'^[0-9]{4}\.[0-9]{2}\.[0-9]{2}$'),
+]
+
+# 포맷 추론에 사용할 고유값 샘플 크기
+DATE_SAMPLE_SIZE = 1000
+
+def infer_date_formats(values, sample_size=DATE_SAMPLE_SIZE):
+    """
+    샘플에서 가장 많이 일치하는 포맷을 먼저 시도하도록 DATE_FORMAT_PATTERNS를 정렬합니다.
+    정규식이 같은 포맷(%d/%m/%Y, %m/%d/%Y)은 normalize_date와 같은 결과를 내도록
+    원래 순서를 유지합니다. (정규식끼리는 겹치지 않으므로 순서는 속도에만 영향)
+    
+    Args:
+        values (pd.Series): 문자열로 변환된 날짜 값 (고유값)
+        sample_size (int): 샘플 크기
+        
+    Returns:
+        list: (format, pattern) 목록 (시도 순서)
+    """
+    sample = values.iloc[:sample_size]
+    patterns = list(dict.fromkeys(pattern for _, pattern in DATE_FORMAT_PATTERNS))
+    hits = {pattern: int(sample.str.match(pattern).sum()) for pattern in patterns}
+    
+    ordered = sorted(patterns, key=lambda pattern: -hits[pattern])
+    logger.debug(f"Inferred date pattern order: {ordered} (sample hits: {hits})")
+    
+    return [(fmt, pattern) for p in ordered for fmt, pattern in DATE_FORMAT_PATTERNS if pattern == p]
+
+def _normalize_unique_dates(values, sample_size=DATE_SAMPLE_SIZE):
+    """
+    고유한 날짜 문자열 배열을 변환합니다.
+    추론된 주 포맷으로 한 번에 파싱하고, 나머지 포맷/예외 값만 이어서 처리합니다.
+    
+    Returns:
+        tuple: (normalized, reasons) object ndarray
+    """
+    normalized = np.full(len(values), np.nan, dtype=object)
+    reasons = np.full(len(values), np.nan, dtype=object)
+    pending = np.ones(len(values), dtype=bool)
+    
+    for fmt, pattern in infer_date_formats(values, sample_size):
+        if not pending.any():
+            break
+        candidates = np.flatnonzero(pending)[values.iloc[pending].str.match(pattern).to_numpy()]
+        if len(candidates) == 0:
+            continue
+        parsed = pd.to_datetime(values.iloc[candidates], format=fmt, errors='coerce')
+        # 유효성 검증 (1900~2100년 범위 밖이면 다음 포맷 시도)
+        ok = (parsed.notna() & parsed.dt.year.between(1900, 2100)).to_numpy()
+        normalized[candidates[ok]] = parsed[ok].dt.strftime('%Y-%m-%d').to_numpy()
+        pending[candidates[ok]] = False
+    
+    # 정규식에 맞지 않는 값 (zero-padding 없음 등)은 기존 행 단위 함수로 처리
+    for i in np.flatnonzero(pending):
+        try:
+            normalized[i] = normalize_date(values.iloc[i])
+        except ValueError as e:
+            reasons[i] = str(e)
+    
+    return normalized, reasons
+
+def normalize_date_series(dates, sample_size=DATE_SAMPLE_SIZE):
+    """
+    날짜 컬럼 전체를 YYYY-MM-DD 문자열로 변환합니다. (normalize_date의 벡터화 버전)
+    반복되는 원본 값은 한 번만 변환합니다. (고유값 단위 캐시)
     
-    # 규칙 기반 매핑 (utm-rules-v0.2.md 참조)
-    if s == 'naver' and m == 'cpc':
-        return 'naver_sa' # 네이버 검색광고
-    elif s == 'google' and m == 'cpc':
-        return 'google_sa' # 구글 검색광고
-    elif s == 'google' and m == 'display':
-        return 'google_da' # 구글 배너광고
-    elif s == 'meta' and m == 'sns_ad':
-        return 'meta_ad' # 인스타/페북 광고
-    elif s == 'youtube' and m == 'video_ad':
-        return 'youtube_ad' # 유튜브 광고
+    Args:
+        dates (pd.Series): 원본 날짜 컬럼
+        sample_size (int): 포맷 추론 샘플 크기
         
-    elif s == 'instagram' and m == 'sns':
-        return 'instagram_organic' # 인스타 프로필
-    elif s == 'naver_blog' and m == 'blog':
-        return 'naver_blog' # 블로그 포스팅
-    elif s == 'youtube' and m == 'social':
-        return 'youtube_organic' # 유튜브 설명란
-    elif s == 'offline' and m == 'qr':
-        return 'offline_qr' # 오프라인 QR
+    Returns:
+        tuple: (normalized, reasons)
+            - normalized: 변환된 날짜 Series (실패 행은 NaN)
+            - reasons: 실패 행의 에러 메시지 Series (성공 행은 NaN)
+    """
+    # 결측값은 code -1
+    codes, uniques = pd.factorize(dates)
+    values = pd.Series(uniques, dtype=object).astype(str).str.strip()
+    
+    unique_normalized, unique_reasons = _normalize_unique_dates(values, sample_size)
+    
+    # 고유값 결과를 전체 행에 펼침 (마지막 칸은 결측값용)
+    unique_normalized = np.append(unique_normalized, np.nan)
+    unique_reasons = np.append(unique_reasons, "Date is missing")
+    
+    return (
+        pd.Series(unique_normalized[codes], index=dates.index, dtype=object),
+        pd.Series(unique_reasons[codes], index=dates.index, dtype=object),
+    )
+
+def infer_source_medium(platform):
+    """
+    광고 플랫폼 컬럼에서 source/medium을 추론합니다.
+    
+    Args:
+        platform (pd.Series): 광고 플랫폼 컬럼 (예: 'naver', 'google', 'meta')
         
-    # 매핑 실패 시 조합하여 반환 (추후 DB 등록을 위해)
-    return f"{s}_{m}"
+    Returns:
+        tuple: (source, medium) Series
+    """
+    p = platform.astype(str).str.lower()
+    conditions = [
+        p.str.contains('naver', regex=False),
+        p.str.contains('google', regex=False),
+        p.str.contains('meta', regex=False)
+        | p.str.contains('facebook', regex=False)
+        | p.str.contains('instagram', regex=False),
+    ]
+    source = np.select(conditions, ['naver', 'google', 'meta'], default='unknown')
+    medium = np.select(conditions, ['cpc', 'cpc', 'sns_ad'], default='unknown')
+    
+    return (
+        pd.Series(source, index=platform.index, dtype=object),
+        pd.Series(medium, index=platform.index, dtype=object),
+    )
+
+def _none_as_empty(values):
+    """
+    None을 빈 문자열로 바꿉니다. factorize는 None과 NaN을 하나로 합치지만,
+    map_channel은 None을 빈 값('unknown_channel')으로, NaN은 에러로 처리하므로 미리 구분합니다.
+    """
+    if values.dtype != object:
+        return values
+    return values.mask(np.equal(values.to_numpy(), None), '')
+
+def map_channel_series(source, medium):
+    """
+    Source/Medium 컬럼 전체를 Channel ID로 매핑합니다. (map_channel의 벡터화 버전)
+    고유한 (source, medium) 조합만 map_channel_pairs로 매핑한 뒤 전체 행에 펼칩니다.
+    
+    Args:
+        source (pd.Series): utm_source 컬럼
+        medium (pd.Series): utm_medium 컬럼
+        
+    Returns:
+        tuple: (channel_ids, reasons)
+            - channel_ids: channel_id Series (실패 행은 NaN)
+            - reasons: 실패 행의 에러 메시지 Series (성공 행은 NaN)
+    """
+    source_codes, source_uniques = pd.factorize(_none_as_empty(source), use_na_sentinel=False)
+    medium_codes, medium_uniques = pd.factorize(_none_as_empty(medium), use_na_sentinel=False)
+    n_medium = max(len(medium_uniques), 1)
+    
+    pair_codes, pair_uniques = pd.factorize(source_codes.astype(np.int64) * n_medium + medium_codes)
+    
+    pair_channels, pair_reasons = map_channel_pairs(
+        source_uniques[pair_uniques // n_medium], medium_uniques[pair_uniques % n_medium]
+    )
+    
+    return (
+        pd.Series(pair_channels[pair_codes], index=source.index, dtype=object),
+        pd.Series(pair_reasons[pair_codes], index=source.index, dtype=object),
+    )
+
+# ==================================================
+# SECTION 5: COMPACT DTYPES
+# ==================================================
+
+# 반복되는 문자열 키 (카테고리로 저장)
+CATEGORY_COLUMNS = ['date', 'project_id', 'landing_id', 'channel_id', 'source', 'medium', 'campaign', 'platform']
+
+# 정수 지표 (가장 작은 정수 타입으로 축소)
+INTEGER_METRIC_COLUMNS = ['sessions', 'users', 'impressions', 'clicks', 'purchase_conversions', 'conversions']
+
+def compact_frame(df):
+    """
+    변환된 데이터프레임을 작은 dtype으로 바꿉니다.
+    - 문자열 키 (date 포함): category (고유값 사전 + 정수 코드)
+    - 정수 지표: int8/int16/int32 중 가장 작은 타입
+    실수 지표(cost, revenue)는 금액 정밀도를 위해 float64를 유지합니다.
+    
+    Args:
+        df (pd.DataFrame): transform_data 결과
+        
+    Returns:
+        pd.DataFrame: dtype이 축소된 데이터프레임 (같은 객체를 수정)
+    """
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    
+    for col in INTEGER_METRIC_COLUMNS:
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col].dtype):
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    
+    return df
+
+def concat_compact(frames):
+    """
+    compact_frame 결과들을 카테고리 dtype을 유지한 채 합칩니다.
+    (카테고리가 서로 다르면 pd.concat은 object로 되돌리므로 카테고리를 먼저 통일)
+    
+    Returns:
+        pd.DataFrame
+    """
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame()
+    
+    for col in CATEGORY_COLUMNS:
+        columns = [f[col] for f in frames if col in f.columns]
+        if len(columns) < 2 or not all(isinstance(c.dtype, pd.CategoricalDtype) for c in columns):
+            continue
+        categories = pd.api.types.union_categoricals(columns, sort_categories=True).categories
+        for f in frames:
+            if col in f.columns:
+                f[col] = f[col].cat.set_categories(categories)
+    
+    return pd.concat(frames, ignore_index=True)
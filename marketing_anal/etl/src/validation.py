@@ -0,0 +1,251 @@
+"""
+==================================================
+Declarative Input Validation
+==================================================
+Column-wise (vectorized) validation of transformed GA / Ad rows
+against a declarative schema, applied by transform_data after date
+normalization and channel mapping:
+- required: field must be present and non-empty (date only; metric
+  columns are optional, like the columns aggregate_data sums)
+- numeric: values are coerced with pd.to_numeric over the whole
+  column ("1,234" is accepted); optional empty values become 0
+- non_negative: numeric values must be >= 0
+- date_range: normalized date must fall within [min, max]
+  (default 1900-01-01 ~ 2100-12-31, the same bounds normalize_date
+  accepts; max None = today in UTC plus one day of slack)
+
+Rejected rows are collected per input file and written to a compact
+CSV report (data/rejects/{file}.{path hash}.rejects.csv) instead of
+one log line per row; summarize_rejects groups them by error class with a few
+sample rows for the log.
+==================================================
+"""
+
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+
+from manifest import path_hash
+
+DEFAULT_REJECTS_DIR = Path(__file__).parent.parent / 'data' / 'rejects'
+
+# 리포트에 남길 원본 값 최대 길이
+MAX_VALUE_LENGTH = 80
+
+# 로그 요약에 남길 에러 종류별 샘플 행 수
+SAMPLE_ROWS = 3
+
+REPORT_COLUMNS = ['row', 'stage', 'field', 'reason', 'value']
+
+# ==================================================
+# SECTION 1: SCHEMAS
+# ==================================================
+
+# normalize_date가 허용하는 범위와 동일 (변환을 통과한 날짜를 다시 거부하지 않음)
+DEFAULT_DATE_RANGE = ('1900-01-01', '2100-12-31')
+
+# date_range 상한이 None(오늘)일 때 허용할 여유 일수 (시간대 차이로 '내일' 날짜가 들어오는 경우)
+DATE_SLACK_DAYS = 1
+
+GA_SCHEMA = {
+    'required': ['date'],
+    'numeric': ['sessions', 'users', 'conversions', 'revenue'],
+    'non_negative': ['sessions', 'users', 'conversions', 'revenue'],
+    'date_range': DEFAULT_DATE_RANGE,
+}
+
+AD_SCHEMA = {
+    'required': ['date'],
+    'numeric': ['impressions', 'clicks', 'cost'],
+    'non_negative': ['impressions', 'clicks', 'cost'],
+    'date_range': DEFAULT_DATE_RANGE,
+}
+
+SCHEMAS = {'ga': GA_SCHEMA, 'ad': AD_SCHEMA}
+
+# ==================================================
+# SECTION 2: VECTORIZED CHECKS
+# ==================================================
+
+def _is_blank(series):
+    """결측값 또는 공백 문자열 여부 (행 단위 validate_required_fields와 동일한 기준)"""
+    blank = series.isna()
+    if series.dtype == object:
+        blank |= series.astype(str).str.strip().eq('')
+    return blank
+
+def coerce_numeric(series):
+    """
+    컬럼 전체를 숫자로 변환합니다. 천 단위 구분자(,)와 앞뒤 공백은 허용합니다.
+
+    Returns:
+        tuple: (numeric, invalid) - 변환된 Series, 변환에 실패한 행 마스크
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series, pd.Series(False, index=series.index)
+
+    cleaned = series.astype(str).str.replace(',', '', regex=False).str.strip()
+    cleaned = cleaned.where(~_is_blank(series))
+    numeric = pd.to_numeric(cleaned, errors='coerce')
+    return numeric, numeric.isna() & cleaned.notna()
+
+def validate_frame(df, schema, today=None):
+    """
+    스키마에 따라 컬럼 단위로 검증합니다. 행마다 처음 실패한 검사가 사유로 기록됩니다.
+
+    Args:
+        df (pd.DataFrame): 변환된 행 (date는 YYYY-MM-DD)
+        schema (dict): GA_SCHEMA / AD_SCHEMA 형식
+        today (str): date_range 상한이 None일 때 사용할 날짜 (기본: UTC 기준 오늘 + DATE_SLACK_DAYS)
+
+    Returns:
+        tuple: (valid_df, rejects)
+            - valid_df: 통과한 행 (numeric 컬럼은 숫자로 변환, 빈 값은 0)
+            - rejects: 행 인덱스별 field/reason/value DataFrame
+    """
+    rejects = pd.DataFrame(columns=['field', 'reason', 'value'])
+    if df.empty:
+        return df, rejects
+
+    df = df.copy()
+    failed = pd.Series(False, index=df.index)
+    found = []
+
+    def reject(mask, field, reason, values):
+        nonlocal failed
+        mask = mask & ~failed
+        if mask.any():
+            found.append(pd.DataFrame({'field': field, 'reason': reason, 'value': values[mask]}))
+            failed |= mask
+
+    for field in schema.get('required', []):
+        if field not in df.columns:
+            reject(pd.Series(True, index=df.index), field, 'Missing required field',
+                   pd.Series('', index=df.index))
+        else:
+            reject(_is_blank(df[field]), field, 'Missing required field', df[field])
+
+    non_negative = set(schema.get('non_negative', []))
+    for field in schema.get('numeric', []):
+        if field not in df.columns:
+            continue
+        numeric, invalid = coerce_numeric(df[field])
+        reject(invalid, field, 'Invalid numeric value', df[field])
+        if field in non_negative:
+            reject(numeric < 0, field, 'Negative value', df[field])
+        df[field] = numeric.fillna(0)
+
+    date_range = schema.get('date_range')
+    if date_range is not None and 'date' in df.columns:
+        min_date, max_date = date_range
+        if max_date is None:
+            max_date = today or (datetime.now(timezone.utc).date() + timedelta(days=DATE_SLACK_DAYS)).isoformat()
+        dates = df['date'].astype(str)
+        reject((dates < min_date) | (dates > max_date), 'date',
+               f'Date out of range ({min_date} ~ {max_date})', dates)
+
+    if found:
+        rejects = pd.concat(found)
+        values = rejects['value']
+        rejects['value'] = values.astype(str).str.slice(0, MAX_VALUE_LENGTH).where(values.notna(), '')
+    return df[~failed], rejects
+
+# ==================================================
+# SECTION 3: REJECT REPORT
+# ==================================================
+
+def reject_frame(stage, rejects):
+    """
+    transform 사유 Series 또는 validate_frame 결과를 리포트 행 형식으로 맞춥니다.
+
+    Returns:
+        pd.DataFrame: REPORT_COLUMNS
+    """
+    if len(rejects) == 0:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+    if isinstance(rejects, pd.Series):
+        rejects = pd.DataFrame({'field': '', 'reason': rejects, 'value': ''})
+    frame = rejects.rename_axis('row').reset_index()
+    frame.insert(1, 'stage', stage)
+    return frame[REPORT_COLUMNS]
+
+def summarize_rejects(frame, samples=SAMPLE_ROWS):
+    """
+    거부 행을 에러 종류별로 묶어 건수와 샘플 행을 구합니다. (로그 요약용)
+    - transform: 사유의 앞부분 ('Unknown date format: 18000101' -> 'Unknown date format')
+    - validate: 사유와 필드 ('Negative value (cost)')
+
+    Args:
+        frame (pd.DataFrame): reject_frame 결과 (여러 개를 합친 것도 가능)
+
+    Returns:
+        list: {'error', 'count', 'samples': [(row, detail), ...]} (건수 많은 순)
+    """
+    if frame.empty:
+        return []
+
+    parts = frame['reason'].astype(str).str.split(': ', n=1, expand=True).reindex(columns=[0, 1])
+    is_validate = frame['stage'].eq('validate')
+    error = parts[0].where(~is_validate, frame['reason'] + ' (' + frame['field'] + ')')
+    detail = parts[1].fillna('').where(~is_validate, frame['value'])
+
+    summary = []
+    for name, group in frame.assign(error=error, detail=detail).groupby('error', sort=False):
+        head = group.head(samples)
+        summary.append({
+            'error': name,
+            'count': len(group),
+            'samples': list(zip(head['row'].tolist(), head['detail'].tolist())),
+        })
+    return sorted(summary, key=lambda entry: -entry['count'])
+
+class RejectReport:
+    """
+    입력 파일 하나의 스킵/거부 행을 모아 CSV 리포트로 저장합니다.
+    스트리밍 모드에서는 청크마다 add()를 호출하고 마지막에 write()합니다.
+
+    Args:
+        file_path: 원본 CSV 경로
+        rejects_dir: 리포트 디렉터리 (기본: data/rejects)
+    """
+
+    def __init__(self, file_path, rejects_dir=DEFAULT_REJECTS_DIR):
+        self.file_path = Path(file_path)
+        self.path = Path(rejects_dir) / f"{self.file_path.stem}.{path_hash(self.file_path)}.rejects.csv"
+        self._frames = []
+
+    def add(self, stage, rejects):
+        """
+        Args:
+            stage (str): 'transform' 또는 'validate'
+            rejects: transform의 사유 Series 또는 validate_frame의 rejects DataFrame
+        """
+        if len(rejects) > 0:
+            self._frames.append(reject_frame(stage, rejects))
+
+    @property
+    def count(self):
+        """지금까지 추가된 거부 행 수"""
+        return sum(len(frame) for frame in self._frames)
+
+    def summary(self, samples=SAMPLE_ROWS):
+        """에러 종류별 건수와 샘플 행 (summarize_rejects)"""
+        if not self._frames:
+            return []
+        return summarize_rejects(pd.concat(self._frames, ignore_index=True), samples)
+
+    def write(self):
+        """
+        리포트를 저장합니다. 거부된 행이 없으면 이전 리포트를 삭제합니다.
+
+        Returns:
+            Path: 리포트 경로 (없으면 None)
+        """
+        if not self._frames:
+            self.path.unlink(missing_ok=True)
+            return None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        report = pd.concat(self._frames, ignore_index=True).sort_values('row', kind='stable')
+        report.to_csv(self.path, index=False)
+        return self.path
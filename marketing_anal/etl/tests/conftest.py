@@ -0,0 +1,8 @@
+"""
+pytest 설정: src/의 평면 모듈(main, loaders, bulk_writer 등)을 import 경로에 추가합니다.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
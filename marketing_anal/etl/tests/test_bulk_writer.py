@@ -0,0 +1,127 @@
+"""
+bulk_writer.bulk_write / loaders.write_documents 테스트 (fake_firestore 사용)
+- 일시적 에러(failure_rate) 재시도
+- 영구 에러가 난 배치를 반으로 나누어 문제 문서만 실패 처리
+- 실패한 문서 ID 보고와 fingerprint 기록 제외
+"""
+
+import random
+import pytest
+from google.api_core import exceptions as gcp_exceptions
+
+from bulk_writer import bulk_write
+from fake_firestore import FakeFirestoreClient
+from fingerprints import open_fingerprint_store
+from loaders import write_documents
+
+COLLECTION = 'metrics_daily'
+
+def make_documents(count):
+    return [(f"doc_{i:04d}", {'id': f"doc_{i:04d}", 'value': i}) for i in range(count)]
+
+class RejectingClient(FakeFirestoreClient):
+    """지정한 문서가 포함된 커밋을 영구 에러(InvalidArgument)로 거부하는 fake"""
+
+    def __init__(self, rejected_ids, **kwargs):
+        super().__init__(**kwargs)
+        self.rejected_ids = set(rejected_ids)
+
+    def _apply(self, writes):
+        if any(doc_ref.id in self.rejected_ids for doc_ref, _, _ in writes):
+            raise gcp_exceptions.InvalidArgument('fake invalid document')
+        super()._apply(writes)
+
+@pytest.fixture
+def seeded():
+    """fake의 failure_rate와 백오프 지터가 쓰는 random을 고정"""
+    state = random.getstate()
+    random.seed(1234)
+    yield
+    random.setstate(state)
+
+def test_transient_failures_are_retried(seeded):
+    db = FakeFirestoreClient(failure_rate=0.3)
+    documents = make_documents(1000)
+
+    # 커밋을 하나씩 진행하여 실패 순서를 고정
+    report = bulk_write(db, COLLECTION, documents, batch_size=100, max_in_flight=1,
+                        max_attempts=20, base_delay=0)
+
+    assert report['written'] == 1000
+    assert report['failed_ids'] == []
+    assert report['retries'] > 0
+    assert db.commits == 10
+    assert db.documents(COLLECTION) == dict(documents)
+
+def test_transient_failures_with_concurrent_commits(seeded):
+    db = FakeFirestoreClient(failure_rate=0.5)
+    documents = make_documents(2000)
+
+    report = bulk_write(db, COLLECTION, documents, batch_size=50, max_in_flight=8,
+                        max_attempts=40, base_delay=0)
+
+    assert report['written'] == 2000
+    assert report['failed_ids'] == []
+    assert db.documents(COLLECTION) == dict(documents)
+
+def test_exhausted_retries_report_failed_ids():
+    db = FakeFirestoreClient(failure_rate=1.0)
+    documents = make_documents(250)
+
+    report = bulk_write(db, COLLECTION, documents, batch_size=100, max_attempts=3, base_delay=0)
+
+    assert report['written'] == 0
+    assert sorted(report['failed_ids']) == [doc_id for doc_id, _ in documents]
+    # 배치 3개 x (시도 3번 - 1)
+    assert report['retries'] == 6
+    assert db.documents(COLLECTION) == {}
+
+def test_permanent_error_splits_batch():
+    rejected = {'doc_0005', 'doc_0042'}
+    db = RejectingClient(rejected)
+    documents = make_documents(64)
+
+    report = bulk_write(db, COLLECTION, documents, batch_size=16, base_delay=0)
+
+    # 영구 에러는 재시도하지 않고 나누어 문제 문서만 남김
+    assert report['retries'] == 0
+    assert sorted(report['failed_ids']) == sorted(rejected)
+    assert report['written'] == 62
+    assert db.documents(COLLECTION) == {doc_id: data for doc_id, data in documents if doc_id not in rejected}
+
+def test_permanent_error_split_with_transient_failures(seeded):
+    rejected = {'doc_0000', 'doc_0150', 'doc_0399'}
+    db = RejectingClient(rejected, failure_rate=0.3)
+    documents = make_documents(400)
+
+    report = bulk_write(db, COLLECTION, documents, batch_size=100, max_in_flight=1,
+                        max_attempts=20, base_delay=0)
+
+    assert report['retries'] > 0
+    assert sorted(report['failed_ids']) == sorted(rejected)
+    assert report['written'] == 397
+    assert set(db.documents(COLLECTION)) == {doc_id for doc_id, _ in documents} - rejected
+
+def test_failed_documents_are_not_fingerprinted(tmp_path):
+    rejected = {'doc_0003', 'doc_0017'}
+    db = RejectingClient(rejected)
+    documents = make_documents(40)
+    store = open_fingerprint_store('test/fake', path=tmp_path / 'fingerprints.sqlite')
+
+    try:
+        report = write_documents(db, COLLECTION, documents, fingerprint_store=store,
+                                 batch_size=8, base_delay=0)
+        assert sorted(report['failed_ids']) == sorted(rejected)
+        assert report['inserted'] == 40
+
+        # 다음 실행에서는 실패했던 문서만 다시 씀
+        db.rejected_ids = set()
+        report = write_documents(db, COLLECTION, documents, fingerprint_store=store,
+                                 batch_size=8, base_delay=0)
+        assert report['failed_ids'] == []
+        assert report['written'] == 2
+        assert (report['inserted'], report['skipped']) == (2, 38)
+    finally:
+        store.close()
+
+    assert db.documents(COLLECTION) == dict(documents)
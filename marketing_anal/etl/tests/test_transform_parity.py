@@ -0,0 +1,74 @@
+"""
+변환 엔진 비교 테스트: vectorized 결과가 기존 행 단위(row) 결과와 같은지 확인합니다.
+(main.verify_transform과 같은 기준 - 결과 행과 거부 사유)
+"""
+
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+main.load_dependencies()
+from benchmark import generate_ga_frame, generate_ad_frame
+
+INPUT_DIR = Path(__file__).parent.parent / 'data' / 'input'
+PROJECT_ID = 'p_main'
+LANDING_ID = 'landing_main'
+
+def assert_engines_match(kind, df):
+    """두 엔진의 결과 행과 거부 사유가 같은지 확인"""
+    result_df, rejects = main.TRANSFORM_ENGINES['vectorized'][kind](df.copy(), PROJECT_ID, LANDING_ID)
+    row_df, row_rejects = main.TRANSFORM_ENGINES['row'][kind](df.copy(), PROJECT_ID, LANDING_ID)
+
+    pd.testing.assert_frame_equal(
+        result_df.reset_index(drop=True), row_df.reset_index(drop=True), check_dtype=False
+    )
+    pd.testing.assert_series_equal(rejects.sort_index(), row_rejects.sort_index(), check_index_type=False)
+    return result_df, rejects
+
+@pytest.mark.parametrize('kind, file_name', [
+    ('ga', 'ga_sessions_sample.csv'),
+    ('ad', 'ad_performance_sample.csv'),
+])
+def test_sample_files(kind, file_name):
+    result_df, _ = assert_engines_match(kind, pd.read_csv(INPUT_DIR / file_name))
+    assert not result_df.empty
+
+def test_messy_ga_rows():
+    df = pd.DataFrame({
+        'date': ['2025-11-25', '2025/11/26', '20251127', '2025-1-2', 'not a date', None, '2025-13-01', ' 2025-11-28 '],
+        'source': ['naver', ' Google ', 'META', None, 'naver', 'google', 'kakao', 'unknown_source'],
+        'medium': ['cpc', 'CPC', ' paid_social ', 'organic', 'cpc', None, 'cpc', 'referral'],
+        'campaign': ['c1', 'c2', 'c3', 'c4', 'c5', 'c6', 'c7', 'c8'],
+        'sessions': [10, 20, 30, 40, 50, 60, 70, 80],
+        'users': [8, 15, 25, 30, 45, 50, 60, 70],
+        'conversions': [1, 2, 0, 3, 1, 0, 2, 1],
+        'revenue': [1000, 2000, 0, 3000, 500, 0, 1500, 700],
+    })
+    _, rejects = assert_engines_match('ga', df)
+    assert not rejects.empty
+
+def test_messy_ad_rows():
+    df = pd.DataFrame({
+        'date': ['2025-11-25', '2025/11/26', 'bad', '2025-11-27', None],
+        'platform': ['naver', ' GOOGLE ', 'meta', None, 'kakao'],
+        'campaign': ['c1', 'c2', 'c3', 'c4', 'c5'],
+        'impressions': [5000, 3500, 100, 200, 300],
+        'clicks': [120, 80, 1, 2, 3],
+        'cost': [50000, 35000, 100, 200, 300],
+    })
+    _, rejects = assert_engines_match('ad', df)
+    assert not rejects.empty
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_generated_frames(seed):
+    rng = np.random.default_rng(seed)
+    assert_engines_match('ga', generate_ga_frame(rng, 2000, invalid_rate=0.2))
+    assert_engines_match('ad', generate_ad_frame(rng, 2000, invalid_rate=0.2))
+
+def test_missing_optional_columns():
+    ga_df = pd.read_csv(INPUT_DIR / 'ga_sessions_sample.csv').drop(columns=['medium'])
+    ad_df = pd.read_csv(INPUT_DIR / 'ad_performance_sample.csv').drop(columns=['platform'])
+    assert_engines_match('ga', ga_df)
+    assert_engines_match('ad', ad_df)